@@ -0,0 +1,391 @@
+"""Phase timings and peak memory of a full codegen run on a seeded synthetic corpus.
+
+Run with: python -m benchmarks.codegen_suite run [--output results.json]
+Compare with: python -m benchmarks.codegen_suite compare baseline.json results.json
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+from faust_avro_model_codegen.code_formatter import CodeFormatter
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
+from faust_avro_model_codegen.schema_graph import SchemaGraph
+from faust_avro_model_codegen.template_renderer import (
+    RenderedTemplate,
+    TemplateRenderer,
+)
+from faust_avro_model_codegen.template_writer import TemplateWriter
+from faust_avro_model_codegen.types import (
+    CodeGenResultData,
+    SchemaData,
+    decoded_schemas,
+)
+
+RESULTS_VERSION = 1
+NAMESPACE = "bench.suite"
+COMMON = f"{NAMESPACE}.common"
+PRIMITIVES = ("string", "long", "int", "double", "boolean", "bytes")
+UNION_PRIMITIVES = ("string", "long", "double", "boolean", "bytes")
+LOGICAL = (
+    {"type": "long", "logicalType": "timestamp-millis"},
+    {"type": "string", "logicalType": "uuid"},
+    {"type": "int", "logicalType": "date"},
+)
+
+
+@dataclasses.dataclass
+class Corpus:
+    seed: int = 0
+    narrow: int = 100
+    narrow_fields: int = 8
+    wide: int = 2
+    wide_fields: int = 100
+    # how many arrays, maps and unions a generated type nests at most
+    depth: int = 4
+
+
+class SchemaFactory:
+    # every choice goes through one seeded generator, so a corpus is the same
+    # on every machine and run
+    def __init__(self, corpus: Corpus) -> None:
+        self.corpus = corpus
+        self.random = random.Random(corpus.seed)
+        self.enums = 0
+
+    def common_schema(self) -> typing.Dict[str, typing.Any]:
+        # named types the other schemas reference across files
+        return {
+            "type": "record",
+            "name": "Address",
+            "namespace": COMMON,
+            "fields": [
+                {"name": "street", "type": "string"},
+                {"name": "zip", "type": ["null", "string"], "default": None},
+                {
+                    "name": "kind",
+                    "type": {
+                        "type": "enum",
+                        "name": "AddressKind",
+                        "symbols": ["HOME", "WORK", "OTHER"],
+                    },
+                },
+            ],
+        }
+
+    def enum(self) -> typing.Dict[str, typing.Any]:
+        self.enums += 1
+        symbols = self.random.randint(2, 12)
+        return {
+            "type": "enum",
+            "name": f"Enum{self.enums}",
+            "symbols": [f"SYMBOL_{n}" for n in range(symbols)],
+        }
+
+    def leaf(self) -> typing.Any:
+        choice = self.random.random()
+        if choice < 0.55:
+            return self.random.choice(PRIMITIVES)
+        if choice < 0.7:
+            return dict(self.random.choice(LOGICAL))
+        if choice < 0.85:
+            return self.enum()
+        if choice < 0.95:
+            return f"{COMMON}.AddressKind"
+        return f"{COMMON}.Address"
+
+    def field_type(self, depth: int, union: bool = True) -> typing.Any:
+        if depth >= self.corpus.depth or self.random.random() < 0.4:
+            return self.leaf()
+        choice = self.random.random()
+        if choice < 0.3:
+            return {"type": "array", "items": self.field_type(depth + 1)}
+        if choice < 0.55 or not union:
+            return {"type": "map", "values": self.field_type(depth + 1)}
+        # unions can't hold unions or two members of the same type. faust only
+        # accepts more than one member at the top of a field, and only when it
+        # doesn't coerce them. int is an annotated type faust coerces, so the
+        # extra members are the other primitives
+        first = self.field_type(depth + 1, union=False)
+        if depth > 0 or first not in UNION_PRIMITIVES:
+            return ["null", first]
+        primitives = [p for p in UNION_PRIMITIVES if p != first]
+        members = self.random.sample(primitives, self.random.randint(1, 3))
+        return ["null", first, *members]
+
+    def field(self, index: int) -> typing.Dict[str, typing.Any]:
+        avro_type = self.field_type(0)
+        if isinstance(avro_type, list) and avro_type[0] == "null":
+            return {"name": f"field_{index}", "type": avro_type, "default": None}
+        return {"name": f"field_{index}", "type": avro_type}
+
+    def schema(self, name: str, fields: int) -> typing.Dict[str, typing.Any]:
+        return {
+            "type": "record",
+            "name": name,
+            "namespace": NAMESPACE,
+            "doc": f"Synthetic record {name}",
+            "fields": [self.field(n) for n in range(fields)],
+        }
+
+    def schemas(
+        self,
+    ) -> typing.Iterator[typing.Tuple[str, typing.Dict[str, typing.Any]]]:
+        yield "common", self.common_schema()
+        for index in range(self.corpus.narrow):
+            yield f"narrow_{index:05}", self.schema(
+                f"Narrow{index}", self.corpus.narrow_fields
+            )
+        for index in range(self.corpus.wide):
+            yield f"wide_{index:03}", self.schema(
+                f"Wide{index}", self.corpus.wide_fields
+            )
+
+
+def write_corpus(directory: Path, corpus: Corpus) -> int:
+    fields = 0
+    for name, schema in SchemaFactory(corpus).schemas():
+        (directory / f"{name}.avsc").write_text(json.dumps(schema, indent=2))
+        fields += len(schema["fields"])
+    return fields
+
+
+def parse(directory: Path) -> typing.List[SchemaData]:
+    # decoded schemas are cached by content, every run starts without them
+    decoded_schemas.clear()
+    schemas = list(
+        AvroSchemaDirectoryParser.parse_files(
+            AvroSchemaDirectoryParser.schema_files(directory)
+        )
+    )
+    for schema in schemas:
+        schema.schema
+    return schemas
+
+
+def convert(schemas: typing.List[SchemaData]) -> typing.List[CodeGenResultData]:
+    # the same steps as FaustAvroModelGen.generate_module
+    graph = SchemaGraph.from_schemas(
+        enumerate(s.schema for s in schemas), lambda index: schemas[index].schema
+    )
+    return [
+        CodeGenResultData.from_schema_data(schemas[index], graph.named_types([index]))
+        for index in graph.order()
+    ]
+
+
+class Pipeline:
+    def __init__(self, directory: Path, format_output: bool = True) -> None:
+        self.directory = directory
+        self.outfile = directory / "out" / "models.py"
+        self.format_output = format_output
+        self.renderer = TemplateRenderer.from_current_directory()
+        self.formatter = CodeFormatter()
+        # formatting is timed on its own, so the writer only writes
+        self.writer = TemplateWriter(self.formatter, format_output=False)
+
+    def phases(self) -> typing.Iterator[typing.Tuple[str, typing.Callable[[], None]]]:
+        # each phase works on the output of the one before it
+        state: typing.Dict[str, typing.Any] = {}
+
+        def step(
+            name: str, run: typing.Callable[[], typing.Any]
+        ) -> typing.Tuple[str, typing.Callable[[], None]]:
+            return name, lambda: state.__setitem__(name, run())
+
+        yield step("parse", lambda: parse(self.directory))
+        yield step("convert", lambda: convert(state["parse"]))
+        yield step("merge", lambda: CodeGenResultData.concat(state["convert"]))
+        yield step("render", lambda: self.renderer.render(state["merge"]))
+        if self.format_output:
+            yield step(
+                "format", lambda: self.formatter.format(state["render"], self.outfile)
+            )
+        yield step(
+            "write",
+            lambda: self.writer.write(
+                self.outfile, RenderedTemplate(state.get("format", state["render"]))
+            ),
+        )
+
+    def timings(self) -> typing.Dict[str, float]:
+        timings = {}
+        for name, run in self.phases():
+            start = time.perf_counter()
+            run()
+            timings[name] = time.perf_counter() - start
+        return timings
+
+    def peaks(self) -> typing.Dict[str, int]:
+        # tracing slows everything down, so memory is measured in a run of
+        # its own. a phase's peak includes what earlier phases still hold
+        peaks = {}
+        tracemalloc.start()
+        try:
+            for name, run in self.phases():
+                tracemalloc.reset_peak()
+                run()
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peaks
+
+
+def run_suite(
+    corpus: Corpus, repeat: int, format_output: bool = True
+) -> typing.Dict[str, typing.Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        fields = write_corpus(Path(directory), corpus)
+        pipeline = Pipeline(Path(directory), format_output)
+        # the first run warms the template and formatter caches, like the
+        # second run of a watch session
+        pipeline.timings()
+        runs = [pipeline.timings() for _ in range(repeat)]
+        peaks = pipeline.peaks()
+        output_bytes = pipeline.outfile.stat().st_size
+    phases = {
+        name: {"seconds": min(run[name] for run in runs), "peak_bytes": peaks[name]}
+        for name in runs[0]
+    }
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            **dataclasses.asdict(corpus),
+            "schemas": corpus.narrow + corpus.wide + 1,
+            "fields": fields,
+            "output_bytes": output_bytes,
+        },
+        "repeat": repeat,
+        "format_output": format_output,
+        "phases": phases,
+        "total": {
+            "seconds": sum(phase["seconds"] for phase in phases.values()),
+            "peak_bytes": max(phase["peak_bytes"] for phase in phases.values()),
+        },
+    }
+
+
+def print_results(results: typing.Dict[str, typing.Any]) -> None:
+    corpus = results["corpus"]
+    print(
+        f"{corpus['schemas']:,} schemas, {corpus['fields']:,} fields,"
+        f" {corpus['output_bytes'] / 2**20:.1f} MiB of output (seed {corpus['seed']})"
+    )
+    print(f"{'phase':>8} {'time (s)':>9} {'peak MiB':>9}")
+    for name, phase in [*results["phases"].items(), ("total", results["total"])]:
+        print(f"{name:>8} {phase['seconds']:9.3f} {phase['peak_bytes'] / 2**20:9.1f}")
+
+
+def compare(
+    baseline: typing.Dict[str, typing.Any],
+    current: typing.Dict[str, typing.Any],
+    threshold: float,
+    min_seconds: float = 0.0,
+) -> typing.List[str]:
+    # relative changes of every measurement, the ones above the threshold are
+    # returned as regressions. phases that take less than min_seconds in both
+    # runs are too short to time reliably
+    regressions = []
+    before_phases = {**baseline["phases"], "total": baseline["total"]}
+    after_phases = {**current["phases"], "total": current["total"]}
+    print(f"{'phase':>8} {'metric':>11} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in [name for name in before_phases if name in after_phases]:
+        before, after = before_phases[name], after_phases[name]
+        for metric in ("seconds", "peak_bytes"):
+            change = after[metric] / before[metric] - 1 if before[metric] else 0.0
+            flag = ""
+            noise = (
+                metric == "seconds" and max(before[metric], after[metric]) < min_seconds
+            )
+            if change > threshold and not noise:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+                flag = "  regression"
+            print(
+                f"{name:>8} {metric:>11} {before[metric]:10.4g} {after[metric]:10.4g}"
+                f" {change:+8.1%}{flag}"
+            )
+    return regressions
+
+
+def load(path: Path) -> typing.Dict[str, typing.Any]:
+    results = json.loads(path.read_text())
+    if results.get("version") != RESULTS_VERSION:
+        raise SystemExit(f"{path} was written by another version of the suite")
+    return results
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.codegen_suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="time every phase of a codegen run")
+    defaults = Corpus()
+    for field in dataclasses.fields(Corpus):
+        run.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=int,
+            default=getattr(defaults, field.name),
+        )
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument(
+        "--no-format",
+        dest="format_output",
+        action="store_false",
+        help="skip isort, autoflake and black, like the --no-format option",
+    )
+    run.add_argument("--output", type=Path, help="write the results as JSON")
+    check = commands.add_parser("compare", help="flag regressions between results")
+    check.add_argument("baseline", type=Path)
+    check.add_argument("current", type=Path)
+    check.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown or growth counted as a regression (default 0.1)",
+    )
+    check.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.01,
+        help="ignore timings of phases shorter than this (default 0.01)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        corpus = Corpus(
+            **{
+                field.name: getattr(args, field.name)
+                for field in dataclasses.fields(Corpus)
+            }
+        )
+        results = run_suite(corpus, args.repeat, args.format_output)
+        print_results(results)
+        if args.output is not None:
+            args.output.write_text(json.dumps(results, indent=2) + "\n")
+        return 0
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline["corpus"] != current["corpus"]:
+        print("warning: the results are of different corpora", file=sys.stderr)
+    if baseline["phases"].keys() != current["phases"].keys():
+        print("warning: the results time different phases", file=sys.stderr)
+    regressions = compare(baseline, current, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Scaling of merging per-schema CodeGenResultData into one result.
+
+Run with: python -m benchmarks.merge_scaling
+"""
+
+import time
+import typing
+from functools import reduce
+
+from faust_avro_model_codegen.types import CodeGenResultData, SchemaData
+
+SIZES = (100, 1_000, 5_000, 10_000, 50_000)
+# the quadratic fold is only timed up to here, beyond it takes minutes
+FOLD_LIMIT = 10_000
+
+
+def synthetic_schema(index: int) -> SchemaData:
+    return SchemaData(
+        name=f"subject_{index}",
+        schema={
+            "type": "record",
+            "name": f"Record{index}",
+            "namespace": "bench.avro",
+            "fields": [
+                {"name": "id", "type": "string"},
+                {"name": "count", "type": "long"},
+                {
+                    "name": "colors",
+                    "type": {
+                        "type": "array",
+                        "items": {
+                            "type": "enum",
+                            "name": f"Color{index}",
+                            "symbols": ["RED", "GREEN"],
+                        },
+                    },
+                },
+            ],
+        },
+    )
+
+
+def fold(results: typing.List[CodeGenResultData]) -> CodeGenResultData:
+    return reduce(lambda s, t: s + t, results, CodeGenResultData.empty())
+
+
+def timed(
+    merge: typing.Callable[[typing.List[CodeGenResultData]], CodeGenResultData],
+    results: typing.List[CodeGenResultData],
+) -> float:
+    start = time.perf_counter()
+    merge(results)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(
+        f"{'schemas':>8} {'fold (s)':>10} {'concat (s)':>11} {'concat us/schema':>17}"
+    )
+    for size in SIZES:
+        results = [
+            CodeGenResultData.from_schema_data(synthetic_schema(i)) for i in range(size)
+        ]
+        concat_time = timed(CodeGenResultData.concat, results)
+        fold_time = (
+            f"{timed(fold, results):10.4f}" if size <= FOLD_LIMIT else " " * 9 + "-"
+        )
+        print(
+            f"{size:>8} {fold_time} {concat_time:11.4f} "
+            f"{concat_time / size * 1e6:17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
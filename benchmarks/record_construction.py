@@ -0,0 +1,132 @@
+"""Construction throughput of generated records, reflective vs specialized __post_init__.
+
+Run with: python -m benchmarks.record_construction
+"""
+
+import re
+import sys
+import tempfile
+import timeit
+import typing
+from importlib import util
+from pathlib import Path
+from types import ModuleType
+
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.types import CodeGenResultData, SchemaData
+
+NUMBER = 20_000
+REPEAT = 5
+
+# the __post_init__ every record used to carry
+REFLECTIVE_POST_INIT = """\
+    def __post_init__(self) -> None:
+        for _field in dataclasses.fields(self):
+            value = getattr(self, _field.name)
+            if isinstance(value, dataclasses.Field):
+                setattr(self, _field.name, value.default)
+            if isinstance(value, typing.List):
+                item: enum.Enum
+                for index, item in enumerate(value):
+                    if issubclass(item.__class__, enum.Enum):
+                        value[index] = item.value
+
+"""
+SPECIALIZED_POST_INIT = re.compile(
+    r"    def __post_init__\(self\) -> None:\n(?: {8}.*\n)+\n"
+)
+RECORD_HEADER = re.compile(r"^(class \w+\(AvroRecord\):\n)", re.MULTILINE)
+
+SCHEMAS = {
+    "plain": {
+        "type": "record",
+        "name": "Plain",
+        "fields": [{"name": f"field_{i}", "type": "string"} for i in range(10)],
+    },
+    "mixed": {
+        "type": "record",
+        "name": "Mixed",
+        "fields": [
+            *({"name": f"field_{i}", "type": "string"} for i in range(6)),
+            {"name": "count", "type": "long"},
+            {
+                "name": "colors",
+                "type": {
+                    "type": "array",
+                    "items": {
+                        "type": "enum",
+                        "name": "Color",
+                        "symbols": ["RED", "GREEN", "BLUE"],
+                    },
+                },
+            },
+            {"name": "note", "type": ["null", "string"], "default": None},
+            {"name": "retries", "type": "int", "default": 0},
+        ],
+    },
+}
+PAYLOADS: typing.Dict[str, typing.Dict[str, typing.Any]] = {
+    "Plain": {f"field_{i}": "value" for i in range(10)},
+    "Mixed": {
+        **{f"field_{i}": "value" for i in range(6)},
+        "count": 1,
+        "colors": ["RED", "BLUE", "GREEN"],
+    },
+}
+
+
+def render_source() -> str:
+    result = CodeGenResultData.concat(
+        CodeGenResultData.from_schema_data(SchemaData(name=name, schema=schema))
+        for name, schema in SCHEMAS.items()
+    )
+    return TemplateRenderer.from_current_directory().render(result)
+
+
+def reflective(source: str) -> str:
+    source = SPECIALIZED_POST_INIT.sub("", source)
+    source = RECORD_HEADER.sub(lambda m: m.group(1) + REFLECTIVE_POST_INIT, source)
+    for module in ("dataclasses", "enum", "typing"):
+        if f"import {module}\n" not in source:
+            source = source.replace('"""\n\n', f'"""\n\nimport {module}\n', 1)
+    return source
+
+
+def load(name: str, source: str, directory: Path) -> ModuleType:
+    path = directory / f"{name}.py"
+    path.write_text(source)
+    spec = util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def constructions_per_second(cls: type, payload: typing.Dict[str, typing.Any]) -> float:
+    # __post_init__ normalizes lists in place, so every construction gets fresh ones
+    lists = [key for key, value in payload.items() if isinstance(value, list)]
+
+    def construct() -> None:
+        cls(**{**payload, **{key: list(payload[key]) for key in lists}})
+
+    best = min(timeit.repeat(construct, number=NUMBER, repeat=REPEAT))
+    return NUMBER / best
+
+
+def main() -> None:
+    source = render_source()
+    with tempfile.TemporaryDirectory() as directory:
+        before = load("reflective_models", reflective(source), Path(directory))
+        after = load("specialized_models", source, Path(directory))
+        print(
+            f"{'record':>8} {'reflective (/s)':>16} {'specialized (/s)':>17} {'speedup':>8}"
+        )
+        for name, payload in PAYLOADS.items():
+            slow = constructions_per_second(getattr(before, name), payload)
+            fast = constructions_per_second(getattr(after, name), payload)
+            print(f"{name:>8} {slow:16,.0f} {fast:17,.0f} {fast / slow:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Dict and JSON conversion throughput of generated records, generic vs generated.
+
+Run with: python -m benchmarks.record_dict_conversion
+"""
+
+import json
+import tempfile
+import timeit
+import typing
+from pathlib import Path
+
+from dataclasses_avroschema import AvroModel
+from dataclasses_avroschema.utils import standardize_custom_type
+
+from benchmarks.record_construction import PAYLOADS, load, render_source
+
+NUMBER = 5_000
+REPEAT = 5
+
+Operations: typing.TypeAlias = typing.Dict[str, typing.Callable[[], typing.Any]]
+
+
+def generic(cls: typing.Any, record: typing.Any, data: typing.Any) -> Operations:
+    # the reflective conversions dataclasses_avroschema applies to any model
+    encoded = AvroModel.to_json(record)
+    return {
+        "to_dict": lambda: AvroModel.asdict(
+            record, standardize_factory=standardize_custom_type
+        ),
+        "from_dict": lambda: cls.parse_obj(data),
+        "to_json": lambda: AvroModel.to_json(record),
+        "from_json": lambda: cls.parse_obj(json.loads(encoded)),
+    }
+
+
+def generated(cls: typing.Any, record: typing.Any, data: typing.Any) -> Operations:
+    encoded = record.to_json()
+    return {
+        "to_dict": record.to_dict,
+        "from_dict": lambda: cls.from_dict(data),
+        "to_json": record.to_json,
+        "from_json": lambda: cls.from_json(encoded),
+    }
+
+
+def per_second(operation: typing.Callable[[], typing.Any]) -> float:
+    best = min(timeit.repeat(operation, number=NUMBER, repeat=REPEAT))
+    return NUMBER / best
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        module = load("conversion_models", render_source(), Path(directory))
+        print(
+            f"{'record':>8} {'operation':>10} {'generic (/s)':>13}"
+            f" {'generated (/s)':>15} {'speedup':>8}"
+        )
+        for name, payload in PAYLOADS.items():
+            cls = getattr(module, name)
+            record = cls.from_dict(payload)
+            data = record.to_dict()
+            slow = generic(cls, record, data)
+            fast = generated(cls, record, data)
+            for operation in fast:
+                before = per_second(slow[operation])
+                after = per_second(fast[operation])
+                print(
+                    f"{name:>8} {operation:>10} {before:13,.0f}"
+                    f" {after:15,.0f} {after / before:7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Memory held by 1M generated records for each compact/frozen combination.
+
+Run with: python -m benchmarks.record_memory [instances]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import util
+from pathlib import Path
+from types import ModuleType
+
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.types import CodeGenResultData, SchemaData
+
+INSTANCES = 1_000_000
+MODES = {
+    "default": {},
+    "compact": {"compact": True},
+    "frozen": {"frozen": True},
+    "compact+frozen": {"compact": True, "frozen": True},
+}
+SCHEMA = SchemaData(
+    name="reading",
+    schema={
+        "type": "record",
+        "name": "Reading",
+        "fields": [
+            {"name": "sensor", "type": "string"},
+            {"name": "value", "type": "double"},
+            {"name": "sequence", "type": "long"},
+            {"name": "unit", "type": ["null", "string"], "default": None},
+        ],
+    },
+)
+
+
+def load(name: str, source: str, directory: Path) -> ModuleType:
+    path = directory / f"{name}.py"
+    path.write_text(source)
+    spec = util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(cls: type, instances: int) -> tuple[float, float]:
+    sensors = [f"sensor-{i % 1000}" for i in range(1000)]
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = [
+        cls(sensor=sensors[i % 1000], value=0.5, sequence=7) for i in range(instances)
+    ]
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return held, elapsed
+
+
+def main() -> None:
+    instances = int(sys.argv[1]) if len(sys.argv) > 1 else INSTANCES
+    result = CodeGenResultData.from_schema_data(SCHEMA)
+    print(f"{instances:,} instances")
+    print(f"{'mode':>13} {'MiB':>9} {'bytes/record':>13} {'build (s)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (mode, options) in enumerate(MODES.items()):
+            source = TemplateRenderer.from_current_directory(**options).render(result)
+            module = load(f"records_{index}", source, Path(directory))
+            held, elapsed = measure(module.Reading, instances)
+            print(
+                f"{mode:>13} {held / 2**20:9.1f} {held / instances:13.1f} "
+                f"{elapsed:10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
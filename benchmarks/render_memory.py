@@ -0,0 +1,93 @@
+"""Peak memory of rendering and writing a models module, in memory vs streamed.
+
+Run with: python -m benchmarks.render_memory
+"""
+
+import json
+import tempfile
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+from faust_avro_model_codegen.parallel import render_schema_files, stream_schema_files
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.template_writer import TemplateWriter
+
+SIZES = (250, 1_000, 4_000)
+FIELDS = 20
+
+
+def synthetic_schema(index: int) -> dict:
+    fields: typing.List[dict] = [
+        {"name": f"field_{i}", "type": ["null", "string"], "default": None}
+        for i in range(FIELDS)
+    ]
+    fields.append(
+        {
+            "name": "statuses",
+            "type": {
+                "type": "array",
+                "items": {"type": "enum", "name": "Status", "symbols": ["ON", "OFF"]},
+            },
+        }
+    )
+    return {
+        "type": "record",
+        "name": f"Record{index}",
+        "namespace": "bench.avro",
+        "doc": f"Synthetic record number {index}",
+        "fields": fields,
+    }
+
+
+def write_schemas(directory: Path, size: int) -> typing.List[Path]:
+    schema_files = []
+    for index in range(size):
+        schema_file = directory / f"record_{index:05}.avsc"
+        schema_file.write_text(json.dumps(synthetic_schema(index)))
+        schema_files.append(schema_file)
+    return schema_files
+
+
+def measure(write: typing.Callable[[], None]) -> typing.Tuple[int, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    write()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main() -> None:
+    renderer = TemplateRenderer.from_current_directory()
+    # formatting needs the whole module, so both sides write it unformatted
+    writer = TemplateWriter(format_output=False)
+    print(
+        f"{'schemas':>8} {'output MiB':>11} {'in memory MiB':>14}"
+        f" {'streamed MiB':>13} {'in memory (s)':>14} {'streamed (s)':>13}"
+    )
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            schema_files = write_schemas(Path(directory), size)
+            outfile = Path(directory) / "models.py"
+            joined_peak, joined_time = measure(
+                lambda: writer.write(
+                    outfile, render_schema_files(renderer, schema_files)
+                )
+            )
+            streamed_peak, streamed_time = measure(
+                lambda: writer.write_stream(
+                    outfile, stream_schema_files(renderer, schema_files)
+                )
+            )
+            print(
+                f"{size:>8} {outfile.stat().st_size / 2**20:11.1f}"
+                f" {joined_peak / 2**20:14.1f} {streamed_peak / 2**20:13.1f}"
+                f" {joined_time:14.2f} {streamed_time:13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Construction time of TemplateRenderer with a cold, warm and in-process template cache.
+
+Run with: python -m benchmarks.renderer_startup
+"""
+
+import statistics
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from faust_avro_model_codegen.template_renderer import (
+    TemplateRenderer,
+    template_environment,
+)
+
+REPEAT = 50
+
+
+def timed(
+    construct: typing.Callable[[], typing.Any], prepare: typing.Callable[[], None]
+) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        prepare()
+        start = time.perf_counter()
+        construct()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dirs = iter(Path(directory) / str(i) for i in range(REPEAT))
+        warm_dir = Path(directory) / "warm"
+        TemplateRenderer.from_current_directory(cache_dir=warm_dir)
+        results = {
+            # an empty cache parses and compiles every template, as every
+            # construction used to
+            "cold bytecode cache": timed(
+                lambda: TemplateRenderer.from_current_directory(
+                    cache_dir=next(cache_dirs)
+                ),
+                template_environment.cache_clear,
+            ),
+            "warm bytecode cache": timed(
+                lambda: TemplateRenderer.from_current_directory(cache_dir=warm_dir),
+                template_environment.cache_clear,
+            ),
+            "same process": timed(
+                lambda: TemplateRenderer.from_current_directory(cache_dir=warm_dir),
+                lambda: None,
+            ),
+        }
+    print(f"{'renderer':>20} {'ms':>9}")
+    for name, seconds in results.items():
+        print(f"{name:>20} {seconds * 1000:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
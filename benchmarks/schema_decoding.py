@@ -0,0 +1,94 @@
+"""Decoding of schema files, eager json.loads vs lazy, deduplicated decoding.
+
+Run with: python -m benchmarks.schema_decoding
+"""
+
+import json
+import time
+import typing
+
+from faust_avro_model_codegen.json_backend import json_loads
+from faust_avro_model_codegen.types import (
+    DecodedSchemaCache,
+    LazySchemaData,
+    SchemaData,
+)
+
+SCHEMAS = 5_000
+FIELDS = 40
+# schema sets often vendor the same file into several services
+COPIES = 4
+REPEAT = 5
+
+
+def corpus() -> typing.List[typing.Tuple[str, bytes]]:
+    files = []
+    for index in range(SCHEMAS // COPIES):
+        schema = {
+            "type": "record",
+            "name": f"Record{index}",
+            "namespace": "benchmarks.decoding",
+            "doc": "A record with a realistic number of documented fields.",
+            "fields": [
+                {
+                    "name": f"field_{field}",
+                    "type": ["null", "string", {"type": "array", "items": "long"}],
+                    "default": None,
+                    "doc": f"Field number {field} of the record.",
+                }
+                for field in range(FIELDS)
+            ],
+        }
+        raw = json.dumps(schema, indent=2).encode()
+        files += [(f"record_{index}_{copy}", raw) for copy in range(COPIES)]
+    return files
+
+
+def eager(files: typing.List[typing.Tuple[str, bytes]]) -> typing.List[SchemaData]:
+    return [SchemaData.from_file(name, raw.decode()) for name, raw in files]
+
+
+def lazy(
+    files: typing.List[typing.Tuple[str, bytes]], backend: str
+) -> typing.Callable[[], typing.List[SchemaData]]:
+    loads = json_loads(backend)  # type: ignore[arg-type]
+
+    def decode() -> typing.List[SchemaData]:
+        # a fresh cache per run, so every run pays for the unique files
+        cache = DecodedSchemaCache()
+        schemas = [LazySchemaData(name, raw, loads) for name, raw in files]
+        for schema in schemas:
+            cache.get(schema.content_hash, schema.raw, loads)
+        return schemas
+
+    return decode
+
+
+def best(operation: typing.Callable[[], typing.Any]) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    files = corpus()
+    size = sum(len(raw) for _, raw in files)
+    print(f"{len(files):,} schemas, {size / 2**20:.1f} MiB, {COPIES} copies of each")
+    baseline = best(lambda: eager(files))
+    print(f"{'':>22} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'eager json':>22} {baseline:9.3f} {1:7.2f}x")
+    for backend in ["json", "orjson"]:
+        try:
+            decode = lazy(files, backend)
+        except Exception as error:
+            print(f"{'lazy ' + backend:>22} skipped: {error}")
+            continue
+        elapsed = best(decode)
+        print(f"{'lazy ' + backend:>22} {elapsed:9.3f} {baseline / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Discovery and reading of a synthetic 50k-schema tree, pathlib rglob vs the scandir walk.
+
+Run with: python -m benchmarks.schema_discovery [files]
+"""
+
+import fnmatch
+import json
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
+
+FILES = 50_000
+FILES_PER_DIR = 50
+DIRS_PER_TEAM = 20
+# one in ten teams is a vendored copy that discovery has to skip
+VENDORED_EVERY = 10
+INCLUDE = ["**/*.avsc"]
+EXCLUDE = ["**/vendor/**"]
+
+
+def build_tree(root: Path, files: int) -> int:
+    schema = json.dumps({"type": "record", "name": "Record", "fields": []})
+    vendored = 0
+    for index in range(files):
+        directory, _ = divmod(index, FILES_PER_DIR)
+        team, folder = divmod(directory, DIRS_PER_TEAM)
+        parent = root / f"team_{team}"
+        if team % VENDORED_EVERY == VENDORED_EVERY - 1:
+            parent = parent / "vendor"
+            vendored += 1
+        path = parent / f"folder_{folder}" / f"record_{index}.avsc"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(schema)
+        if index % FILES_PER_DIR == 0:
+            (path.parent / "README.md").write_text("")
+    return vendored
+
+
+def rglob(root: Path) -> typing.List[Path]:
+    return sorted(
+        path
+        for path in root.rglob("*.avsc")
+        if not any(
+            fnmatch.fnmatch(path.relative_to(root).as_posix(), p) for p in EXCLUDE
+        )
+    )
+
+
+def scandir(root: Path) -> typing.List[Path]:
+    return AvroSchemaDirectoryParser.discover([root], INCLUDE, EXCLUDE)
+
+
+def read_sequentially(schema_files: typing.List[Path]) -> int:
+    return sum(len(path.read_text()) for path in schema_files)
+
+
+def read_in_bulk(schema_files: typing.List[Path]) -> int:
+    return sum(
+        len(raw) for _, raw in AvroSchemaDirectoryParser.read_files(schema_files)
+    )
+
+
+def timed(
+    operation: typing.Callable[[], typing.Any]
+) -> typing.Tuple[float, typing.Any]:
+    start = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else FILES
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        vendored = build_tree(root, files)
+        print(f"{files:,} schemas, {vendored:,} of them vendored")
+        print(f"{'':>18} {'discover (s)':>13} {'read (s)':>9} {'schemas':>8}")
+        for name, discover, read in [
+            ("pathlib rglob", rglob, read_sequentially),
+            ("scandir walk", scandir, read_in_bulk),
+        ]:
+            discover_time, schema_files = timed(lambda: discover(root))
+            read_time, _ = timed(lambda: read(schema_files))
+            print(
+                f"{name:>18} {discover_time:13.3f} {read_time:9.3f}"
+                f" {len(schema_files):8,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Avro type conversion of wide records, with and without memoization.
+
+Run with: python -m benchmarks.type_conversion
+"""
+
+import itertools
+import json
+import timeit
+import typing
+
+from faust_avro_model_codegen.type_converter import TypeConverter
+
+FIELDS = 1_000
+SCHEMAS = 20
+REPEAT = 5
+
+# the field types of the synthetic records, repeated over and over like the
+# columns of a wide schema. the first fields define the named types
+DEFINITIONS: typing.List[typing.Any] = [
+    {
+        "type": "record",
+        "name": "Address",
+        "fields": [
+            {"name": "street", "type": "string"},
+            {"name": "zip", "type": ["null", "string"]},
+        ],
+    },
+    {"type": "enum", "name": "Status", "symbols": ["ACTIVE", "INACTIVE"]},
+    {"type": "fixed", "name": "Digest", "size": 16},
+]
+FIELD_TYPES: typing.List[typing.Any] = [
+    "string",
+    ["null", "long"],
+    ["null", {"type": "long", "logicalType": "timestamp-millis"}],
+    {"type": "string", "logicalType": "uuid"},
+    ["null", "string", "long", "double", "boolean"],
+    {"type": "array", "items": "Address"},
+    {"type": "map", "values": ["null", "Address"]},
+    {"type": "map", "values": {"type": "array", "items": ["null", "string"]}},
+    {
+        "type": "array",
+        "items": {
+            "type": "map",
+            "values": {
+                "type": "bytes",
+                "logicalType": "decimal",
+                "precision": 12,
+                "scale": 2,
+            },
+        },
+    },
+    {"type": "array", "items": "Status"},
+    ["null", "Digest"],
+]
+
+
+def wide_record(index: int) -> typing.Dict[str, typing.Any]:
+    types = itertools.chain(DEFINITIONS, itertools.cycle(FIELD_TYPES))
+    return {
+        "type": "record",
+        "name": f"Wide{index}",
+        "namespace": "bench.wide",
+        "fields": [
+            {"name": f"field_{n}", "type": t} for n, t in zip(range(FIELDS), types)
+        ],
+    }
+
+
+def convert(schemas: typing.List[typing.Dict[str, typing.Any]], memoize: bool) -> None:
+    for schema in schemas:
+        TypeConverter(memoize=memoize).model(schema)
+
+
+def main() -> None:
+    # decoded like schema files, so the repeated types are separate objects
+    schemas = [json.loads(json.dumps(wide_record(n))) for n in range(SCHEMAS)]
+    print(f"{SCHEMAS} records of {FIELDS:,} fields")
+    print(f"{'memoized':>9} {'time (s)':>9} {'fields/s':>12}")
+    for memoize in (False, True):
+        best = min(
+            timeit.repeat(lambda: convert(schemas, memoize), number=1, repeat=REPEAT)
+        )
+        print(f"{str(memoize):>9} {best:9.3f} {SCHEMAS * FIELDS / best:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,24 @@
-from .schema_dir_parser import AvroSchemaDirectoryParser
-from .template_writer import TemplateWriter
+import importlib
+import typing
+
+if typing.TYPE_CHECKING:
+    from .schema_dir_parser import AvroSchemaDirectoryParser
+    from .template_writer import TemplateWriter
+
+# the public classes pull in the formatting stack, so they are only imported
+# when they are used rather than whenever a submodule is
+_EXPORTS = {
+    "AvroSchemaDirectoryParser": "schema_dir_parser",
+    "TemplateWriter": "template_writer",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> typing.Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
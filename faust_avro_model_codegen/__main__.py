@@ -1,15 +1,131 @@
+import contextlib
+import json
+import typing
 from pathlib import Path
 
-import httpx
 import typer
+from rich import print
 
-from faust_avro_model_codegen import TemplateWriter
-from faust_avro_model_codegen.models_generator import FaustAvroModelGen
-from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
-from faust_avro_model_codegen.schema_verifier import SchemaVerifier
+from faust_avro_model_codegen import profiling
+from faust_avro_model_codegen.code_formatter import CodeFormatter
+from faust_avro_model_codegen.code_layout import LINE_LENGTH
+from faust_avro_model_codegen.manifest import BuildManifest
+from faust_avro_model_codegen.schema_dir_parser import (
+    AvroSchemaDirectoryParser,
+    DuplicateSchemaNameError,
+)
 from faust_avro_model_codegen.settings import Settings
 from faust_avro_model_codegen.template_renderer import TemplateRenderer
-from faust_avro_model_codegen.types import SchemaData
+
+if typing.TYPE_CHECKING:
+    from faust_avro_model_codegen.schema_verifier import SchemaVerifier
+    from faust_avro_model_codegen.template_writer import TemplateWriter
+
+
+def schema_verifier(config: Settings, refresh: bool) -> "SchemaVerifier":
+    # the Schema Registry client is only imported by runs that verify
+    import httpx
+
+    from faust_avro_model_codegen.schema_verifier import SchemaVerifier
+    from faust_avro_model_codegen.verification_cache import VerificationCache
+
+    return SchemaVerifier(
+        schema_registry_url=config.schema_registry_url,
+        client=lambda: httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=config.verify_concurrency)
+        ),
+        max_concurrency=config.verify_concurrency,
+        timeout=config.verify_timeout,
+        retries=config.verify_retries,
+        cache=VerificationCache(
+            path=config.verify_cache_file,
+            schema_registry_url=config.schema_registry_url,
+            ttl=config.verify_cache_ttl,
+        ),
+        refresh=refresh,
+    )
+
+
+def discover(config: Settings) -> typing.List[Path]:
+    with profiling.stage("discover"):
+        return AvroSchemaDirectoryParser.discover(
+            config.schema_roots, config.schema_include, config.schema_exclude
+        )
+
+
+@contextlib.contextmanager
+def profiled_run(
+    profile: bool,
+    profile_output: Path,
+    slowest: int,
+    cprofile: typing.Optional[Path],
+) -> typing.Iterator[None]:
+    with contextlib.ExitStack() as stack:
+        if cprofile is not None:
+            stack.enter_context(profiling.cprofiled(cprofile))
+        if not profile:
+            yield
+            return
+        profiler = stack.enter_context(profiling.profiled(profiling.Profiler()))
+        try:
+            yield
+        finally:
+            report = profiler.report(slowest)
+            profiling.print_report(report)
+            profile_output.write_text(json.dumps(report, indent=2) + "\n")
+            print(
+                f"[italic green]Wrote the timings to [bold yellow]{profile_output}[/][/]"
+            )
+
+
+def watch_schemas(
+    config: Settings,
+    renderer: TemplateRenderer,
+    writer: "TemplateWriter",
+    manifest: BuildManifest,
+) -> None:
+    from faust_avro_model_codegen.watch import IncrementalBuild, poll_changes, scan
+
+    build = IncrementalBuild(
+        renderer, writer, config.output_path, layout=config.output_layout
+    )
+    schema_files = discover(config)
+    known = scan(schema_files)
+    build.update(known)
+    manifest.record(config.output_path)
+    reported: typing.Optional[str] = None
+
+    def rediscover() -> typing.List[Path]:
+        # a file that takes an existing schema's name is reported once, and
+        # the schemas found before it keep being watched until it's renamed
+        nonlocal schema_files, reported
+        try:
+            schema_files = discover(config)
+        except DuplicateSchemaNameError as e:
+            if str(e) != reported:
+                print(f"[italic red]Could not regenerate {config.output_path}: {e}[/]")
+            reported = str(e)
+        else:
+            reported = None
+        return schema_files
+
+    roots = ", ".join(str(root) for root in config.schema_roots)
+    print(f"[italic green]Watching [bold yellow]{roots}[/] for changes[/]")
+    try:
+        for changes in poll_changes(rediscover, known=known):
+            try:
+                build.update(changes.changed, changes.removed)
+            except Exception as e:
+                print(f"[italic red]Could not regenerate {config.output_path}: {e}[/]")
+                continue
+            manifest.schema_files = build.schema_files
+            manifest.record(config.output_path)
+            print(
+                f"[italic green]Regenerated [bold yellow]{config.output_path}[/]: "
+                f"{len(changes.changed)} changed, {len(changes.removed)} removed[/]"
+            )
+    except KeyboardInterrupt:
+        pass
 
 
 def main(
@@ -19,22 +135,148 @@ def main(
         "-v",
         help="Verify schemas against Schema Registry",
         is_flag=True,
-    )
+    ),
+    check: bool = typer.Option(
+        False,
+        "--check",
+        help="Exit with a non-zero status if the generated module is out of date, without writing it",
+        is_flag=True,
+    ),
+    no_format: bool = typer.Option(
+        False,
+        "--no-format",
+        help="Write the rendered module as is, without running isort, autoflake and black",
+        is_flag=True,
+    ),
+    verify_offline: bool = typer.Option(
+        False,
+        "--verify-offline",
+        help="Check the generated schemas against the schema files, without Schema Registry",
+        is_flag=True,
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Ignore cached verification results and check every schema against Schema Registry",
+        is_flag=True,
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker processes used to parse and convert schemas",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        "-w",
+        help="Keep running and regenerate the schemas that change in the schema directory",
+        is_flag=True,
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print how long each stage and the slowest schemas took, and write the timings as JSON",
+        is_flag=True,
+    ),
+    profile_output: Path = typer.Option(
+        Path("faust_avro_model_codegen.profile.json"),
+        "--profile-output",
+        help="Where --profile writes the timings",
+    ),
+    slowest: int = typer.Option(
+        profiling.SLOWEST_SCHEMAS,
+        "--slowest",
+        min=0,
+        help="Number of the slowest schemas --profile reports",
+    ),
+    cprofile: typing.Optional[Path] = typer.Option(
+        None,
+        "--cprofile",
+        help="Write a cProfile profile of the whole run to this file",
+    ),
 ):
+    with profiled_run(profile, profile_output, slowest, cprofile):
+        run(verify, verify_offline, check, no_format, refresh, jobs, watch)
+
+
+def run(
+    verify: bool,
+    verify_offline: bool,
+    check: bool,
+    no_format: bool,
+    refresh: bool,
+    jobs: int,
+    watch: bool,
+) -> None:
     config = Settings.from_toml()
-    schemas = AvroSchemaDirectoryParser.parse_dir(config.schema_dir)
-    app = FaustAvroModelGen(
-        renderer=TemplateRenderer.from_current_directory(),
-        verifier=SchemaVerifier(
-            schema_registry_url=config.schema_registry_url,
-            client=lambda: httpx.Client(),
+    schema_files = discover(config)
+    if verify_offline:
+        from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+
+        FaustAvroModelGen.verify_schemas_offline(
+            AvroSchemaDirectoryParser.parse_files(schema_files)
+        )
+    formatter = CodeFormatter()
+    line_length = formatter.line_length(config.output_path)
+    # the templates are laid out for black's default line length, shorter
+    # lines are left to black even without formatting
+    format_output = not no_format or line_length < LINE_LENGTH
+    manifest = BuildManifest(
+        manifest_file=config.manifest_path,
+        schema_files=schema_files,
+        template_files=TemplateRenderer.template_files(config.template_dirs),
+        settings_digest=config.digest(
+            format_output=format_output, line_length=line_length
         ),
-        writer=TemplateWriter(),
     )
-    app.generate_module(schemas, outfile=config.outfile)
+
+    if check:
+        if not manifest.is_up_to_date(config.output_path):
+            print(f"[italic red][bold yellow]{config.output_path}[/] is out of date[/]")
+            raise typer.Exit(code=1)
+        print(f"[italic green][bold yellow]{config.output_path}[/] is up to date[/]")
+        return
+
+    from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+    from faust_avro_model_codegen.template_writer import TemplateWriter
+
+    renderer = TemplateRenderer.from_current_directory(
+        compact=config.compact,
+        frozen=config.frozen,
+        template_dirs=config.template_dirs,
+        line_length=line_length,
+    )
+    writer = TemplateWriter(formatter=formatter, format_output=format_output)
+    if watch:
+        watch_schemas(config, renderer, writer, manifest)
+        return
+
+    app = FaustAvroModelGen(
+        renderer=renderer,
+        verifier=schema_verifier(config, refresh) if verify else None,
+        writer=writer,
+    )
+    if config.output_layout == "module":
+        app.generate_module_from_files(
+            schema_files, outfile=config.outfile, manifest=manifest, jobs=jobs
+        )
+    else:
+        app.generate_package_from_files(
+            schema_files,
+            package_dir=config.output_path,
+            layout=config.output_layout,
+            manifest=manifest,
+            jobs=jobs,
+        )
 
     if verify:
-        app.verify_schemas(schemas, config.faust_app_models_module)
+        app.verify_schemas(
+            AvroSchemaDirectoryParser.parse_files(schema_files),
+            config.faust_app_models_module,
+        )
 
 
-typer.run(main)
+if __name__ == "__main__":
+    typer.run(main)
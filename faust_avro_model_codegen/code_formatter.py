@@ -0,0 +1,126 @@
+import os
+import pathlib
+import sys
+import typing
+
+import tomlkit
+
+from faust_avro_model_codegen import profiling
+from faust_avro_model_codegen.code_layout import LINE_LENGTH
+
+if typing.TYPE_CHECKING:
+    import black
+    import isort
+
+ISORT_OPTIONS: typing.Dict[str, typing.Any] = dict(
+    remove_redundant_aliases=True,
+    include_trailing_comma=True,
+    group_by_package=True,
+    float_to_top=True,
+    dedup_headings=True,
+    force_sort_within_sections=True,
+    quiet=True,
+)
+
+
+def black_config_file(directory: pathlib.Path) -> typing.Optional[pathlib.Path]:
+    # the pyproject.toml black reads, found the way black finds it: in the
+    # closest folder that is a repository root or configures black
+    root = directory.resolve()
+    for root in (root, *root.parents):
+        if (root / ".git").exists() or (root / ".hg").is_dir():
+            break
+        pyproject_toml = root / "pyproject.toml"
+        if pyproject_toml.is_file() and "black" in load_toml(pyproject_toml).get(
+            "tool", {}
+        ):
+            break
+    if (root / "pyproject.toml").is_file():
+        return root / "pyproject.toml"
+    if sys.platform == "win32":
+        user_config = pathlib.Path.home() / ".black"
+    else:
+        config_home = os.environ.get("XDG_CONFIG_HOME", "~/.config")
+        user_config = pathlib.Path(config_home).expanduser() / "black"
+    return user_config if user_config.is_file() else None
+
+
+def load_toml(path: pathlib.Path) -> typing.Dict[str, typing.Any]:
+    return tomlkit.loads(path.read_bytes()).unwrap()
+
+
+class CodeFormatter:
+    def __init__(self) -> None:
+        self._isort_configs: typing.Dict[pathlib.Path, "isort.Config"] = {}
+        self._black_modes: typing.Dict[pathlib.Path, "black.Mode"] = {}
+        self._line_lengths: typing.Dict[pathlib.Path, int] = {}
+
+    def format(self, source: str, filepath: pathlib.Path) -> str:
+        # the formatters are a large part of startup, and --no-format runs
+        # never need them
+        import autoflake  # type: ignore
+        import black
+        import isort
+
+        directory = self.project_directory(filepath)
+        with profiling.stage("isort"):
+            source = isort.code(source, config=self.isort_config(directory))
+        with profiling.stage("autoflake"):
+            source = autoflake.fix_code(source, remove_all_unused_imports=True)
+        with profiling.stage("black"):
+            return black.format_str(source, mode=self.black_mode(directory))
+
+    def line_length(self, filepath: pathlib.Path) -> int:
+        # the rendered code is laid out for this length, so it is left as it
+        # is by black whether or not the output is formatted. it is read
+        # without importing black, which --check and --no-format runs skip
+        directory = self.project_directory(filepath)
+        if directory not in self._line_lengths:
+            config_file = black_config_file(directory)
+            config = (
+                load_toml(config_file).get("tool", {}).get("black", {})
+                if config_file
+                else {}
+            )
+            self._line_lengths[directory] = int(
+                config.get("line-length", config.get("line_length", LINE_LENGTH))
+            )
+        return self._line_lengths[directory]
+
+    @staticmethod
+    def project_directory(filepath: pathlib.Path) -> pathlib.Path:
+        directory = filepath.absolute().parent
+        while not directory.exists():
+            directory = directory.parent
+        return directory
+
+    def isort_config(self, directory: pathlib.Path) -> "isort.Config":
+        import isort
+
+        if directory not in self._isort_configs:
+            self._isort_configs[directory] = isort.Config(
+                settings_path=str(directory), **ISORT_OPTIONS
+            )
+        return self._isort_configs[directory]
+
+    def black_mode(self, directory: pathlib.Path) -> "black.Mode":
+        if directory not in self._black_modes:
+            self._black_modes[directory] = self._black_mode_from_project(directory)
+        return self._black_modes[directory]
+
+    @staticmethod
+    def _black_mode_from_project(directory: pathlib.Path) -> "black.Mode":
+        import black
+
+        pyproject_toml = black.find_pyproject_toml((str(directory),))
+        config = black.parse_pyproject_toml(pyproject_toml) if pyproject_toml else {}
+        return black.Mode(
+            target_versions={
+                black.TargetVersion[version.upper()]
+                for version in config.get("target_version", [])
+            },
+            line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+            string_normalization=not config.get("skip_string_normalization", False),
+            magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+            preview=config.get("preview", False),
+        )
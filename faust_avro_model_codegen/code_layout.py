@@ -0,0 +1,250 @@
+import contextlib
+import contextvars
+import dataclasses
+import typing
+
+# black's default, a project can configure another one
+LINE_LENGTH = 88
+INDENT = "    "
+
+_line_length: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "line_length", default=LINE_LENGTH
+)
+
+
+def max_line_length() -> int:
+    return _line_length.get()
+
+
+@contextlib.contextmanager
+def line_length(length: int) -> typing.Iterator[None]:
+    # the code laid out within wraps at the line length black is run with
+    token = _line_length.set(length)
+    try:
+        yield
+    finally:
+        _line_length.reset(token)
+
+
+@dataclasses.dataclass
+class Atom:
+    text: str
+
+    def flat(self) -> str:
+        return self.text
+
+
+@dataclasses.dataclass
+class Bracketed:
+    name: str
+    opening: str
+    closing: str
+    items: typing.List[typing.Tuple[str, "Node"]]
+    is_collection: bool
+
+    def flat(self) -> str:
+        body = ", ".join(prefix + node.flat() for prefix, node in self.items)
+        return f"{self.name}{self.opening}{body}{self.closing}"
+
+
+@dataclasses.dataclass
+class Clauses:
+    # an expression black splits before each clause when it doesn't fit, like
+    # a comprehension before "for" or a conditional before "if" and "else".
+    # black wraps a conditional that doesn't fit in parentheses
+    parts: typing.List[typing.Tuple[str, "Node"]]
+    parenthesized: bool = False
+
+    def flat(self) -> str:
+        return " ".join(prefix + node.flat() for prefix, node in self.parts)
+
+
+Node: typing.TypeAlias = typing.Union[Atom, Bracketed, Clauses]
+
+
+def call(name: str, kwargs: typing.List[typing.Tuple[str, Node]]) -> Bracketed:
+    return Bracketed(
+        name=name,
+        opening="(",
+        closing=")",
+        items=[(f"{key}=", value) for key, value in kwargs],
+        is_collection=False,
+    )
+
+
+def dict_literal(items: typing.List[typing.Tuple[str, Node]]) -> Bracketed:
+    return Bracketed(name="", opening="{", closing="}", items=items, is_collection=True)
+
+
+def string_literal(value: typing.Union[str, bytes]) -> str:
+    # mirrors black's quote normalisation: double quotes unless that needs
+    # more escaping than the single-quoted form
+    prefix, single = (
+        ("b", repr(value)[1:]) if isinstance(value, bytes) else ("", repr(value))
+    )
+    if single[0] == '"':
+        return prefix + single
+    body = single[1:-1]
+    double_body = body.replace("\\'", "'").replace('"', '\\"')
+    if double_body.count('\\"') > body.count("\\'"):
+        return prefix + single
+    return f'{prefix}"{double_body}"'
+
+
+def literal(value: typing.Any) -> Node:
+    match value:
+        case dict():
+            return dict_literal(
+                [(f"{string_literal(str(k))}: ", literal(v)) for k, v in value.items()]
+            )
+        case list() | tuple():
+            return Bracketed(
+                name="",
+                opening="[",
+                closing="]",
+                items=[("", literal(v)) for v in value],
+                is_collection=True,
+            )
+        case str() | bytes():
+            return Atom(string_literal(value))
+        case _:
+            return Atom(repr(value))
+
+
+def type_annotation(text: str) -> Node:
+    node, rest = _parse_type(text.replace(" ", ""))
+    if rest:
+        raise ValueError(f"Unable to parse type annotation {text!r}")
+    return node
+
+
+def _parse_type(text: str) -> typing.Tuple[Node, str]:
+    name_end = len(text)
+    for index, char in enumerate(text):
+        if char in "[](),":
+            name_end = index
+            break
+    name, rest = text[:name_end], text[name_end:]
+    if rest.startswith("("):
+        return _parse_call(name, rest)
+    if not rest.startswith("["):
+        return Atom(name), rest
+
+    items: typing.List[typing.Tuple[str, Node]] = []
+    rest = rest[1:]
+    while not rest.startswith("]"):
+        item, rest = _parse_type(rest)
+        items.append(("", item))
+        rest = rest[1:] if rest.startswith(",") else rest
+    return Bracketed(name, "[", "]", items, is_collection=False), rest[1:]
+
+
+def _parse_call(name: str, text: str) -> typing.Tuple[Node, str]:
+    # types like types.condecimal(max_digits=10, decimal_places=2) only take
+    # keyword arguments with literal values
+    end = text.find(")")
+    arguments = [a.partition("=") for a in text[1:end].split(",") if a]
+    if end < 0 or any(not key or not value for key, _, value in arguments):
+        return Atom(name), text
+    return (
+        call(name, [(key, Atom(value)) for key, _, value in arguments]),
+        text[end + 1 :],
+    )
+
+
+def layout(node: Node, prefix: str = "", suffix: str = "", depth: int = 0) -> str:
+    return "\n".join(_layout_lines(node, prefix, suffix, depth))
+
+
+def annotated_assignment(
+    target: str, annotation: Node, value: Node, depth: int = 0
+) -> str:
+    indent = INDENT * depth
+    lhs = f"{target}: {annotation.flat()} = "
+    if (
+        isinstance(annotation, Atom)
+        or not annotation.items
+        or len(f"{indent}{lhs}(") <= max_line_length()
+    ):
+        return layout(value, lhs, "", depth)
+
+    # the left hand side alone is too long, so black splits the annotation
+    head = f"{indent}{target}: {annotation.name}{annotation.opening}"
+    tail_prefix = f"{annotation.closing} = "
+    return "\n".join(
+        [
+            head,
+            *_body_lines(annotation, depth),
+            *_layout_lines(value, tail_prefix, "", depth),
+        ]
+    )
+
+
+def _layout_lines(node: Node, prefix: str, suffix: str, depth: int) -> typing.List[str]:
+    indent = INDENT * depth
+    line = f"{indent}{prefix}{node.flat()}{suffix}"
+    if len(line) <= max_line_length():
+        return [line]
+    if isinstance(node, Clauses):
+        if node.parenthesized:
+            # within its parentheses it is only split if it still doesn't fit
+            body = [f"{indent}{INDENT}{node.flat()}"]
+            if len(body[0]) > max_line_length():
+                body = _clause_lines(node, depth + 1)
+            return [f"{indent}{prefix}(", *body, f"{indent}){suffix}"]
+        lines = _clause_lines(node, depth)
+        lines[0] = f"{indent}{prefix}{lines[0].lstrip()}"
+        return [*lines[:-1], lines[-1] + suffix]
+    if (
+        (isinstance(node, Atom) or not node.items)
+        and prefix.endswith(" = ")
+        and not _has_brackets(prefix + node.flat().removesuffix("()"))
+    ):
+        # black wraps an attribute access or a call without arguments on the
+        # right hand side in parentheses. with other brackets on the line it
+        # may split at those instead
+        return [
+            f"{indent}{prefix}(",
+            f"{indent}{INDENT}{node.flat()}",
+            f"{indent}){suffix}",
+        ]
+    if isinstance(node, Atom) or not node.items:
+        return [line]
+
+    head = f"{indent}{prefix}{node.name}{node.opening}"
+    tail = f"{indent}{node.closing}{suffix}"
+    if len(head) > max_line_length() and prefix.endswith(" = "):
+        # like black, wrap the right hand side of an assignment in parentheses
+        # when splitting at its own brackets still leaves the head too long
+        return [
+            f"{indent}{prefix}(",
+            *_layout_lines(node, "", "", depth + 1),
+            f"{indent}){suffix}",
+        ]
+    return [head, *_body_lines(node, depth), tail]
+
+
+def _has_brackets(text: str) -> bool:
+    return any(bracket in text for bracket in "([{")
+
+
+def _body_lines(node: Bracketed, depth: int) -> typing.List[str]:
+    if not node.is_collection or len(node.items) == 1:
+        body = INDENT * (depth + 1) + ", ".join(p + n.flat() for p, n in node.items)
+        if len(body) <= max_line_length():
+            return [body]
+
+    lines = []
+    for item_prefix, item in node.items:
+        # a comprehension fills its brackets and takes no trailing comma
+        suffix = "" if isinstance(item, Clauses) else ","
+        lines += _layout_lines(item, item_prefix, suffix, depth + 1)
+    return lines
+
+
+def _clause_lines(node: Clauses, depth: int) -> typing.List[str]:
+    return [
+        line
+        for prefix, part in node.parts
+        for line in _layout_lines(part, prefix, "", depth)
+    ]
@@ -0,0 +1,26 @@
+import json
+import typing
+
+from fastavro.schema import fingerprint, parse_schema, to_parsing_canonical_form
+
+DEFAULT_ALGORITHM = "CRC-64-AVRO"
+
+SchemaSource: typing.TypeAlias = typing.Union[str, dict[str, typing.Any]]
+
+
+def parsing_canonical_form(schema: SchemaSource, expand: bool = False) -> str:
+    if isinstance(schema, str):
+        schema = json.loads(schema)
+    if expand:
+        # named types are written out wherever they are used rather than only
+        # where they are defined, so it doesn't matter where that is
+        schema = parse_schema(schema, named_schemas={}, expand=True)
+    return to_parsing_canonical_form(schema)
+
+
+def form_fingerprint(canonical_form: str, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    return fingerprint(canonical_form, algorithm)
+
+
+def schema_fingerprint(schema: SchemaSource, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    return form_fingerprint(parsing_canonical_form(schema), algorithm)
@@ -0,0 +1,58 @@
+import functools
+import json
+import typing
+
+JsonLoads: typing.TypeAlias = typing.Callable[[typing.Union[bytes, str]], typing.Any]
+JsonBackend: typing.TypeAlias = typing.Literal["auto", "json", "orjson"]
+
+# orjson turns integers wider than 64 bits into floats, documents with digit
+# runs that long (rare in schemas) are decoded by the json module instead.
+# translating every digit to 0 finds such runs much faster than a regex
+DIGITS = bytes.maketrans(b"123456789", b"000000000")
+WIDE_NUMBER = b"0" * 19
+
+
+class JsonBackendError(Exception):
+    pass
+
+
+def orjson_loads(raw: typing.Union[bytes, str]) -> typing.Any:
+    # imported on use, like the other optional and heavy dependencies
+    import orjson
+
+    if isinstance(raw, str):
+        raw = raw.encode()
+    if WIDE_NUMBER in raw.translate(DIGITS):
+        return json.loads(raw)
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # orjson is stricter about a few documents the json module accepts,
+        # such as lone surrogates, so those decode the same way as before
+        return json.loads(raw)
+
+
+def orjson_available() -> bool:
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache
+def json_loads(backend: JsonBackend = "auto") -> JsonLoads:
+    match backend:
+        case "json":
+            return json.loads
+        case "orjson":
+            if not orjson_available():
+                raise JsonBackendError(
+                    "The orjson backend needs orjson, install faust-avro-model-codegen[orjson]."
+                )
+            return orjson_loads
+        case "auto":
+            return orjson_loads if orjson_available() else json.loads
+        case never:
+            # typing.assert_never needs python 3.11
+            raise JsonBackendError(f"Unknown json backend {never!r}.")
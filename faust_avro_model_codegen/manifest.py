@@ -0,0 +1,156 @@
+import dataclasses
+import hashlib
+import json
+import pathlib
+import typing
+from importlib import metadata
+
+LIBRARY_NAME = "faust-avro-model-codegen"
+MANIFEST_FORMAT = 1
+
+
+def library_version() -> str:
+    try:
+        return metadata.version(LIBRARY_NAME)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@dataclasses.dataclass
+class FileFingerprint:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    @classmethod
+    def from_path(
+        cls, path: pathlib.Path, known: typing.Optional["FileFingerprint"] = None
+    ) -> "FileFingerprint":
+        if path.is_dir():
+            return cls.from_directory(path, known)
+        stat = path.stat()
+        # an unchanged size and mtime means the file was not touched, so the
+        # digest from the previous run can be trusted without re-reading it
+        if (
+            known is not None
+            and known.size == stat.st_size
+            and known.mtime_ns == stat.st_mtime_ns
+        ):
+            return known
+        return cls(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=hashlib.sha256(path.read_bytes()).hexdigest(),
+        )
+
+    @classmethod
+    def from_directory(
+        cls, path: pathlib.Path, known: typing.Optional["FileFingerprint"] = None
+    ) -> "FileFingerprint":
+        files = sorted(path.rglob("*.py"))
+        stats = [f.stat() for f in files]
+        size = sum(stat.st_size for stat in stats)
+        mtime_ns = max((stat.st_mtime_ns for stat in stats), default=0)
+        if known is not None and known.size == size and known.mtime_ns == mtime_ns:
+            return known
+        digest = hashlib.sha256()
+        for f in files:
+            digest.update(f.relative_to(path).as_posix().encode())
+            digest.update(hashlib.sha256(f.read_bytes()).digest())
+        return cls(size=size, mtime_ns=mtime_ns, sha256=digest.hexdigest())
+
+
+@dataclasses.dataclass
+class Manifest:
+    library_version: str
+    settings: str
+    templates: dict[str, FileFingerprint]
+    schemas: dict[str, FileFingerprint]
+    output: FileFingerprint
+    format: int = MANIFEST_FORMAT
+
+    @classmethod
+    def from_json(cls, manifest_json: str) -> "Manifest":
+        data = json.loads(manifest_json)
+        return cls(
+            library_version=data["library_version"],
+            settings=data["settings"],
+            templates={k: FileFingerprint(**v) for k, v in data["templates"].items()},
+            schemas={k: FileFingerprint(**v) for k, v in data["schemas"].items()},
+            output=FileFingerprint(**data["output"]),
+            format=data["format"],
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self), indent=2, sort_keys=True)
+
+    def same_inputs(self, other: "Manifest") -> bool:
+        return (
+            self.format == other.format
+            and self.library_version == other.library_version
+            and self.settings == other.settings
+            and _digests(self.templates) == _digests(other.templates)
+            and _digests(self.schemas) == _digests(other.schemas)
+        )
+
+
+def _digests(files: dict[str, FileFingerprint]) -> dict[str, str]:
+    return {name: fingerprint.sha256 for name, fingerprint in files.items()}
+
+
+class BuildManifest:
+    def __init__(
+        self,
+        manifest_file: pathlib.Path,
+        schema_files: typing.Iterable[pathlib.Path],
+        template_files: typing.Iterable[pathlib.Path],
+        settings_digest: str,
+    ) -> None:
+        self.manifest_file = manifest_file
+        self.schema_files = list(schema_files)
+        self.template_files = list(template_files)
+        self.settings_digest = settings_digest
+
+    def load(self) -> typing.Optional[Manifest]:
+        try:
+            return Manifest.from_json(self.manifest_file.read_text())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def is_up_to_date(self, outfile: pathlib.Path) -> bool:
+        previous = self.load()
+        if previous is None or not outfile.exists():
+            return False
+        current = self._fingerprint(outfile, previous)
+        return (
+            current.same_inputs(previous)
+            and current.output.sha256 == previous.output.sha256
+        )
+
+    def record(self, outfile: pathlib.Path) -> None:
+        manifest = self._fingerprint(outfile, self.load())
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_file.write_text(manifest.to_json())
+
+    def _fingerprint(
+        self, outfile: pathlib.Path, previous: typing.Optional[Manifest]
+    ) -> Manifest:
+        known_templates = previous.templates if previous else {}
+        known_schemas = previous.schemas if previous else {}
+        return Manifest(
+            library_version=library_version(),
+            settings=self.settings_digest,
+            templates={
+                t.name: FileFingerprint.from_path(t, known_templates.get(t.name))
+                for t in self.template_files
+            },
+            schemas={
+                s.as_posix(): FileFingerprint.from_path(
+                    s, known_schemas.get(s.as_posix())
+                )
+                for s in self.schema_files
+            },
+            output=FileFingerprint.from_path(
+                outfile, previous.output if previous else None
+            ),
+        )
@@ -1,12 +1,15 @@
 import importlib
 import pathlib
 import typing
-from functools import reduce
 
-import isort
-from plumbum.cmd import autoflake, black  # type: ignore
-
-from .schema_verifier import SchemaVerifier
+from . import profiling
+from .manifest import BuildManifest
+from .parallel import (
+    render_package_files,
+    render_schema_files,
+    stream_schema_files,
+)
+from .schema_graph import NamedTypeJson, SchemaGraph
 from .template_renderer import TemplateRenderer, RenderedTemplate
 from .template_writer import TemplateWriter
 from .types import (
@@ -14,13 +17,17 @@ from .types import (
     SchemaData,
 )
 
+if typing.TYPE_CHECKING:
+    from .offline_verifier import OfflineVerificationReport
+    from .schema_verifier import SchemaVerifier
+
 
 class FaustAvroModelGen:
 
     def __init__(
         self,
         renderer: TemplateRenderer,
-        verifier: SchemaVerifier,
+        verifier: typing.Optional["SchemaVerifier"],
         writer: TemplateWriter,
     ):
         self.renderer = renderer
@@ -28,25 +35,118 @@ class FaustAvroModelGen:
         self.writer = writer
 
     def generate_module(
-        self, schemas: typing.Iterable[SchemaData], outfile: pathlib.Path
-    ) -> None:
-        codegen_results_from_schemas = (
-            CodeGenResultData.from_schema_data(s) for s in schemas
+        self,
+        schemas: typing.Iterable[SchemaData],
+        outfile: pathlib.Path,
+        manifest: typing.Optional[BuildManifest] = None,
+    ) -> bool:
+        return self._generate(
+            lambda: self.write(
+                outfile, self.renderer.render(self.convert_schemas(schemas))
+            ),
+            outfile,
+            manifest,
         )
-        accum_codegen_data = reduce(
-            lambda s, t: s + t,
-            codegen_results_from_schemas,
-            CodeGenResultData.empty(),
+
+    def generate_module_from_files(
+        self,
+        schema_files: typing.Sequence[pathlib.Path],
+        outfile: pathlib.Path,
+        manifest: typing.Optional[BuildManifest] = None,
+        jobs: int = 1,
+    ) -> bool:
+        if jobs == 1:
+            return self._generate(
+                lambda: self.writer.write_stream(
+                    outfile, stream_schema_files(self.renderer, schema_files)
+                ),
+                outfile,
+                manifest,
+            )
+        return self._generate(
+            lambda: self.write(
+                outfile, render_schema_files(self.renderer, schema_files, jobs=jobs)
+            ),
+            outfile,
+            manifest,
         )
-        self.write(outfile, self.renderer.render(accum_codegen_data))
+
+    def generate_package_from_files(
+        self,
+        schema_files: typing.Sequence[pathlib.Path],
+        package_dir: pathlib.Path,
+        layout: str,
+        manifest: typing.Optional[BuildManifest] = None,
+        jobs: int = 1,
+    ) -> bool:
+        return self._generate(
+            lambda: self.writer.write_package(
+                package_dir,
+                render_package_files(self.renderer, schema_files, layout, jobs=jobs),
+            ),
+            package_dir,
+            manifest,
+        )
+
+    @classmethod
+    def convert_schemas(cls, schemas: typing.Iterable[SchemaData]) -> CodeGenResultData:
+        schemas = list(schemas)
+        with profiling.stage("parse"):
+            graph = SchemaGraph.from_schemas(
+                enumerate(s.schema for s in schemas),
+                lambda index: schemas[index].schema,
+            )
+        return CodeGenResultData.concat(
+            cls.convert(schemas[index], graph.named_types([index]))
+            for index in graph.order()
+        )
+
+    @staticmethod
+    def convert(
+        schema: SchemaData, named_types: typing.Mapping[str, NamedTypeJson]
+    ) -> CodeGenResultData:
+        with profiling.stage("convert", schema.name):
+            return CodeGenResultData.from_schema_data(schema, named_types)
+
+    def _generate(
+        self,
+        write: typing.Callable[[], None],
+        output: pathlib.Path,
+        manifest: typing.Optional[BuildManifest],
+    ) -> bool:
+        if manifest is not None:
+            with profiling.stage("manifest"):
+                if manifest.is_up_to_date(output):
+                    return False
+        write()
+        if manifest is not None:
+            with profiling.stage("manifest"):
+                manifest.record(output)
+        return True
 
     def write(self, outfile: pathlib.Path, rendered_text: RenderedTemplate) -> None:
         self.writer.write(outfile, rendered_text)
 
+    @classmethod
+    def verify_schemas_offline(
+        cls, schemas: typing.Iterable[SchemaData]
+    ) -> "OfflineVerificationReport":
+        from .offline_verifier import OfflineSchemaVerifier
+
+        # converted again in memory, the written module is neither read nor
+        # imported
+        schemas = list(schemas)
+        result = cls.convert_schemas(schemas)
+        with profiling.stage("verify offline"):
+            return OfflineSchemaVerifier().verify(result, schemas)
+
     def verify_schemas(
         self, schemas: typing.Iterable[SchemaData], module_name: str
     ) -> None:
-        module = importlib.import_module(module_name)
+        if self.verifier is None:
+            raise ValueError("No schema verifier was configured")
+        with profiling.stage("import"):
+            module = importlib.import_module(module_name)
         generated_classes = {
             schema.name: getattr(module, schema.schema["name"]) for schema in schemas
         }
@@ -0,0 +1,93 @@
+import typing
+
+from .types import (
+    CodeGenResultData,
+    PythonAvroModel,
+    PythonEnumClass,
+    PythonFixedType,
+    PythonRecordClass,
+)
+
+NamedType: typing.TypeAlias = typing.Union[
+    PythonEnumClass, PythonRecordClass, PythonFixedType
+]
+
+
+class ConflictingNamedTypeError(Exception):
+    pass
+
+
+def conflict(existing: NamedType, named_type: NamedType) -> str:
+    if isinstance(existing, PythonEnumClass) and isinstance(
+        named_type, PythonEnumClass
+    ):
+        return (
+            f"{named_type.fullname} is defined with symbols "
+            f"{existing.values} and {named_type.values}"
+        )
+    return f"{named_type.fullname} has two different definitions"
+
+
+class NamedTypeRegistry:
+    # the enums, records and fixed types of one module by their full name
+    def __init__(self) -> None:
+        self._by_fullname: typing.Dict[str, NamedType] = {}
+        self._by_class_name: typing.Dict[str, NamedType] = {}
+
+    @classmethod
+    def from_dependencies(
+        cls, dependencies: typing.Iterable[typing.Union[NamedType, PythonAvroModel]]
+    ) -> "NamedTypeRegistry":
+        registry = cls()
+        for named_type in dependencies:
+            registry.register(named_type)
+        return registry
+
+    def register(self, named_type: typing.Union[NamedType, PythonAvroModel]) -> bool:
+        # false when the same definition was registered before
+        if isinstance(named_type, PythonAvroModel):
+            named_type = named_type.record_class
+        existing = self._by_fullname.get(named_type.fullname)
+        if existing is not None:
+            if existing != named_type:
+                raise ConflictingNamedTypeError(conflict(existing, named_type))
+            return False
+        # every enum and record becomes a class in one flat module, fixed
+        # types don't
+        if not isinstance(named_type, PythonFixedType):
+            clash = self._by_class_name.get(named_type.name)
+            if clash is not None:
+                raise ConflictingNamedTypeError(
+                    f"{clash.fullname} and {named_type.fullname} would both be "
+                    f"generated as class {named_type.name}"
+                )
+            self._by_class_name[named_type.name] = named_type
+        self._by_fullname[named_type.fullname] = named_type
+        return True
+
+    def register_result(
+        self, result: CodeGenResultData
+    ) -> typing.List[PythonAvroModel]:
+        # the records of the result that are defined for the first time, a
+        # record several schemas define inline is generated once
+        for named_type in [*result.dependencies, *result.fixed_types]:
+            self.register(named_type)
+        return [c for c in result.classes if self.register(c)]
+
+    def enums(self) -> typing.List[PythonEnumClass]:
+        return [t for t in self if isinstance(t, PythonEnumClass)]
+
+    def records(self) -> typing.List[PythonRecordClass]:
+        return [t for t in self if isinstance(t, PythonRecordClass)]
+
+    def fixed_types(self) -> typing.List[PythonFixedType]:
+        return [t for t in self if isinstance(t, PythonFixedType)]
+
+    def __contains__(self, fullname: object) -> bool:
+        return fullname in self._by_fullname
+
+    def __iter__(self) -> typing.Iterator[NamedType]:
+        return iter(self._by_fullname.values())
+
+    def __len__(self) -> int:
+        return len(self._by_fullname)
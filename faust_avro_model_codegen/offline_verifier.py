@@ -0,0 +1,323 @@
+import dataclasses
+import json
+import typing
+
+from rich import print
+
+from faust_avro_model_codegen.fingerprint import (
+    form_fingerprint,
+    parsing_canonical_form,
+)
+from faust_avro_model_codegen.named_types import (
+    ConflictingNamedTypeError,
+    NamedTypeRegistry,
+)
+from faust_avro_model_codegen.schema_graph import (
+    NamedTypeJson,
+    expand_references,
+    named_definitions,
+)
+from faust_avro_model_codegen.types import (
+    ARRAY,
+    ENUM,
+    MAP,
+    NULL,
+    RECORD,
+    UNION,
+    CodeGenResultData,
+    PythonAvroModel,
+    PythonType,
+    SchemaData,
+)
+
+# longer values are cut short in the differences that are reported
+DIFF_VALUE_LENGTH = 60
+# fastavro computes CRC-64-AVRO in pure python, which takes longer than the
+# whole check. the fingerprints are only compared with each other
+OFFLINE_ALGORITHM = "SHA-256"
+# the avro type each annotation of a converted field is written as, kept apart
+# from the converter's tables so that a mistake in them shows up here
+AVRO_TYPES: typing.Dict[str, typing.Any] = {
+    "bool": "boolean",
+    "types.Int32": "int",
+    "int": "long",
+    "types.Float32": "float",
+    "float": "double",
+    "bytes": "bytes",
+    "str": "string",
+    "datetime.date": {"type": "int", "logicalType": "date"},
+    "datetime.time": {"type": "int", "logicalType": "time-millis"},
+    "types.TimeMicro": {"type": "long", "logicalType": "time-micros"},
+    "datetime.datetime": {"type": "long", "logicalType": "timestamp-millis"},
+    "types.DateTimeMicro": {"type": "long", "logicalType": "timestamp-micros"},
+    "uuid.UUID": {"type": "string", "logicalType": "uuid"},
+    "types.condecimal": {"type": "bytes", "logicalType": "decimal"},
+}
+
+
+class UnknownAnnotationError(Exception):
+    pass
+
+
+class SchemaMismatchError(Exception):
+    def __init__(self, failures: typing.Optional[dict[str, str]] = None):
+        self.failures = failures or {}
+        super().__init__(
+            "\n".join(f"{name}: {reason}" for name, reason in self.failures.items())
+        )
+
+
+@dataclasses.dataclass
+class OfflineVerificationReport:
+    # fingerprints of the classes whose schema matches their source
+    verified: dict[str, str] = dataclasses.field(default_factory=dict)
+    failures: dict[str, str] = dataclasses.field(default_factory=dict)
+    # how many schemas declare the records that are declared more than once,
+    # each of them is generated once
+    repeated: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+def describe(value: typing.Any) -> str:
+    text = json.dumps(value, separators=(",", ":"))
+    if len(text) > DIFF_VALUE_LENGTH:
+        return f"{text[: DIFF_VALUE_LENGTH - 3]}..."
+    return text
+
+
+def schema_diff(
+    expected: typing.Any, actual: typing.Any, path: str
+) -> typing.List[str]:
+    # the differences between two schemas in parsing canonical form, where
+    # fields are matched by name
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.get("type") != actual.get("type"):
+            return [f"{path}: expected {describe(expected)}, got {describe(actual)}"]
+        diff = []
+        for key in [*expected, *(key for key in actual if key not in expected)]:
+            if key == "fields":
+                continue
+            if expected.get(key) != actual.get(key):
+                diff.append(
+                    f"{path}.{key}: expected {describe(expected.get(key))},"
+                    f" got {describe(actual.get(key))}"
+                )
+        if "fields" in expected or "fields" in actual:
+            diff += fields_diff(
+                expected.get("fields", []), actual.get("fields", []), path
+            )
+        return diff
+    if (
+        isinstance(expected, list)
+        and isinstance(actual, list)
+        and len(expected) == len(actual)
+    ):
+        return [
+            line
+            for index, (e, a) in enumerate(zip(expected, actual))
+            for line in schema_diff(e, a, f"{path}[{index}]")
+        ]
+    if expected != actual:
+        return [f"{path}: expected {describe(expected)}, got {describe(actual)}"]
+    return []
+
+
+def fields_diff(
+    expected: typing.List[typing.Dict[str, typing.Any]],
+    actual: typing.List[typing.Dict[str, typing.Any]],
+    path: str,
+) -> typing.List[str]:
+    expected_types = {f["name"]: f["type"] for f in expected}
+    actual_types = {f["name"]: f["type"] for f in actual}
+    diff = [
+        f"{path}: missing field {name}"
+        for name in expected_types
+        if name not in actual_types
+    ]
+    diff += [
+        f"{path}: unexpected field {name}"
+        for name in actual_types
+        if name not in expected_types
+    ]
+    shared = [name for name in expected_types if name in actual_types]
+    if shared != [name for name in actual_types if name in expected_types]:
+        diff.append(f"{path}: fields are in another order")
+    for name in shared:
+        diff += schema_diff(expected_types[name], actual_types[name], f"{path}.{name}")
+    return diff
+
+
+class ConvertedSchema:
+    # the schema the converted fields of a record stand for. a named type is
+    # written out where it is first used and referenced by name after that
+    def __init__(self, models: typing.Iterable[PythonAvroModel]) -> None:
+        self.models = {model.name: model for model in models}
+
+    def schema(self, model: PythonAvroModel) -> typing.Dict[str, typing.Any]:
+        return self.record(model, set())
+
+    def record(
+        self, model: PythonAvroModel, defined: typing.Set[str]
+    ) -> typing.Dict[str, typing.Any]:
+        defined.add(model.fullname)
+        # the class lists the fields with defaults last, the schema keeps them
+        # in the order of the embedded schema
+        order = {
+            f["name"]: i for i, f in enumerate((model.schema or {}).get("fields", []))
+        }
+        fields = sorted(model.fields, key=lambda f: order.get(f.name, len(order)))
+        schema: typing.Dict[str, typing.Any] = {"type": "record", "name": model.name}
+        if model.namespace:
+            schema["namespace"] = model.namespace
+        schema["fields"] = [
+            {"name": f.name, "type": self.avro_type(f.python_type, f.type, defined)}
+            for f in fields
+        ]
+        return schema
+
+    def avro_type(
+        self,
+        python_type: typing.Optional[PythonType],
+        annotation: str,
+        defined: typing.Set[str],
+    ) -> typing.Any:
+        if python_type is None:
+            raise UnknownAnnotationError(f"{annotation} was not converted")
+        fixed, enum = python_type.fixed, python_type.enum
+        if fixed is not None:
+            if fixed.fullname in defined:
+                return fixed.fullname
+            defined.add(fixed.fullname)
+            return {"type": "fixed", "name": fixed.fullname, "size": fixed.size}
+        if python_type.kind == ENUM and enum is not None:
+            if enum.fullname in defined:
+                return enum.fullname
+            defined.add(enum.fullname)
+            return {"type": "enum", "name": enum.fullname, "symbols": enum.values}
+        if python_type.kind == RECORD:
+            model = self.models.get(python_type.annotation)
+            if model is None:
+                raise UnknownAnnotationError(
+                    f"{python_type.annotation} is not a generated record"
+                )
+            if model.fullname in defined:
+                return model.fullname
+            return self.record(model, defined)
+        items = [
+            self.avro_type(item, item.annotation, defined) for item in python_type.items
+        ]
+        if python_type.kind == NULL:
+            return "null"
+        if python_type.kind == UNION:
+            return items
+        if python_type.kind == ARRAY:
+            return {"type": "array", "items": items[0]}
+        if python_type.kind == MAP:
+            return {"type": "map", "values": items[0]}
+        # types.condecimal(...) is the same avro type whatever its arguments
+        avro_type = AVRO_TYPES.get(python_type.annotation.partition("(")[0])
+        if avro_type is None:
+            raise UnknownAnnotationError(f"{python_type.annotation} has no avro type")
+        return avro_type
+
+
+class OfflineSchemaVerifier:
+    # checks the schemas of generated classes against the .avsc files they
+    # were generated from, without a schema registry
+    def __init__(self, algorithm: str = OFFLINE_ALGORITHM) -> None:
+        self.algorithm = algorithm
+
+    def check(
+        self, result: CodeGenResultData, sources: typing.Iterable[SchemaData]
+    ) -> OfflineVerificationReport:
+        definitions: typing.Dict[str, NamedTypeJson] = {}
+        for source in sources:
+            for name, definition in named_definitions(source.schema).items():
+                # the first declaration is the one that is generated
+                definitions.setdefault(name, definition)
+        report = OfflineVerificationReport()
+        # records are generated once however many schemas declare them, like
+        # the generated module does
+        registry = NamedTypeRegistry()
+        models: typing.List[PythonAvroModel] = []
+        for model in result.classes:
+            name = model.fullname
+            try:
+                if registry.register(model):
+                    models.append(model)
+                else:
+                    report.repeated[name] = report.repeated.get(name, 1) + 1
+            except ConflictingNamedTypeError as e:
+                report.failures[name] = str(e)
+        converted = ConvertedSchema(models)
+        for model in models:
+            name = model.fullname
+            if name in report.failures:
+                continue
+            definition = definitions.get(name)
+            if definition is None:
+                report.failures[name] = "not defined by any schema file"
+                continue
+            if model.schema is None:
+                report.failures[name] = "has no embedded schema"
+                continue
+            # the source inlines the types it references the way the generated
+            # schema does, and both are compared with every type written out
+            # wherever it is used, so it doesn't matter where it is inlined
+            expected = parsing_canonical_form(
+                expand_references(definition, definitions), expand=True
+            )
+            fingerprint = form_fingerprint(expected, self.algorithm)
+            # avro_schema() returns the embedded schema, while faust coerces
+            # and to_dict() converts the fields by their annotations, so both
+            # have to match the source
+            try:
+                actual = {
+                    "embedded schema": model.schema,
+                    "converted fields": converted.schema(model),
+                }
+            except UnknownAnnotationError as e:
+                report.failures[name] = f"{name}: {e} in the converted fields"
+                continue
+            diff = []
+            for source, schema in actual.items():
+                canonical = parsing_canonical_form(schema, expand=True)
+                if form_fingerprint(canonical, self.algorithm) != fingerprint:
+                    diff += [
+                        f"{line} in the {source}"
+                        for line in schema_diff(
+                            json.loads(expected), json.loads(canonical), name
+                        )
+                    ]
+            if diff:
+                report.failures[name] = "; ".join(diff)
+            else:
+                report.verified[name] = fingerprint
+        return report
+
+    def verify(
+        self, result: CodeGenResultData, sources: typing.Iterable[SchemaData]
+    ) -> OfflineVerificationReport:
+        report = self.check(result, sources)
+        if not report.ok:
+            print(
+                f"[bold red]{len(report.failures)} of"
+                f" {len(report.failures) + len(report.verified)}"
+                " generated schemas don't match their source:[/]"
+            )
+            for name, reason in sorted(report.failures.items()):
+                print(f"[red]  [bold yellow]{name}[/]: {reason}[/]")
+            raise SchemaMismatchError(report.failures)
+        repeated = (
+            f", {len(report.repeated)} of them declared by several schemas"
+            if report.repeated
+            else ""
+        )
+        print(
+            f"[italic green][bold yellow]{len(report.verified)}[/]"
+            f" generated schemas match their source{repeated}[/]"
+        )
+        return report
@@ -0,0 +1,412 @@
+import dataclasses
+import functools
+import graphlib
+import keyword
+import math
+import pathlib
+import re
+import typing
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from faust_avro_model_codegen import profiling
+from faust_avro_model_codegen.code_layout import LINE_LENGTH
+from faust_avro_model_codegen.named_types import NamedTypeRegistry
+from faust_avro_model_codegen.schema_graph import (
+    NamedTypeJson,
+    SchemaCycleError,
+    SchemaGraph,
+    SchemaNode,
+)
+from faust_avro_model_codegen.template_renderer import (
+    RenderedTemplate,
+    TemplateRenderer,
+    import_lines,
+    module_order,
+    relative_import,
+    required_import_names,
+)
+from faust_avro_model_codegen.types import (
+    CodeGenResultData,
+    PythonEnumClass,
+    PythonFixedType,
+    PythonRecordClass,
+    SchemaData,
+)
+
+# more chunks than workers keeps every worker busy when schema sizes vary
+CHUNKS_PER_JOB = 4
+ENUMS_MODULE = "_enums"
+PACKAGE_INIT = "__init__"
+
+
+@dataclasses.dataclass
+class RenderedChunk:
+    classes: typing.List[RenderedTemplate]
+    # the record each class was rendered from, in the same order
+    record_classes: typing.List[PythonRecordClass]
+    dependencies: typing.List[PythonEnumClass]
+    import_names: typing.Set[str]
+    # records of other chunks that the classes of this one reference
+    references: typing.Set[str] = dataclasses.field(default_factory=set)
+    fixed_types: typing.List[PythonFixedType] = dataclasses.field(default_factory=list)
+
+    @property
+    def records(self) -> typing.List[str]:
+        return [r.name for r in self.record_classes]
+
+
+def first_definitions(
+    chunk: RenderedChunk, registry: NamedTypeRegistry
+) -> RenderedChunk:
+    # drops the records an earlier chunk defined already, and fails on named
+    # types that two chunks define differently
+    for named_type in [*chunk.dependencies, *chunk.fixed_types]:
+        registry.register(named_type)
+    kept = [
+        (cls, record)
+        for cls, record in zip(chunk.classes, chunk.record_classes)
+        if registry.register(record)
+    ]
+    return dataclasses.replace(
+        chunk,
+        classes=[cls for cls, _ in kept],
+        record_classes=[record for _, record in kept],
+    )
+
+
+NamedTypes: typing.TypeAlias = typing.Optional[typing.Mapping[str, NamedTypeJson]]
+
+
+def load_schema(schema_file: pathlib.Path) -> typing.Any:
+    return SchemaData.from_bytes(schema_file.stem, schema_file.read_bytes()).schema
+
+
+def schema_nodes(schema_files: typing.List[pathlib.Path]) -> typing.List[SchemaNode]:
+    return [SchemaNode.from_schema(load_schema(f)) for f in schema_files]
+
+
+def schema_graph(
+    schema_files: typing.Iterable[pathlib.Path],
+    executor: typing.Optional[Executor] = None,
+    chunk_size: int = 1,
+) -> SchemaGraph[pathlib.Path]:
+    with profiling.stage("parse"):
+        if executor is None:
+            return SchemaGraph.from_schemas(
+                ((f, load_schema(f)) for f in schema_files), load_schema
+            )
+        # the workers decode the schemas and only send back the names they
+        # define and reference, so the parent doesn't decode every file
+        graph: SchemaGraph[pathlib.Path] = SchemaGraph(load_schema)
+        files = chunked(list(schema_files), chunk_size)
+        for chunk, nodes in zip(files, executor.map(schema_nodes, files)):
+            for schema_file, node in zip(chunk, nodes):
+                graph.add_node(schema_file, node)
+        return graph
+
+
+def convert_schema_file(
+    schema_file: pathlib.Path, named_types: NamedTypes = None
+) -> CodeGenResultData:
+    with profiling.stage("convert", schema_file.stem):
+        return CodeGenResultData.from_schema_data(
+            SchemaData.from_bytes(schema_file.stem, schema_file.read_bytes()),
+            named_types,
+        )
+
+
+def convert_schema_files(
+    schema_files: typing.Iterable[pathlib.Path], named_types: NamedTypes = None
+) -> CodeGenResultData:
+    return CodeGenResultData.concat(
+        convert_schema_file(f, named_types) for f in schema_files
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_renderer(
+    compact: bool,
+    frozen: bool,
+    template_dirs: typing.Tuple[pathlib.Path, ...],
+    line_length: int,
+) -> TemplateRenderer:
+    return TemplateRenderer.from_current_directory(
+        compact=compact,
+        frozen=frozen,
+        template_dirs=template_dirs,
+        line_length=line_length,
+    )
+
+
+def render_chunk(
+    renderer: TemplateRenderer,
+    schema_files: typing.List[pathlib.Path],
+    shared_dependencies: bool = False,
+    named_types: NamedTypes = None,
+) -> RenderedChunk:
+    code_gen_result = convert_schema_files(schema_files, named_types)
+    if shared_dependencies:
+        # the enums live in their own module, which this one imports from
+        import_names = required_import_names(
+            dataclasses.replace(code_gen_result, dependencies=[]), renderer.frozen
+        )
+    else:
+        import_names = required_import_names(code_gen_result, renderer.frozen)
+    registry = NamedTypeRegistry()
+    classes = registry.register_result(code_gen_result)
+    return RenderedChunk(
+        classes=[renderer.render(c) for c in classes],
+        record_classes=[c.record_class for c in classes],
+        dependencies=registry.enums(),
+        import_names=import_names,
+        references={
+            name
+            for c in code_gen_result.classes
+            for f in c.fields
+            for name in f.records
+        },
+        fixed_types=registry.fixed_types(),
+    )
+
+
+def _render_chunk(
+    schema_files: typing.List[pathlib.Path],
+    named_types: NamedTypes = None,
+    compact: bool = False,
+    frozen: bool = False,
+    shared_dependencies: bool = False,
+    template_dirs: typing.Tuple[pathlib.Path, ...] = (),
+    line_length: int = LINE_LENGTH,
+) -> RenderedChunk:
+    # classes are rendered in the worker: shipping strings back to the parent
+    # is far cheaper than pickling the converted dataclasses and schema dicts
+    return render_chunk(
+        _worker_renderer(compact, frozen, template_dirs, line_length),
+        schema_files,
+        shared_dependencies,
+        named_types,
+    )
+
+
+def chunked(
+    items: typing.Sequence[pathlib.Path], chunk_size: int
+) -> typing.List[typing.List[pathlib.Path]]:
+    return [
+        list(items[start : start + chunk_size])
+        for start in range(0, len(items), chunk_size)
+    ]
+
+
+def stream_schema_files(
+    renderer: TemplateRenderer, schema_files: typing.Sequence[pathlib.Path]
+) -> typing.Iterator[str]:
+    graph = schema_graph(schema_files)
+    return renderer.generate_module(
+        convert_schema_file(f, graph.named_types([f]))
+        for f in graph.order(schema_files)
+    )
+
+
+def render_schema_files(
+    renderer: TemplateRenderer,
+    schema_files: typing.Sequence[pathlib.Path],
+    jobs: int = 1,
+    chunk_size: typing.Optional[int] = None,
+) -> RenderedTemplate:
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    if jobs == 1 or len(schema_files) <= 1:
+        graph = schema_graph(schema_files)
+        # referenced records are defined before the classes that use them
+        return renderer.render(
+            CodeGenResultData.concat(
+                convert_schema_file(f, graph.named_types([f]))
+                for f in graph.order(schema_files)
+            )
+        )
+
+    chunk_size = chunk_size or max(
+        1, math.ceil(len(schema_files) / (jobs * CHUNKS_PER_JOB))
+    )
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        graph = schema_graph(schema_files, executor, chunk_size)
+        schema_files = graph.order(schema_files)
+        # map yields results in submission order, so the module is assembled
+        # in the same order as converting the files one after another
+        render_chunk = functools.partial(
+            _render_chunk,
+            compact=renderer.compact,
+            frozen=renderer.frozen,
+            template_dirs=renderer.template_dirs,
+            line_length=renderer.line_length,
+        )
+        files = chunked(schema_files, chunk_size)
+        named_types = [graph.named_types(chunk) for chunk in files]
+        # the stages of the worker processes are not timed one by one
+        with profiling.stage("workers"):
+            chunks = list(executor.map(render_chunk, files, named_types))
+
+    return assemble_module(renderer, chunks)
+
+
+def merge_chunks(chunks: typing.Sequence[RenderedChunk]) -> RenderedChunk:
+    registry = NamedTypeRegistry()
+    kept = [first_definitions(c, registry) for c in chunks]
+    return RenderedChunk(
+        classes=[cls for c in kept for cls in c.classes],
+        record_classes=[record for c in kept for record in c.record_classes],
+        dependencies=registry.enums(),
+        import_names=set().union(*(c.import_names for c in chunks)),
+        references=set().union(*(c.references for c in chunks)),
+        fixed_types=registry.fixed_types(),
+    )
+
+
+def assemble_module(
+    renderer: TemplateRenderer, chunks: typing.Sequence[RenderedChunk]
+) -> RenderedTemplate:
+    merged = merge_chunks(chunks)
+    return renderer.render_module(
+        imports=import_lines(merged.import_names),
+        deps=[renderer.render(d) for d in merged.dependencies],
+        classes=merged.classes,
+        records=merged.records,
+    )
+
+
+def module_name(name: str) -> str:
+    name = re.sub(r"\W", "_", name)
+    if name[:1].isdigit():
+        name = f"_{name}"
+    if keyword.iskeyword(name) or name in (ENUMS_MODULE, PACKAGE_INIT):
+        name = f"{name}_"
+    return name
+
+
+def schema_namespace(
+    schema_file: pathlib.Path,
+    graph: typing.Optional[SchemaGraph[pathlib.Path]] = None,
+) -> str:
+    if graph is not None and schema_file in graph:
+        namespace = graph.nodes[schema_file].namespace
+    else:
+        namespace = SchemaNode.from_schema(load_schema(schema_file)).namespace
+    return namespace or "default"
+
+
+def package_modules(
+    schema_files: typing.Iterable[pathlib.Path],
+    layout: str,
+    graph: typing.Optional[SchemaGraph[pathlib.Path]] = None,
+) -> typing.Dict[str, typing.List[pathlib.Path]]:
+    modules: typing.Dict[str, typing.List[pathlib.Path]] = {}
+    for schema_file in schema_files:
+        match layout:
+            case "schema":
+                name = module_name(schema_file.stem)
+            case "namespace":
+                name = module_name(schema_namespace(schema_file, graph))
+            case _:
+                raise ValueError(f"Unknown package layout: {layout}")
+        modules.setdefault(name, []).append(schema_file)
+    return modules
+
+
+def render_package_files(
+    renderer: TemplateRenderer,
+    schema_files: typing.Sequence[pathlib.Path],
+    layout: str,
+    jobs: int = 1,
+) -> typing.Dict[str, RenderedTemplate]:
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    if jobs == 1 or len(schema_files) <= 1:
+        graph = schema_graph(schema_files)
+        modules = package_modules(graph.order(schema_files), layout, graph)
+        chunks = [
+            render_chunk(renderer, files, True, graph.named_types(files))
+            for files in modules.values()
+        ]
+        return assemble_package(renderer, dict(zip(modules, chunks)))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunk_size = max(1, math.ceil(len(schema_files) / (jobs * CHUNKS_PER_JOB)))
+        graph = schema_graph(schema_files, executor, chunk_size)
+        modules = package_modules(graph.order(schema_files), layout, graph)
+        named_types = [graph.named_types(files) for files in modules.values()]
+        render_module = functools.partial(
+            _render_chunk,
+            compact=renderer.compact,
+            frozen=renderer.frozen,
+            shared_dependencies=True,
+            template_dirs=renderer.template_dirs,
+            line_length=renderer.line_length,
+        )
+        with profiling.stage("workers"):
+            chunks = list(executor.map(render_module, modules.values(), named_types))
+
+    return assemble_package(renderer, dict(zip(modules, chunks)))
+
+
+def check_module_imports(imports: typing.Dict[str, typing.Set[str]]) -> None:
+    try:
+        graphlib.TopologicalSorter(imports).prepare()
+    except graphlib.CycleError as error:
+        modules = " -> ".join(error.args[1])
+        raise SchemaCycleError(
+            f"Modules {modules} would import each other, records that reference "
+            'each other across namespaces need output_layout = "schema"'
+        ) from None
+
+
+def assemble_package(
+    renderer: TemplateRenderer, modules: typing.Dict[str, RenderedChunk]
+) -> typing.Dict[str, RenderedTemplate]:
+    # a record several modules define is generated in the first of them,
+    # and the others import it from there
+    registry = NamedTypeRegistry()
+    modules = {
+        name: first_definitions(chunk, registry) for name, chunk in modules.items()
+    }
+    enums = registry.enums()
+    files: typing.Dict[str, RenderedTemplate] = {}
+    exports: typing.Dict[str, str] = {}
+    if len(enums):
+        files[f"{ENUMS_MODULE}.py"] = renderer.render_module(
+            imports=import_lines({"enum"}),
+            deps=[renderer.render(e) for e in enums],
+            classes=[],
+            records=[],
+        )
+        exports.update((e.name, ENUMS_MODULE) for e in enums)
+    records = {record: name for name, c in modules.items() for record in c.records}
+    imported = {
+        name: {r for r in chunk.references if records.get(r, name) != name}
+        for name, chunk in modules.items()
+    }
+    check_module_imports(
+        {name: {records[r] for r in names} for name, names in imported.items()}
+    )
+    for name, chunk in modules.items():
+        relative: typing.Dict[str, typing.Set[str]] = {}
+        for r in imported[name]:
+            relative.setdefault(records[r], set()).add(r)
+        if chunk.dependencies:
+            relative[ENUMS_MODULE] = {d.name for d in chunk.dependencies}
+        imports = import_lines(chunk.import_names)
+        if relative:
+            imports += [
+                "",
+                *(
+                    relative_import(m, relative[m])
+                    for m in sorted(relative, key=module_order)
+                ),
+            ]
+        files[f"{name}.py"] = renderer.render_module(
+            imports=imports, deps=[], classes=chunk.classes, records=chunk.records
+        )
+        exports.update((record, name) for record in chunk.records)
+    files[f"{PACKAGE_INIT}.py"] = renderer.render_package_init(
+        exports=exports, record_modules=list(modules)
+    )
+    return files
@@ -0,0 +1,161 @@
+import contextlib
+import dataclasses
+import threading
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+# how many of the slowest schemas a report lists by default
+SLOWEST_SCHEMAS = 10
+
+
+@dataclasses.dataclass
+class StageTiming:
+    calls: int = 0
+    # time spent in the stage itself, without the stages nested in it
+    seconds: float = 0.0
+
+
+class Profiler:
+    # collects the time of each stage of a run. nested stages are subtracted
+    # from the stage around them, so the stages add up to the whole run
+    def __init__(self, clock: typing.Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.started = clock()
+        self.stages: typing.Dict[str, StageTiming] = {}
+        self.schemas: typing.Dict[typing.Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        # the formatters run in the writer's threads, each with its own stack
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def stage(
+        self, name: str, schema: typing.Optional[str] = None
+    ) -> typing.Iterator[None]:
+        nested = self._nested()
+        nested.append(0.0)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            own = elapsed - nested.pop()
+            if nested:
+                nested[-1] += elapsed
+            with self._lock:
+                timing = self.stages.setdefault(name, StageTiming())
+                timing.calls += 1
+                timing.seconds += own
+                if schema is not None:
+                    key = (name, schema)
+                    self.schemas[key] = self.schemas.get(key, 0.0) + elapsed
+
+    def schema_time(self, name: str, schema: str, seconds: float) -> None:
+        # for work that overlaps other work, like concurrent registry requests,
+        # and so isn't a stage of its own
+        with self._lock:
+            key = (name, schema)
+            self.schemas[key] = self.schemas.get(key, 0.0) + seconds
+
+    def slowest(
+        self, count: int = SLOWEST_SCHEMAS
+    ) -> typing.List[typing.Tuple[str, str, float]]:
+        timings = sorted(self.schemas.items(), key=lambda item: -item[1])
+        return [(schema, name, seconds) for (name, schema), seconds in timings][:count]
+
+    def report(self, slowest: int = SLOWEST_SCHEMAS) -> typing.Dict[str, typing.Any]:
+        return {
+            "total_seconds": self.clock() - self.started,
+            "stages": [
+                {"name": name, "calls": timing.calls, "seconds": timing.seconds}
+                for name, timing in self.stages.items()
+            ],
+            "slowest_schemas": [
+                {"schema": schema, "stage": name, "seconds": seconds}
+                for schema, name, seconds in self.slowest(slowest)
+            ],
+        }
+
+    def _nested(self) -> typing.List[float]:
+        nested = getattr(self._local, "nested", None)
+        if nested is None:
+            nested = self._local.nested = []
+        return nested
+
+
+_profiler: typing.Optional[Profiler] = None
+_disabled = contextlib.nullcontext()
+
+
+def stage(
+    name: str, schema: typing.Optional[str] = None
+) -> typing.ContextManager[None]:
+    # the hooks stay in place for every run, without a profiler they only
+    # cost this check
+    if _profiler is None:
+        return _disabled
+    return _profiler.stage(name, schema)
+
+
+def schema_time(name: str, schema: str, seconds: float) -> None:
+    if _profiler is not None:
+        _profiler.schema_time(name, schema, seconds)
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+@contextlib.contextmanager
+def profiled(profiler: Profiler) -> typing.Iterator[Profiler]:
+    global _profiler
+    previous, _profiler = _profiler, profiler
+    try:
+        yield profiler
+    finally:
+        _profiler = previous
+
+
+@contextlib.contextmanager
+def cprofiled(outfile: "pathlib.Path") -> typing.Iterator[None]:
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(outfile)
+
+
+def print_report(report: typing.Dict[str, typing.Any]) -> None:
+    from rich import print
+    from rich.table import Table
+
+    total = report["total_seconds"]
+    stages = Table(title=f"Codegen stages, {total:.3f} s in total")
+    stages.add_column("Stage")
+    stages.add_column("Calls", justify="right")
+    stages.add_column("Seconds", justify="right")
+    stages.add_column("Share", justify="right")
+    for timing in sorted(report["stages"], key=lambda t: -t["seconds"]):
+        stages.add_row(
+            timing["name"],
+            str(timing["calls"]),
+            f"{timing['seconds']:.3f}",
+            f"{timing['seconds'] / total:.1%}" if total else "-",
+        )
+    print(stages)
+    if report["slowest_schemas"]:
+        schemas = Table(title="Slowest schemas")
+        schemas.add_column("Schema")
+        schemas.add_column("Stage")
+        schemas.add_column("Seconds", justify="right")
+        for timing in report["slowest_schemas"]:
+            schemas.add_row(
+                timing["schema"], timing["stage"], f"{timing['seconds']:.4f}"
+            )
+        print(schemas)
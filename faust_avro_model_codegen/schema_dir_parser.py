@@ -1,13 +1,147 @@
+import os
 import pathlib
-from typing import Iterable
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from faust_avro_model_codegen.types import SchemaData
+if TYPE_CHECKING:
+    from faust_avro_model_codegen.json_backend import JsonLoads
+    from faust_avro_model_codegen.types import SchemaData
+
+DEFAULT_INCLUDE = ("*.avsc",)
+READ_CHUNK_SIZE = 256
+
+
+class DuplicateSchemaNameError(Exception):
+    pass
+
+
+def glob_pattern(pattern: str) -> str:
+    # "**" spans directories, "*" and "?" stay within one path segment
+    parts = re.split(r"(\*\*/|\*\*|\*|\?)", pattern)
+    tokens = {"**/": "(?:.*/)?", "**": ".*", "*": "[^/]*", "?": "[^/]"}
+    return "".join(tokens.get(part, re.escape(part)) for part in parts)
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{glob_pattern(p)})" for p in patterns))
+
+
+def max_depth(patterns: Iterable[str]) -> float:
+    depths = [float("inf") if "**" in p else p.count("/") for p in patterns]
+    return max(depths, default=0)
+
+
+def check_unique_names(schema_files: Iterable[pathlib.Path]) -> None:
+    # a schema is named after its file, and the name is also its module and
+    # its Schema Registry subject
+    seen: Dict[str, pathlib.Path] = {}
+    for schema_file in schema_files:
+        other = seen.setdefault(schema_file.stem, schema_file)
+        if other != schema_file:
+            raise DuplicateSchemaNameError(
+                f"{other} and {schema_file} are both named {schema_file.stem}"
+            )
+
+
+def read_chunk(schema_files: List[pathlib.Path]) -> List[bytes]:
+    return [schema_file.read_bytes() for schema_file in schema_files]
 
 
 class AvroSchemaDirectoryParser:
+    @classmethod
+    def schema_files(cls, schema_dir: pathlib.Path) -> List[pathlib.Path]:
+        return cls.discover([schema_dir])
+
     @staticmethod
-    def parse_dir(schema_dir: pathlib.Path) -> Iterable[SchemaData]:
+    def discover(
+        roots: Sequence[pathlib.Path],
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        exclude: Sequence[str] = (),
+    ) -> List[pathlib.Path]:
+        included = compile_patterns(include)
+        excluded = compile_patterns(exclude)
+        depth_limit = max_depth(include)
+        found: Dict[str, None] = {}
+        for root in roots:
+            # one scandir per directory, the patterns see paths relative to
+            # the root with forward slashes on every platform
+            stack: List[Tuple[str, str, int]] = [(str(root), "", 0)]
+            while stack:
+                directory, prefix, depth = stack.pop()
+                try:
+                    entries = list(os.scandir(directory))
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                for entry in entries:
+                    relative = f"{prefix}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        # "legacy", "legacy/" and "legacy/**" all exclude
+                        # the folder and everything in it
+                        if depth < depth_limit and not (
+                            excluded
+                            and (
+                                excluded.fullmatch(relative)
+                                or excluded.fullmatch(f"{relative}/")
+                            )
+                        ):
+                            stack.append((entry.path, f"{relative}/", depth + 1))
+                    elif (
+                        included
+                        and included.fullmatch(relative)
+                        and not (excluded and excluded.fullmatch(relative))
+                        and entry.is_file()
+                    ):
+                        found[entry.path] = None
+        # sorting the strings by their parts gives the order sorted() gives
+        # paths, without comparing Path objects
+        schema_files = [
+            pathlib.Path(p) for p in sorted(found, key=lambda p: p.split(os.sep))
+        ]
+        check_unique_names(schema_files)
+        return schema_files
+
+    @staticmethod
+    def read_files(
+        schema_files: Iterable[pathlib.Path],
+    ) -> Iterator[Tuple[pathlib.Path, bytes]]:
+        # reads overlap on cold caches and network filesystems, while chunks
+        # keep the per-task overhead low when the files are already cached
+        schema_files = list(schema_files)
+        chunks = [
+            schema_files[start : start + READ_CHUNK_SIZE]
+            for start in range(0, len(schema_files), READ_CHUNK_SIZE)
+        ]
+        with ThreadPoolExecutor() as executor:
+            for chunk, contents in zip(chunks, executor.map(read_chunk, chunks)):
+                yield from zip(chunk, contents)
+
+    @classmethod
+    def parse_files(
+        cls,
+        schema_files: Iterable[pathlib.Path],
+        loads: Optional["JsonLoads"] = None,
+    ) -> Iterable["SchemaData"]:
+        from faust_avro_model_codegen.types import SchemaData
+
+        # schemas decode on first use, so callers that only need names skip it
         return (
-            SchemaData.from_file(schema_file.stem, schema_file.read_text())
-            for schema_file in schema_dir.glob("*.avsc")
+            SchemaData.from_bytes(schema_file.stem, raw, loads)
+            for schema_file, raw in cls.read_files(schema_files)
         )
+
+    @classmethod
+    def parse_dir(cls, schema_dir: pathlib.Path) -> Iterable["SchemaData"]:
+        return cls.parse_files(cls.schema_files(schema_dir))
@@ -0,0 +1,291 @@
+import dataclasses
+import heapq
+import typing
+
+NamedTypeJson: typing.TypeAlias = typing.Dict[str, typing.Any]
+Key = typing.TypeVar("Key", bound=typing.Hashable)
+
+PRIMITIVE_TYPES = frozenset(
+    {"null", "boolean", "int", "long", "float", "double", "bytes", "string"}
+)
+NAMED_TYPES = frozenset({"record", "error", "enum", "fixed"})
+RECORD_TYPES = frozenset({"record", "error"})
+
+
+class UnresolvedReferenceError(Exception):
+    pass
+
+
+class SchemaCycleError(Exception):
+    pass
+
+
+def fullname(name: str, namespace: typing.Optional[str] = None) -> str:
+    if "." in name or not namespace:
+        return name
+    return f"{namespace}.{name}"
+
+
+def namespace_of(name: str) -> typing.Optional[str]:
+    return name.rpartition(".")[0] or None
+
+
+def walk(
+    avro_type: typing.Any, namespace: typing.Optional[str] = None
+) -> typing.Iterator[typing.Tuple[str, str, typing.Any, typing.Optional[str]]]:
+    # yields ("define", fullname, definition, namespace) for named types and
+    # ("use", fullname, None, None) for references to them, in document order.
+    # every schema is walked on each run, so this avoids match statements
+    stack = [(avro_type, namespace)]
+    while stack:
+        avro_type, namespace = stack.pop()
+        if isinstance(avro_type, str):
+            if avro_type not in PRIMITIVE_TYPES:
+                yield "use", fullname(avro_type, namespace), None, None
+        elif isinstance(avro_type, list):
+            stack.extend([(m, namespace) for m in reversed(avro_type)])
+        elif isinstance(avro_type, dict):
+            kind = avro_type.get("type")
+            if isinstance(kind, str) and kind in NAMED_TYPES:
+                name = fullname(
+                    avro_type["name"], avro_type.get("namespace", namespace)
+                )
+                yield "define", name, avro_type, namespace_of(name)
+                if kind in RECORD_TYPES:
+                    inner = namespace_of(name)
+                    fields = avro_type.get("fields", [])
+                    stack.extend([(f["type"], inner) for f in reversed(fields)])
+            elif kind == "array":
+                stack.append((avro_type.get("items"), namespace))
+            elif kind == "map":
+                stack.append((avro_type.get("values"), namespace))
+            else:
+                stack.append((kind, namespace))
+
+
+def standalone(
+    definition: NamedTypeJson, namespace: typing.Optional[str]
+) -> NamedTypeJson:
+    # a definition copied out of its file keeps the namespace it inherited
+    if namespace and "namespace" not in definition and "." not in definition["name"]:
+        return {**definition, "namespace": namespace}
+    return definition
+
+
+@dataclasses.dataclass(frozen=True)
+class SchemaNode:
+    defines: typing.FrozenSet[str]
+    references: typing.FrozenSet[str]
+    # the namespace attribute of the schema itself, if it has one
+    namespace: typing.Optional[str] = None
+
+    @classmethod
+    def from_schema(cls, schema: typing.Any) -> "SchemaNode":
+        defines, uses = set(), set()
+        for event, name, _, _ in walk(schema):
+            (defines if event == "define" else uses).add(name)
+        # names defined in the same file don't link it to another one
+        return cls(
+            defines=frozenset(defines),
+            references=frozenset(uses - defines),
+            namespace=(
+                schema.get("namespace") or None if isinstance(schema, dict) else None
+            ),
+        )
+
+
+def named_definitions(schema: typing.Any) -> typing.Dict[str, NamedTypeJson]:
+    return {
+        name: standalone(definition, namespace)
+        for event, name, definition, namespace in walk(schema)
+        if event == "define"
+    }
+
+
+def expand_references(
+    schema: typing.Any, named_types: typing.Mapping[str, NamedTypeJson]
+) -> typing.Any:
+    # inlines the named types of other files where they are first used, so the
+    # schema stands on its own like the schema registry expects
+    seen: typing.Set[str] = set()
+
+    def expand(avro_type: typing.Any, namespace: typing.Optional[str]) -> typing.Any:
+        match avro_type:
+            case str(name) if name not in PRIMITIVE_TYPES:
+                name = fullname(name, namespace)
+                if name in seen or name not in named_types:
+                    return avro_type
+                return expand(named_types[name], namespace)
+            case list(members):
+                return [expand(m, namespace) for m in members]
+            case {"type": str(kind), "name": str(name)} if kind in NAMED_TYPES:
+                name = fullname(name, avro_type.get("namespace", namespace))
+                if name in seen:
+                    # an inlined record can define a type that was inlined
+                    # before it, and a name can only be defined once
+                    return name
+                seen.add(name)
+                if kind not in RECORD_TYPES:
+                    return avro_type
+                fields = [
+                    {**f, "type": expand(f["type"], namespace_of(name))}
+                    for f in avro_type.get("fields", [])
+                ]
+                return {**avro_type, "fields": fields}
+            case {"type": "array", "items": items}:
+                return {**avro_type, "items": expand(items, namespace)}
+            case {"type": "map", "values": values}:
+                return {**avro_type, "values": expand(values, namespace)}
+            case {"type": inner}:
+                return {**avro_type, "type": expand(inner, namespace)}
+        return avro_type
+
+    return expand(schema, None)
+
+
+class SchemaGraph(typing.Generic[Key]):
+    def __init__(self, load: typing.Callable[[Key], typing.Any]) -> None:
+        # schemas are loaded again on demand instead of being kept, so the
+        # graph of a large schema set stays small
+        self.load = load
+        self.nodes: typing.Dict[Key, SchemaNode] = {}
+        self._definers: typing.Dict[str, typing.Set[Key]] = {}
+        self._referrers: typing.Dict[str, typing.Set[Key]] = {}
+        self._definitions: typing.Dict[str, NamedTypeJson] = {}
+
+    @classmethod
+    def from_schemas(
+        cls,
+        schemas: typing.Iterable[typing.Tuple[Key, typing.Any]],
+        load: typing.Callable[[Key], typing.Any],
+    ) -> "SchemaGraph[Key]":
+        graph = cls(load)
+        for key, schema in schemas:
+            graph.add(key, schema)
+        return graph
+
+    def copy(self) -> "SchemaGraph[Key]":
+        graph = type(self)(self.load)
+        graph.nodes = dict(self.nodes)
+        graph._definers = {name: set(keys) for name, keys in self._definers.items()}
+        graph._referrers = {name: set(k) for name, k in self._referrers.items()}
+        graph._definitions = dict(self._definitions)
+        return graph
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(self, key: Key, schema: typing.Any) -> None:
+        self.add_node(key, SchemaNode.from_schema(schema))
+
+    def add_node(self, key: Key, node: SchemaNode) -> None:
+        self.remove(key)
+        self.nodes[key] = node
+        for name in node.defines:
+            self._definers.setdefault(name, set()).add(key)
+            self._definitions.pop(name, None)
+        for name in node.references:
+            self._referrers.setdefault(name, set()).add(key)
+
+    def remove(self, key: Key) -> None:
+        node = self.nodes.pop(key, None)
+        if node is None:
+            return
+        for name in node.defines:
+            self._definers[name].discard(key)
+            self._definitions.pop(name, None)
+        for name in node.references:
+            self._referrers[name].discard(key)
+
+    def definer(self, name: str) -> Key:
+        definers = self._definers.get(name)
+        if not definers:
+            raise UnresolvedReferenceError(f"{name} is not defined by any schema")
+        # a type several files define resolves to the same file every time
+        return min(definers)
+
+    def dependencies(self, key: Key) -> typing.Set[Key]:
+        return {self.definer(name) for name in self.nodes[key].references} - {key}
+
+    def dependents(self, keys: typing.Iterable[Key]) -> typing.Set[Key]:
+        # the given schemas and every schema that references them, transitively
+        found: typing.Set[Key] = set()
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            if key in found:
+                continue
+            found.add(key)
+            node = self.nodes.get(key)
+            for name in node.defines if node is not None else ():
+                stack.extend(self._referrers.get(name, ()))
+        return found
+
+    def update(
+        self,
+        changed: typing.Mapping[Key, typing.Any],
+        removed: typing.Iterable[Key] = (),
+    ) -> typing.Set[Key]:
+        removed = set(removed)
+        # dependents of the old definitions and of the new ones both change
+        affected = self.dependents([*changed, *removed])
+        for key in removed:
+            self.remove(key)
+        for key, schema in changed.items():
+            self.add(key, schema)
+        affected |= self.dependents(changed)
+        return {key for key in affected if key in self.nodes}
+
+    def order(
+        self, keys: typing.Optional[typing.Iterable[Key]] = None
+    ) -> typing.List[Key]:
+        # a schema comes after the schemas it references, otherwise the
+        # schemas keep the order they were given in
+        keys = list(self.nodes if keys is None else keys)
+        position = {key: index for index, key in enumerate(keys)}
+        waiting = {key: self.dependencies(key) & position.keys() for key in keys}
+        referrers: typing.Dict[Key, typing.List[Key]] = {key: [] for key in keys}
+        for key, dependencies in waiting.items():
+            for dependency in dependencies:
+                referrers[dependency].append(key)
+        ready = [(position[key], key) for key, deps in waiting.items() if not deps]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            _, key = heapq.heappop(ready)
+            ordered.append(key)
+            for referrer in referrers[key]:
+                waiting[referrer].discard(key)
+                if not waiting[referrer]:
+                    heapq.heappush(ready, (position[referrer], referrer))
+        if len(ordered) < len(keys):
+            cycle = sorted(str(key) for key, deps in waiting.items() if deps)
+            raise SchemaCycleError(
+                f"Schemas reference each other in a cycle: {', '.join(cycle)}"
+            )
+        return ordered
+
+    def definition(self, name: str) -> NamedTypeJson:
+        definition = self._definitions.get(name)
+        if definition is None:
+            definition = named_definitions(self.load(self.definer(name)))[name]
+            self._definitions[name] = definition
+        return definition
+
+    def named_types(
+        self, keys: typing.Iterable[Key]
+    ) -> typing.Dict[str, NamedTypeJson]:
+        # the definitions the given schemas reference, and the ones those
+        # definitions reference in turn
+        named_types: typing.Dict[str, NamedTypeJson] = {}
+        stack = [name for key in keys for name in self.nodes[key].references]
+        while stack:
+            name = stack.pop()
+            if name in named_types:
+                continue
+            named_types[name] = definition = self.definition(name)
+            stack.extend(SchemaNode.from_schema(definition).references)
+        return named_types
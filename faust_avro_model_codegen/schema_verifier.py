@@ -1,53 +1,181 @@
+import asyncio
+import dataclasses
+import time
 import typing
 
 import httpx
 from dataclasses_avroschema import AvroModel
 from rich import print
 
+from faust_avro_model_codegen import profiling
 from faust_avro_model_codegen.types import SchemaName
+from faust_avro_model_codegen.verification_cache import VerificationCache
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
 
 class SchemaNotAbleToBeVerified(Exception):
-    pass
+    def __init__(self, failures: typing.Optional[dict[SchemaName, str]] = None):
+        self.failures = failures or {}
+        super().__init__(
+            "\n".join(f"{name}: {reason}" for name, reason in self.failures.items())
+        )
+
+
+@dataclasses.dataclass
+class VerificationReport:
+    verified: dict[SchemaName, int] = dataclasses.field(default_factory=dict)
+    failures: dict[SchemaName, str] = dataclasses.field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+def schema_id(response: typing.Any) -> int:
+    schema_id = response.get("id") if isinstance(response, dict) else None
+    if not isinstance(schema_id, int):
+        raise ValueError(f"no schema ID in {response!r}")
+    return schema_id
 
 
 class SchemaVerifier:
     def __init__(
         self,
         schema_registry_url: str,
-        client: typing.Callable[[], httpx.Client],
+        client: typing.Callable[[], httpx.AsyncClient],
+        max_concurrency: int = 16,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        cache: typing.Optional[VerificationCache] = None,
+        refresh: bool = False,
     ) -> None:
         self.schema_registry_url = schema_registry_url
         self.client = client
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.refresh = refresh
 
-    def check_schema_against_sr(
-        self, subject_name: str, schema: str
+    async def check_schema_against_sr(
+        self, client: httpx.AsyncClient, subject_name: str, schema: str
     ) -> typing.Dict[str, typing.Any]:
-        with self.client() as client:
-            resp = client.post(
-                f"{self.schema_registry_url}/subjects/{subject_name}-value",
-                json={"schema": schema},
-            )
-            resp.raise_for_status()
-            return resp.json()
+        attempt = 0
+        while True:
+            try:
+                resp = await client.post(
+                    f"{self.schema_registry_url}/subjects/{subject_name}-value",
+                    json={"schema": schema},
+                    timeout=self.timeout,
+                )
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            else:
+                if (
+                    resp.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= self.retries
+                ):
+                    resp.raise_for_status()
+                    return resp.json()
+            await asyncio.sleep(self.backoff * 2**attempt)
+            attempt += 1
 
-    def verify(
-        self, generated_classes: dict[SchemaName, typing.Type[AvroModel]]
+    async def _verify_one(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        name: SchemaName,
+        cls: typing.Type[AvroModel],
+        report: VerificationReport,
     ) -> None:
-        for name, cls in generated_classes.items():
-            print(f"[blue]Checking [italic yellow]{name}[/]...[/]")
+        schema = cls.avro_schema()
+        if self.cache is not None and not self.refresh:
+            cached_id = self.cache.lookup(name, schema)
+            if cached_id is not None:
+                report.verified[name] = cached_id
+                print(
+                    f"[italic green]Schema [bold yellow]{name}[/]"
+                    f" unchanged, cached with ID [bold]{cached_id}[/][/italic green]"
+                )
+                return
+
+        async with semaphore:
+            start = time.perf_counter()
             try:
-                result = self.check_schema_against_sr(
-                    name,
-                    cls.avro_schema(),
+                result = schema_id(
+                    await self.check_schema_against_sr(client, name, schema)
+                )
+            except httpx.HTTPStatusError as e:
+                report.failures[name] = (
+                    f"not found in SR (HTTP {e.response.status_code})"
                 )
-            except httpx.HTTPStatusError:
                 print(
                     f"[italic red]Schema [bold yellow]{name}[/] not found in SR[/italic red]"
                 )
-                raise SchemaNotAbleToBeVerified
+            except httpx.TransportError as e:
+                report.failures[name] = f"could not reach SR ({e!r})"
+                print(
+                    f"[italic red]Schema [bold yellow]{name}[/] could not be checked: {e!r}[/italic red]"
+                )
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                report.failures[name] = f"request to SR failed ({e!r})"
+                print(
+                    f"[italic red]Schema [bold yellow]{name}[/] could not be checked: {e!r}[/italic red]"
+                )
+            except ValueError as e:
+                # a body that isn't JSON, or JSON without the schema's ID
+                report.failures[name] = f"unexpected response from SR ({e})"
+                print(
+                    f"[italic red]Schema [bold yellow]{name}[/] could not be checked: {e}[/italic red]"
+                )
             else:
+                report.verified[name] = result
+                if self.cache is not None:
+                    self.cache.store(name, schema, result)
                 print(
                     f"[italic green]Schema [bold yellow]{name}[/]"
-                    f" in SR with ID [bold]{result['id']}[/][/italic green]"
+                    f" in SR with ID [bold]{result}[/][/italic green]"
                 )
+            finally:
+                # requests overlap, so each is timed without a stage of its own
+                profiling.schema_time("registry", name, time.perf_counter() - start)
+
+    async def verify_async(
+        self, generated_classes: dict[SchemaName, typing.Type[AvroModel]]
+    ) -> VerificationReport:
+        report = VerificationReport()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.client() as client:
+            await asyncio.gather(
+                *(
+                    self._verify_one(client, semaphore, name, cls, report)
+                    for name, cls in generated_classes.items()
+                )
+            )
+        if self.cache is not None:
+            for name in report.failures:
+                self.cache.invalidate(name)
+            self.cache.save()
+        return report
+
+    def verify(
+        self, generated_classes: dict[SchemaName, typing.Type[AvroModel]]
+    ) -> VerificationReport:
+        print(
+            f"[blue]Checking [italic yellow]{len(generated_classes)}[/] schemas...[/]"
+        )
+        with profiling.stage("registry"):
+            report = asyncio.run(self.verify_async(generated_classes))
+        if not report.ok:
+            print(
+                f"[bold red]{len(report.failures)} of {len(generated_classes)}"
+                " schemas could not be verified:[/]"
+            )
+            for name, reason in sorted(report.failures.items()):
+                print(f"[red]  [bold yellow]{name}[/]: {reason}[/]")
+            raise SchemaNotAbleToBeVerified(report.failures)
+        return report
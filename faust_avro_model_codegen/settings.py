@@ -1,3 +1,6 @@
+import hashlib
+import typing
+
 import tomlkit
 from pathlib import Path
 
@@ -10,9 +13,46 @@ class ConfigNotFoundError(Exception):
 
 class Settings(BaseModel):
     schema_dir: Path = Path("schemas")
+    schema_dirs: typing.List[Path] = []
+    schema_include: typing.List[str] = ["*.avsc"]
+    schema_exclude: typing.List[str] = []
     outfile: Path = Path("models.py")
     schema_registry_url: str = "http://localhost:8081"
     faust_app_models_module: str = "models"
+    manifest_file: typing.Optional[Path] = None
+    verify_concurrency: int = 16
+    verify_timeout: float = 10.0
+    verify_retries: int = 3
+    verify_cache_file: Path = Path(".faust_avro_model_codegen.verify-cache.json")
+    verify_cache_ttl: typing.Optional[float] = 24 * 60 * 60
+    compact: bool = False
+    frozen: bool = False
+    output_layout: typing.Literal["module", "schema", "namespace"] = "module"
+    template_dirs: typing.List[Path] = []
+
+    @property
+    def schema_roots(self) -> typing.List[Path]:
+        # schema_dirs replaces the single schema_dir when it is set
+        return self.schema_dirs or [self.schema_dir]
+
+    @property
+    def output_path(self) -> Path:
+        # split layouts write a package named after the outfile
+        if self.output_layout == "module":
+            return self.outfile
+        return self.outfile.with_suffix("")
+
+    @property
+    def manifest_path(self) -> Path:
+        if self.manifest_file is not None:
+            return self.manifest_file
+        return self.outfile.with_name(f".{self.outfile.name}.manifest.json")
+
+    def digest(self, **options: typing.Any) -> str:
+        # options of the run and of the output project, like --no-format and
+        # black's line length, change the output as much as the settings do
+        state = [*sorted(vars(self).items()), *sorted(options.items())]
+        return hashlib.sha256(repr(state).encode()).hexdigest()
 
     @classmethod
     def from_toml(cls) -> "Settings":
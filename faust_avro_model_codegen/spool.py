@@ -0,0 +1,32 @@
+import tempfile
+import typing
+
+
+class RenderedSpool:
+    def __init__(self) -> None:
+        # rendered definitions wait on disk until the module header is known,
+        # so only their sizes are held in memory
+        self._file = tempfile.TemporaryFile()
+        self._sizes: typing.List[int] = []
+
+    def append(self, rendered: str) -> None:
+        data = rendered.encode()
+        self._file.write(data)
+        self._sizes.append(len(data))
+
+    def __iter__(self) -> typing.Iterator[str]:
+        self._file.seek(0)
+        for size in self._sizes:
+            yield self._file.read(size).decode()
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RenderedSpool":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
@@ -1,17 +1,626 @@
+import dataclasses
+import functools
+import os
 import pathlib
-from typing import Union, NewType
+import re
+import typing
+from typing import List, Union, NewType
 
 import jinja2
 from jinja2 import Template
 
+from .code_layout import (
+    INDENT,
+    LINE_LENGTH,
+    Atom,
+    Bracketed,
+    Clauses,
+    Node,
+    annotated_assignment,
+    call,
+    dict_literal,
+    layout,
+    line_length,
+    literal,
+    max_line_length,
+    string_literal,
+    type_annotation,
+)
+from . import profiling
+from .named_types import NamedTypeRegistry
+from .spool import RenderedSpool
 from .types import (
+    ARRAY,
+    ENUM,
+    MAP,
+    NULL,
+    PRIMITIVE,
+    RECORD,
+    UNION,
+    PythonAvroField,
     PythonEnumClass,
     PythonAvroModel,
+    PythonType,
     CodeGenResultData,
 )
 
 RenderedTemplate = NewType("RenderedTemplate", str)
 
+TEMPLATE_DIR = pathlib.Path(__file__).parent / "templates"
+TEMPLATE_NAMES = {
+    "enum_template": "enum.py.jinja2",
+    "avro_template": "faust_record.jinja2",
+    "models_template": "models.py.jinja2",
+    "package_template": "package_init.py.jinja2",
+}
+
+MODULE_REFERENCE = re.compile(r"\b([A-Za-z_]\w*)\.")
+NATURAL_NUMBER = re.compile(r"(\d+)")
+CAMEL_CASE_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+# containers and generated classes, which faust coerces lazily on first access
+LAZILY_COERCED = re.compile(r"typing\.(?!Union\b)\w+\[|(?<![\w.])(?!None\b)[A-Z]\w*")
+
+# every import the templates can need, in the order isort puts them
+STDLIB_IMPORTS = {
+    "dataclasses": "import dataclasses",
+    "dataclass": "from dataclasses import dataclass, field",
+    "datetime": "import datetime",
+    "decimal": "import decimal",
+    "enum": "import enum",
+    "io": "import io",
+    "json": "import json",
+    "typing": "import typing",
+    "uuid": "import uuid",
+}
+THIRD_PARTY_IMPORTS = {
+    "dataclasses_avroschema": "from dataclasses_avroschema import {}",
+    "AvroRecord": "from dataclasses_avroschema.faust import AvroRecord",
+    "CT": "from dataclasses_avroschema.schema_generator import CT",
+    "fastavro": "import fastavro",
+}
+
+
+def python_default(python_type: PythonType, value: typing.Any) -> typing.Any:
+    # avro writes bytes and fixed defaults as strings of the code points 0-255
+    if python_type.kind == UNION and python_type.items:
+        # the default of a union is a value of its first type
+        return python_default(python_type.items[0], value)
+    if python_type.kind == PRIMITIVE and python_type.annotation == "bytes":
+        return value.encode("latin-1") if isinstance(value, str) else value
+    if python_type.kind == ARRAY and isinstance(value, list):
+        return [python_default(python_type.items[0], v) for v in value]
+    if python_type.kind == MAP and isinstance(value, dict):
+        return {k: python_default(python_type.items[0], v) for k, v in value.items()}
+    return value
+
+
+def has_mutable_default(field: PythonAvroField) -> bool:
+    # a list or dict default would be one object shared by every instance
+    return field.has_default and isinstance(field.default, (list, dict))
+
+
+def field_declaration(field: PythonAvroField) -> str:
+    metadata = [('"doc": ', Atom(string_literal(str(field.doc))))]
+    kwargs = [("metadata", dict_literal(metadata))]
+    if field.has_default:
+        metadata.append(('"default": ', literal(field.default)))
+        default = python_default(field_type(field), field.default)
+        if default != field.default:
+            # dataclasses_avroschema decodes bytes defaults as utf-8, the
+            # avro default in the metadata is rendered instead
+            metadata.append(('"exclude_default": ', Atom("True")))
+        if not has_mutable_default(field):
+            kwargs.append(("default", literal(default)))
+        elif default:
+            factory = dataclasses.replace(literal(default), name="lambda: ")
+            kwargs.append(("default_factory", factory))
+        else:
+            kwargs.append(("default_factory", Atom(type(default).__name__)))
+    return annotated_assignment(
+        field.name, type_annotation(field.type), call("field", kwargs), depth=1
+    )
+
+
+def needs_default_normalization(field: PythonAvroField) -> bool:
+    # faust falls back to the dataclasses.Field declared on the class whenever
+    # an optional field is omitted or passed as None
+    return field.has_default or field_type(field).nullable
+
+
+def field_assignment(field: PythonAvroField, value: str, frozen: bool) -> str:
+    if not frozen:
+        return layout(Atom(value), f"self.{field.name} = ", depth=3)
+    args = [
+        ("", Atom("self")),
+        ("", Atom(string_literal(field.name))),
+        ("", Atom(value)),
+    ]
+    setter = Bracketed("object.__setattr__", "(", ")", args, is_collection=False)
+    return layout(setter, depth=3)
+
+
+def field_normalization(field: PythonAvroField, frozen: bool = False) -> List[str]:
+    target = f"self.{field.name}"
+    if field.records:
+        # reading the attribute would coerce the dataclasses.Field into a record
+        target = f"self.__dict__[{string_literal(field.name)}]"
+    lines = []
+    if needs_default_normalization(field):
+        if has_mutable_default(field):
+            default = "value.default_factory()"
+        else:
+            default = "value.default" if field.has_default else "None"
+        lines += [
+            layout(Atom(target), "value = ", depth=2),
+            f"{INDENT * 2}if isinstance(value, dataclasses.Field):",
+            field_assignment(field, default, frozen),
+        ]
+    if field.enum_items:
+        lines += [
+            layout(Atom(target), "values = ", depth=2),
+            f"{INDENT * 2}if isinstance(values, list):",
+            f"{INDENT * 3}for index, item in enumerate(values):",
+            f"{INDENT * 4}if isinstance(item, enum.Enum):",
+            f"{INDENT * 5}values[index] = item.value",
+        ]
+    return lines
+
+
+def is_lazily_coerced(field: PythonAvroField) -> bool:
+    return field.enum_items is not None or bool(LAZILY_COERCED.search(field.type))
+
+
+def post_init(
+    model: PythonAvroModel, compact: bool = False, frozen: bool = False
+) -> str:
+    body = [
+        line for field in model.fields for line in field_normalization(field, frozen)
+    ]
+    if compact and not any(is_lazily_coerced(field) for field in model.fields):
+        # faust only reads this per-instance set for lazily coerced fields,
+        # without it lookups fall back to the class attribute
+        release = (
+            'object.__delattr__(self, "__evaluated_fields__")'
+            if frozen
+            else "del self.__evaluated_fields__"
+        )
+        body.append(f"{INDENT * 2}{release}")
+    if not body:
+        return ""
+    return "\n".join([f"{INDENT}def __post_init__(self) -> None:", *body])
+
+
+def example_override(example: typing.Dict[str, typing.Any]) -> str:
+    schema = dict_literal(
+        [
+            ("**", Atom("super().avro_schema_to_python(parent, case_type)")),
+            ('"example": ', literal(example)),
+        ]
+    )
+    return layout(schema, prefix="return ", depth=2)
+
+
+def embedded_schema(schema: typing.Dict[str, typing.Any]) -> str:
+    return layout(literal(schema), prefix="_AVRO_SCHEMA = ", depth=1)
+
+
+def record_list(names: typing.List[str]) -> str:
+    records = Bracketed("", "[", "]", [("", Atom(n)) for n in names], True)
+    return layout(records, prefix="for record in ", suffix=":", depth=1)
+
+
+def module_list(names: typing.List[str]) -> str:
+    return layout(literal(names), prefix="for module in ", suffix=":", depth=1)
+
+
+def module_table(exports: typing.Dict[str, str]) -> str:
+    return layout(literal(exports), prefix="_MODULES = ")
+
+
+def relative_import(module: str, names: typing.Iterable[str]) -> str:
+    # isort's order_by_type: constants, then classes, then everything else
+    ordered = sorted(
+        names, key=lambda n: (not n.isupper(), not n[0].isupper(), n.lower())
+    )
+    line = f"from .{module} import {', '.join(ordered)}"
+    if len(line) <= max_line_length():
+        return line
+    return "\n".join(
+        [f"from .{module} import (", *(f"{INDENT}{n}," for n in ordered), ")"]
+    )
+
+
+def module_order(module: str) -> typing.List[typing.Union[int, str]]:
+    # isort compares modules case-insensitively, with numbers in natural order
+    return [
+        int(part) if part.isdigit() else part
+        for part in NATURAL_NUMBER.split(module.lower())
+    ]
+
+
+def invoke(name: str, *args: Node) -> Bracketed:
+    return Bracketed(name, "(", ")", [("", arg) for arg in args], is_collection=False)
+
+
+Conversion: typing.TypeAlias = typing.Callable[[str], Node]
+
+
+def serialization_format(name: str) -> Atom:
+    # imported on use, dataclasses_avroschema dominates the CLI's startup
+    from dataclasses_avroschema import serialization
+
+    return Atom(string_literal(getattr(serialization, name)))
+
+
+# conversions between python values and the JSON representation
+# dataclasses_avroschema uses in to_json
+JSON_ENCODERS: typing.Dict[str, Conversion] = {
+    "bytes": lambda value: invoke(f"{value}.decode"),
+    "datetime.datetime": lambda value: invoke(
+        f"{value}.strftime", serialization_format("DATETIME_STR_FORMAT")
+    ),
+    "datetime.date": lambda value: invoke(
+        f"{value}.strftime", serialization_format("DATE_STR_FORMAT")
+    ),
+    "datetime.time": lambda value: invoke(
+        f"{value}.strftime", serialization_format("TIME_STR_FORMAT")
+    ),
+    "uuid.UUID": lambda value: invoke("str", Atom(value)),
+    "decimal.Decimal": lambda value: invoke("str", Atom(value)),
+}
+JSON_DECODERS: typing.Dict[str, Conversion] = {
+    "bytes": lambda value: invoke(f"{value}.encode"),
+    "datetime.datetime": lambda value: invoke(
+        "datetime.datetime.fromisoformat", Atom(value)
+    ),
+    "datetime.date": lambda value: invoke("datetime.date.fromisoformat", Atom(value)),
+    "datetime.time": lambda value: invoke("datetime.time.fromisoformat", Atom(value)),
+    "uuid.UUID": lambda value: invoke("uuid.UUID", Atom(value)),
+    "decimal.Decimal": lambda value: invoke("decimal.Decimal", Atom(value)),
+}
+# dataclasses_avroschema's annotated types convert like the type they
+# annotate, whose module the generated code then imports
+ANNOTATED_TYPES = {
+    "types.DateTimeMicro": "datetime.datetime",
+    "types.TimeMicro": "datetime.time",
+    "types.condecimal": "decimal.Decimal",
+}
+
+
+def symbol_table_name(enum: PythonEnumClass) -> str:
+    return "_" + CAMEL_CASE_BOUNDARY.sub("_", enum.name).upper() + "_SYMBOLS"
+
+
+ANNOTATED_KINDS = {"typing.Union": UNION, "typing.List": ARRAY, "typing.Dict": MAP}
+
+
+def annotated_type(node: Node, field: PythonAvroField) -> PythonType:
+    if isinstance(node, Bracketed):
+        kind = ANNOTATED_KINDS.get(node.name, PRIMITIVE)
+        items = tuple(annotated_type(item, field) for _, item in node.items)
+        # a dict annotation lists the key type first
+        return PythonType(kind, node.flat(), items[1:] if kind == MAP else items)
+    name = node.flat()
+    if name == "None":
+        return PythonType(NULL, name)
+    if name == field.record:
+        return PythonType(RECORD, name)
+    if field.enum_items and name == field.enum_items.name:
+        return PythonType(ENUM, name, enum=field.enum_items)
+    return PythonType(PRIMITIVE, name)
+
+
+def field_type(field: PythonAvroField) -> PythonType:
+    if field.python_type is not None:
+        return field.python_type
+    # fields built without the converter only have their annotation
+    return annotated_type(type_annotation(field.type), field)
+
+
+def symbol_tables(model: PythonAvroModel) -> str:
+    enums = {enum.name: enum for f in model.fields for enum in field_type(f).enums()}
+    # str enum members hash and compare like their symbol, so the table maps
+    # both members and plain symbols to the symbol
+    return "\n".join(
+        layout(
+            literal({symbol: symbol for symbol in enum.values}),
+            prefix=f"{symbol_table_name(enum)} = ",
+            depth=1,
+        )
+        for enum in enums.values()
+    )
+
+
+Leaf: typing.TypeAlias = typing.Callable[[PythonType], typing.Optional[Conversion]]
+TypeConversion: typing.TypeAlias = typing.Callable[
+    [PythonType, str], typing.Optional[Node]
+]
+
+# how a member of a union with several types is recognised
+INSTANCE_CHECKS = {ARRAY: "list", MAP: "dict"}
+
+
+def conditional(value: Node, test: str, otherwise: Node) -> Clauses:
+    return Clauses([("", value), ("if ", Atom(test)), ("else ", otherwise)], True)
+
+
+def nested_conversion(leaf: Leaf, by_instance: bool = True) -> TypeConversion:
+    # applies the conversion of the leaf types to the values nested in
+    # arrays, maps and unions. by_instance tells apart the members of unions
+    # with several types, which JSON data can't do
+    def convert(
+        python_type: PythonType, value: str, depth: int = 0
+    ) -> typing.Optional[Node]:
+        if python_type.kind in (ARRAY, MAP):
+            item, key = f"item{depth or ''}", f"key{depth or ''}"
+            inner = convert(python_type.items[0], item, depth + 1)
+            if inner is None:
+                return None
+            if python_type.kind == ARRAY:
+                body = Clauses([("", inner), ("for ", Atom(f"{item} in {value}"))])
+                return Bracketed("", "[", "]", [("", body)], is_collection=False)
+            loop = Atom(f"{key}, {item} in {value}.items()")
+            body = Clauses([(f"{key}: ", inner), ("for ", loop)])
+            return Bracketed("", "{", "}", [("", body)], is_collection=False)
+        if python_type.kind == UNION:
+            members = python_type.members
+            if len(members) == 1:
+                inner = convert(members[0], value, depth)
+                if inner is None:
+                    return None
+                return conditional(Atom("None"), f"{value} is None", inner)
+            if not by_instance:
+                # values of a union of several types are written as they are
+                return None
+            expression: Node = Atom(value)
+            for member in reversed(members):
+                check = INSTANCE_CHECKS.get(member.kind)
+                if member.kind == RECORD:
+                    check = member.annotation
+                inner = convert(member, value, depth) if check else None
+                if inner is not None:
+                    test = f"isinstance({value}, {check})"
+                    expression = conditional(inner, test, expression)
+            return expression if isinstance(expression, Clauses) else None
+        convert_leaf = leaf(python_type)
+        return None if convert_leaf is None else convert_leaf(value)
+
+    return convert
+
+
+FieldConversion: typing.TypeAlias = typing.Callable[
+    [PythonAvroField], typing.Optional[Node]
+]
+
+
+def field_conversion(
+    convert: TypeConversion, source: typing.Optional[str] = None
+) -> FieldConversion:
+    # the conversion of a field's value, read from data unless a source
+    # attribute of self is given. null is handled by value_conversions
+    def conversion(field: PythonAvroField) -> typing.Optional[Node]:
+        value = "value" if source is None else f"{source}.{field.name}"
+        return convert(field_type(field).without_null, value)
+
+    return conversion
+
+
+def leaf_conversion(kind: str, convert: Conversion) -> Leaf:
+    return lambda python_type: convert if python_type.kind == kind else None
+
+
+def symbol_lookup(owner: str) -> FieldConversion:
+    def symbol(python_type: PythonType) -> typing.Optional[Conversion]:
+        if python_type.kind != ENUM or python_type.enum is None:
+            return None
+        table = f"{owner}.{symbol_table_name(python_type.enum)}"
+        return lambda value: Atom(f"{table}[{value}]")
+
+    nested = field_conversion(nested_conversion(symbol))
+
+    def conversion(field: PythonAvroField) -> typing.Optional[Node]:
+        if not field.enum_items:
+            return nested(field)
+        lookup = Atom(f"{owner}.{symbol_table_name(field.enum_items)}.__getitem__")
+        return invoke("list", invoke("map", lookup, Atom("value")))
+
+    return conversion
+
+
+def json_conversion(
+    conversions: typing.Dict[str, Conversion], by_instance: bool = True
+) -> FieldConversion:
+    def leaf(python_type: PythonType) -> typing.Optional[Conversion]:
+        if python_type.kind != PRIMITIVE:
+            return None
+        # types.condecimal(...) converts the same whatever its arguments
+        annotation = python_type.annotation.partition("(")[0]
+        return conversions.get(ANNOTATED_TYPES.get(annotation, annotation))
+
+    return field_conversion(nested_conversion(leaf, by_instance))
+
+
+# records apply their own conversions to their fields
+RECORD_TO_DICT = field_conversion(
+    nested_conversion(leaf_conversion(RECORD, lambda value: invoke(f"{value}.to_dict")))
+)
+# to_dict has already turned the records in data into dicts
+RECORD_TO_JSON = field_conversion(
+    nested_conversion(
+        leaf_conversion(
+            RECORD, lambda value: invoke("json.loads", invoke(f"{value}.to_json"))
+        )
+    ),
+    source="self",
+)
+
+
+def record_from_json(python_type: PythonType) -> typing.Optional[Conversion]:
+    if python_type.kind != RECORD:
+        return None
+    return lambda value: invoke(
+        f"{python_type.annotation}.from_json", invoke("json.dumps", Atom(value))
+    )
+
+
+RECORD_FROM_JSON = field_conversion(
+    nested_conversion(record_from_json, by_instance=False)
+)
+
+
+def field_lookup(field: PythonAvroField, required: bool) -> Node:
+    key = Atom(string_literal(field.name))
+    if required:
+        return Bracketed("data", "[", "]", [("", key)], is_collection=False)
+    # omitted optional fields fall back to their defaults in __post_init__
+    return invoke("data.get", key)
+
+
+def value_conversions(
+    model: PythonAvroModel,
+    conversion: FieldConversion,
+    complete: bool,
+) -> List[str]:
+    lines = []
+    for field in model.fields:
+        converted = conversion(field)
+        if converted is None:
+            continue
+        target = f"data[{string_literal(field.name)}]"
+        required = complete or not needs_default_normalization(field)
+        lines.append(layout(field_lookup(field, required), "value = ", depth=2))
+        if field_type(field).nullable:
+            lines.append(f"{INDENT * 2}if value is not None:")
+            lines.append(layout(converted, prefix=f"{target} = ", depth=3))
+        else:
+            lines.append(layout(converted, prefix=f"{target} = ", depth=2))
+    return lines
+
+
+def to_dict_body(model: PythonAvroModel) -> str:
+    fields = dict_literal(
+        [(f"{string_literal(f.name)}: ", Atom(f"self.{f.name}")) for f in model.fields]
+    )
+    lines = value_conversions(model, symbol_lookup("self"), complete=True)
+    lines += value_conversions(model, RECORD_TO_DICT, complete=True)
+    if not lines:
+        return layout(fields, prefix="return ", depth=2)
+    return "\n".join(
+        [layout(fields, prefix="data = ", depth=2), *lines, f"{INDENT * 2}return data"]
+    )
+
+
+def to_json_conversions(model: PythonAvroModel) -> str:
+    # the record conversions start over from the attributes, so they run
+    # before the encoders convert the values in data
+    lines = value_conversions(model, RECORD_TO_JSON, complete=True)
+    lines += value_conversions(model, json_conversion(JSON_ENCODERS), complete=True)
+    return "\n".join(lines)
+
+
+def from_json_conversions(model: PythonAvroModel) -> str:
+    lines = value_conversions(model, symbol_lookup("cls"), complete=False)
+    lines += value_conversions(
+        model, json_conversion(JSON_DECODERS, by_instance=False), complete=False
+    )
+    lines += value_conversions(model, RECORD_FROM_JSON, complete=False)
+    return "\n".join(lines)
+
+
+def from_dict_body(model: PythonAvroModel) -> str:
+    arguments = [
+        (f"{field.name}=", field_lookup(field, not needs_default_normalization(field)))
+        for field in model.fields
+    ]
+    constructor = Bracketed("cls", "(", ")", arguments, is_collection=False)
+    return layout(constructor, prefix="return ", depth=2)
+
+
+def required_import_names(
+    code_gen_result: CodeGenResultData, frozen: bool = False
+) -> typing.Set[str]:
+    names: typing.Set[str] = set()
+    if code_gen_result.dependencies:
+        names.add("enum")
+    for c in code_gen_result.classes:
+        names |= {"dataclass", "AvroRecord", "json", "typing"}
+        if frozen:
+            names |= {"dataclasses", "typing"}
+        if c.schema:
+            names |= {"io", "json", "typing", "AvroModel", "CT", "case", "fastavro"}
+        elif c.example:
+            names |= {"typing", "AvroModel", "CT"}
+        for field in c.fields:
+            names |= set(MODULE_REFERENCE.findall(field.type))
+            names |= {
+                python.partition(".")[0]
+                for annotated, python in ANNOTATED_TYPES.items()
+                if annotated in field.type
+            }
+            if needs_default_normalization(field):
+                names.add("dataclasses")
+            if field.enum_items:
+                names.add("enum")
+    return names
+
+
+def import_lines(names: typing.Set[str]) -> List[str]:
+    stdlib = [line for name, line in STDLIB_IMPORTS.items() if name in names]
+    avroschema_names = sorted(
+        names & {"AvroModel", "case", "types"}, key=lambda n: (not n[0].isupper(), n)
+    )
+    third_party = [
+        line.format(", ".join(avroschema_names)) if "{}" in line else line
+        for name, line in THIRD_PARTY_IMPORTS.items()
+        if name in names or (name == "dataclasses_avroschema" and avroschema_names)
+    ]
+    return [*stdlib, *([""] if stdlib and third_party else []), *third_party]
+
+
+def required_imports(
+    code_gen_result: CodeGenResultData, frozen: bool = False
+) -> List[str]:
+    return import_lines(required_import_names(code_gen_result, frozen))
+
+
+def default_cache_dir() -> pathlib.Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(cache_home) / "faust_avro_model_codegen" / "jinja"
+
+
+def bytecode_cache(cache_dir: pathlib.Path) -> typing.Optional[jinja2.BytecodeCache]:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # without a writable cache the templates are compiled on every run
+        return None
+    return jinja2.FileSystemBytecodeCache(str(cache_dir))
+
+
+@functools.lru_cache(maxsize=None)
+def template_environment(
+    template_dirs: typing.Tuple[pathlib.Path, ...], cache_dir: pathlib.Path
+) -> jinja2.Environment:
+    # compiled templates are kept on disk keyed by their source checksum, so
+    # only a new or edited template is parsed again
+    loader = jinja2.FileSystemLoader(searchpath=[*template_dirs, TEMPLATE_DIR])
+    tpls = jinja2.Environment(
+        loader=loader, trim_blocks=True, bytecode_cache=bytecode_cache(cache_dir)
+    )
+    tpls.filters["field_declaration"] = field_declaration
+    tpls.filters["example_override"] = example_override
+    tpls.filters["embedded_schema"] = embedded_schema
+    tpls.filters["record_list"] = record_list
+    tpls.filters["module_list"] = module_list
+    tpls.filters["module_table"] = module_table
+    tpls.filters["post_init"] = post_init
+    tpls.filters["symbol_tables"] = symbol_tables
+    tpls.filters["to_dict_body"] = to_dict_body
+    tpls.filters["to_json_conversions"] = to_json_conversions
+    tpls.filters["from_json_conversions"] = from_json_conversions
+    tpls.filters["from_dict_body"] = from_dict_body
+    return tpls
+
 
 class TemplateRenderer:
     THIS_LIBRARY = "avro_code_gen"
@@ -21,38 +630,129 @@ class TemplateRenderer:
         enum_template: Template,
         avro_template: Template,
         models_template: Template,
+        package_template: Template,
+        compact: bool = False,
+        frozen: bool = False,
+        template_dirs: typing.Sequence[pathlib.Path] = (),
+        line_length: int = LINE_LENGTH,
     ):
         self.enum_template = enum_template
         self.avro_template = avro_template
         self.models_template = models_template
+        self.package_template = package_template
+        self.compact = compact
+        self.frozen = frozen
+        self.template_dirs = tuple(template_dirs)
+        self.line_length = line_length
 
-    @classmethod
-    def from_current_directory(cls) -> "TemplateRenderer":
-        this_dir = pathlib.Path(__file__).parent
-        loader = jinja2.FileSystemLoader(searchpath=this_dir / "templates")
-        tpls = jinja2.Environment(loader=loader)
-        return cls(
-            enum_template=tpls.get_template("enum.py.jinja2"),
-            avro_template=tpls.get_template("faust_record.jinja2"),
-            models_template=tpls.get_template("models.py.jinja2"),
+    @staticmethod
+    def template_files(
+        template_dirs: typing.Sequence[pathlib.Path] = (),
+    ) -> List[pathlib.Path]:
+        # the file each template is loaded from, user directories first
+        search_path = [*template_dirs, TEMPLATE_DIR]
+        return sorted(
+            next(d / name for d in search_path if (d / name).exists())
+            for name in TEMPLATE_NAMES.values()
         )
 
+    @classmethod
+    def from_current_directory(
+        cls,
+        compact: bool = False,
+        frozen: bool = False,
+        template_dirs: typing.Sequence[pathlib.Path] = (),
+        cache_dir: typing.Optional[pathlib.Path] = None,
+        line_length: int = LINE_LENGTH,
+    ) -> "TemplateRenderer":
+        with profiling.stage("templates"):
+            tpls = template_environment(
+                tuple(template_dirs),
+                cache_dir if cache_dir is not None else default_cache_dir(),
+            )
+            return cls(
+                **{
+                    key: tpls.get_template(name) for key, name in TEMPLATE_NAMES.items()
+                },
+                compact=compact,
+                frozen=frozen,
+                template_dirs=template_dirs,
+                line_length=line_length,
+            )
+
     def render(
         self,
         python_cls: Union[PythonAvroModel, PythonEnumClass, CodeGenResultData],
     ) -> RenderedTemplate:
-        match python_cls:
-            case PythonEnumClass() as enum:
-                return RenderedTemplate(self.enum_template.render(c=enum))
-            case PythonAvroModel() as model:
-                return RenderedTemplate(self.avro_template.render(c=model))
-            case CodeGenResultData() as code_gen_result:
-                return RenderedTemplate(
-                    self.models_template.render(
-                        classes=[self.render(c) for c in code_gen_result.classes],
-                        deps=[self.render(d) for d in code_gen_result.dependencies],
-                        __name__=self.THIS_LIBRARY,
+        with profiling.stage("render"), line_length(self.line_length):
+            match python_cls:
+                case PythonEnumClass() as enum:
+                    return RenderedTemplate(self.enum_template.render(c=enum))
+                case PythonAvroModel() as model:
+                    return RenderedTemplate(
+                        self.avro_template.render(
+                            c=model, compact=self.compact, frozen=self.frozen
+                        )
                     )
+                case CodeGenResultData() as code_gen_result:
+                    registry = NamedTypeRegistry()
+                    classes = registry.register_result(code_gen_result)
+                    return self.render_module(
+                        imports=required_imports(code_gen_result, self.frozen),
+                        deps=[self.render(d) for d in registry.enums()],
+                        classes=[self.render(c) for c in classes],
+                        records=[c.name for c in classes],
+                    )
+                case _:
+                    raise ValueError("Nothing happening here.")
+
+    def render_module(
+        self,
+        imports: List[str],
+        deps: List[RenderedTemplate],
+        classes: List[RenderedTemplate],
+        records: List[str],
+    ) -> RenderedTemplate:
+        with profiling.stage("render"), line_length(self.line_length):
+            return RenderedTemplate(
+                self.models_template.render(
+                    imports=imports,
+                    classes=classes,
+                    deps=deps,
+                    records=records,
+                    __name__=self.THIS_LIBRARY,
+                )
+            )
+
+    def generate_module(
+        self, results: typing.Iterable[CodeGenResultData]
+    ) -> typing.Iterator[str]:
+        import_names: typing.Set[str] = set()
+        registry = NamedTypeRegistry()
+        records: List[str] = []
+        with RenderedSpool() as classes:
+            for result in results:
+                import_names |= required_import_names(result, self.frozen)
+                for c in registry.register_result(result):
+                    classes.append(self.render(c))
+                    records.append(c.name)
+            with line_length(self.line_length):
+                yield from self.models_template.generate(
+                    imports=import_lines(import_names),
+                    deps=[self.render(d) for d in registry.enums()],
+                    classes=classes,
+                    records=records,
+                    __name__=self.THIS_LIBRARY,
+                )
+
+    def render_package_init(
+        self, exports: typing.Dict[str, str], record_modules: List[str]
+    ) -> RenderedTemplate:
+        with line_length(self.line_length):
+            return RenderedTemplate(
+                self.package_template.render(
+                    exports=exports,
+                    record_modules=record_modules,
+                    __name__=self.THIS_LIBRARY,
                 )
-            case _:
-                raise ValueError("Nothing happening here.")
+            )
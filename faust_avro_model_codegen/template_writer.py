@@ -1,32 +1,107 @@
+import os
 import pathlib
+import typing
+from concurrent.futures import ThreadPoolExecutor
 
-import isort
-from plumbum.cmd import autoflake, black  # type: ignore
+from faust_avro_model_codegen import profiling
+from faust_avro_model_codegen.code_formatter import CodeFormatter
 from faust_avro_model_codegen.template_renderer import RenderedTemplate
 
+GENERATED_HEADER = '""" NOTICE!!'
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class TemplateWriter:
-    @classmethod
-    def write(cls, filepath: pathlib.Path, rendered_text: RenderedTemplate) -> None:
+    def __init__(
+        self,
+        formatter: typing.Optional[CodeFormatter] = None,
+        format_output: bool = True,
+    ) -> None:
+        self.formatter = formatter if formatter is not None else CodeFormatter()
+        self.format_output = format_output
+
+    def write(self, filepath: pathlib.Path, rendered_text: RenderedTemplate) -> None:
         if not filepath.parent.exists():
             filepath.parent.mkdir(parents=True)
 
-        filepath.write_text(rendered_text)
-
-        cls._post_process_output_file(filepath)
-
-    @staticmethod
-    def _post_process_output_file(file: pathlib.Path) -> None:
-        isort.file(
-            file,
-            overwrite_in_place=True,
-            remove_redundant_aliases=True,
-            include_trailing_comma=True,
-            group_by_package=True,
-            float_to_top=True,
-            dedup_headings=True,
-            force_sort_within_sections=True,
-            quiet=True,
-        )
-        autoflake(file.absolute(), "--in-place", "--remove-all-unused-imports")
-        black(file.absolute())
+        source = self._post_process_output(filepath, rendered_text)
+        with profiling.stage("write"):
+            filepath.write_text(source)
+
+    def write_stream(
+        self, filepath: pathlib.Path, chunks: typing.Iterable[str]
+    ) -> None:
+        if self.format_output:
+            # isort, autoflake and black all need the whole module at once
+            self.write(filepath, RenderedTemplate("".join(chunks)))
+            return
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        # the previous module stays in place until the new one is complete
+        partial = filepath.with_name(f".{filepath.name}.partial")
+        line_length = self.formatter.line_length(filepath)
+        try:
+            # schemas are converted and rendered while the module is written,
+            # those stages are timed on their own
+            with profiling.stage("write"), partial.open(
+                "w", buffering=WRITE_BUFFER_SIZE
+            ) as f:
+                overlong = False
+                last_line = ""
+                for chunk in chunks:
+                    f.write(chunk)
+                    if not overlong:
+                        *lines, last_line = (last_line + chunk).split("\n")
+                        overlong = any(len(line) > line_length for line in lines)
+                overlong = overlong or len(last_line) > line_length
+            if overlong:
+                # black may split a longer line differently than the layout
+                source = partial.read_text()
+                partial.write_text(self.formatter.format(source, filepath))
+            os.replace(partial, filepath)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    def write_package(
+        self,
+        package_dir: pathlib.Path,
+        modules: typing.Dict[str, RenderedTemplate],
+        max_workers: typing.Optional[int] = None,
+        previous: typing.Optional[typing.Dict[str, RenderedTemplate]] = None,
+    ) -> None:
+        package_dir.mkdir(parents=True, exist_ok=True)
+        # modules left over from schemas that were removed since the last run,
+        # anything without the generated header is not ours to delete
+        for stale in package_dir.glob("*.py"):
+            if stale.name not in modules and stale.read_text().startswith(
+                GENERATED_HEADER
+            ):
+                stale.unlink()
+        previous = previous or {}
+        changed = {
+            name: rendered
+            for name, rendered in modules.items()
+            if previous.get(name) != rendered or not (package_dir / name).exists()
+        }
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(
+                executor.map(
+                    lambda item: self.write(package_dir / item[0], item[1]),
+                    changed.items(),
+                )
+            )
+
+    def _post_process_output(
+        self, filepath: pathlib.Path, rendered_text: RenderedTemplate
+    ) -> str:
+        if not self.format_output and not self._has_overlong_lines(
+            filepath, rendered_text
+        ):
+            return rendered_text
+        return self.formatter.format(rendered_text, filepath)
+
+    def _has_overlong_lines(self, filepath: pathlib.Path, text: str) -> bool:
+        # the code is only laid out the way black would leave it while every
+        # line fits, longer names leave the splitting to black
+        line_length = self.formatter.line_length(filepath)
+        return any(len(line) > line_length for line in text.splitlines())
@@ -0,0 +1,352 @@
+import typing
+
+from faust_avro_model_codegen.schema_graph import (
+    NAMED_TYPES,
+    RECORD_TYPES,
+    NamedTypeJson,
+    UnresolvedReferenceError,
+    expand_references,
+    fullname,
+    namespace_of,
+    standalone,
+)
+from faust_avro_model_codegen.types import (
+    ARRAY,
+    ENUM,
+    MAP,
+    NULL,
+    PRIMITIVE,
+    RECORD,
+    UNION,
+    PythonAvroField,
+    PythonAvroModel,
+    PythonEnumClass,
+    PythonFixedType,
+    PythonType,
+)
+
+AvroType: typing.TypeAlias = typing.Any
+MemoKey: typing.TypeAlias = typing.Tuple[str, typing.Optional[str]]
+
+# every type converted in a run is interned, so identical types are a single
+# PythonType however many schemas and fields use them. the table is dropped
+# when it gets this large, which only costs sharing
+INTERNED_TYPES_LIMIT = 65_536
+_interned: typing.Dict[typing.Hashable, PythonType] = {}
+
+
+def interned(
+    kind: str,
+    annotation: str,
+    items: typing.Tuple[PythonType, ...] = (),
+    enum: typing.Optional[PythonEnumClass] = None,
+    fixed: typing.Optional[PythonFixedType] = None,
+) -> PythonType:
+    # items are interned themselves, so their identity stands for their
+    # contents. two enums are the same type when they have the same symbols
+    key = (
+        kind,
+        annotation,
+        tuple(map(id, items)),
+        (enum.fullname, tuple(enum.values)) if enum is not None else None,
+        fixed,
+    )
+    python_type = _interned.get(key)
+    if python_type is None:
+        if len(_interned) >= INTERNED_TYPES_LIMIT:
+            _interned.clear()
+        python_type = _interned[key] = PythonType(kind, annotation, items, enum, fixed)
+    return python_type
+
+
+def defines(avro_type: AvroType) -> bool:
+    kind = avro_type.get("type") if isinstance(avro_type, dict) else None
+    return isinstance(kind, str) and kind in NAMED_TYPES
+
+
+def primitive(annotation: str) -> PythonType:
+    return interned(PRIMITIVE, annotation)
+
+
+PRIMITIVE_TYPES = {
+    "null": interned(NULL, "None"),
+    "boolean": primitive("bool"),
+    "int": primitive("types.Int32"),
+    "long": primitive("int"),
+    "float": primitive("types.Float32"),
+    "double": primitive("float"),
+    "bytes": primitive("bytes"),
+    "string": primitive("str"),
+}
+# logical types this table doesn't know are read as their underlying type,
+# as the avro specification asks
+LOGICAL_TYPES = {
+    "date": primitive("datetime.date"),
+    "time-millis": primitive("datetime.time"),
+    "time-micros": primitive("types.TimeMicro"),
+    "timestamp-millis": primitive("datetime.datetime"),
+    "timestamp-micros": primitive("types.DateTimeMicro"),
+    "uuid": primitive("uuid.UUID"),
+}
+# faust coerces a union of several types only when they are all records, or
+# all subclasses of str, bytes, int or float, which includes the str enums
+FAUST_UNION_ANNOTATIONS = frozenset({"str", "bytes", "int", "float", "bool"})
+
+
+def decimal_type(
+    avro_type: typing.Dict[str, typing.Any]
+) -> typing.Optional[PythonType]:
+    # a decimal without a valid precision and scale is read as its
+    # underlying type, as the avro specification asks
+    precision, scale = avro_type.get("precision"), avro_type.get("scale", 0)
+    if not (
+        type(precision) is int
+        and type(scale) is int
+        and 0 <= scale <= precision
+        and precision > 0
+    ):
+        return None
+    return primitive(
+        f"types.condecimal(max_digits={precision}, decimal_places={scale})"
+    )
+
+
+def logical_type(
+    avro_type: typing.Dict[str, typing.Any]
+) -> typing.Optional[PythonType]:
+    logical = avro_type.get("logicalType")
+    if logical == "decimal":
+        return decimal_type(avro_type)
+    return LOGICAL_TYPES.get(logical) if isinstance(logical, str) else None
+
+
+def faust_union(members: typing.Sequence[PythonType]) -> bool:
+    members = [member for member in members if member.kind != NULL]
+    return (
+        len(members) < 2
+        or all(member.kind == RECORD for member in members)
+        or all(
+            member.kind == ENUM
+            or (
+                member.kind == PRIMITIVE
+                and member.annotation in FAUST_UNION_ANNOTATIONS
+            )
+            for member in members
+        )
+    )
+
+
+class TypeConverter:
+    # converts the types of one schema. named types are resolved against the
+    # definitions seen so far in the schema, then against named_types
+    def __init__(
+        self,
+        named_types: typing.Optional[typing.Mapping[str, NamedTypeJson]] = None,
+        memoize: bool = True,
+    ) -> None:
+        self.named_types = named_types or {}
+        self.memoize = memoize
+        self.enums: typing.List[PythonEnumClass] = []
+        self.models: typing.List[PythonAvroModel] = []
+        self.fixed_types: typing.List[PythonFixedType] = []
+        self._types: typing.Dict[str, PythonType] = {}
+        self._definitions: typing.Dict[str, NamedTypeJson] = {}
+        self._open_records: typing.List[str] = []
+        self._memo: typing.Dict[MemoKey, PythonType] = {}
+
+    def model(self, schema: NamedTypeJson) -> PythonAvroModel:
+        self.record(schema, None)
+        return self.models[-1]
+
+    def field(
+        self, avro_field: typing.Dict[str, typing.Any], namespace: typing.Optional[str]
+    ) -> PythonAvroField:
+        python_type = self.field_type(avro_field["type"], namespace)
+        optional = python_type.without_null
+        items = optional.items[0] if optional.kind == ARRAY else None
+        return PythonAvroField(
+            name=avro_field["name"],
+            type=python_type.annotation,
+            doc=avro_field.get("doc"),
+            default=avro_field.get("default"),
+            has_default="default" in avro_field,
+            enum_items=items.enum if items is not None else None,
+            record=optional.annotation if optional.kind == RECORD else None,
+            python_type=python_type,
+        )
+
+    def field_type(
+        self, avro_type: AvroType, namespace: typing.Optional[str]
+    ) -> PythonType:
+        # wide schemas repeat the same field types many times over. a schema
+        # defines every name once, so a type defining one never repeats
+        if not self.memoize or isinstance(avro_type, str) or defines(avro_type):
+            return self.convert(avro_type, namespace)
+        # the types of a decoded schema keep the order of their keys, and
+        # equal types written in another order still convert to the same
+        # interned PythonType. repr is much cheaper than sorting the keys
+        key = (repr(avro_type), namespace)
+        python_type = self._memo.get(key)
+        if python_type is None:
+            python_type = self._memo[key] = self.convert(avro_type, namespace)
+        return python_type
+
+    def convert(
+        self, avro_type: AvroType, namespace: typing.Optional[str]
+    ) -> PythonType:
+        if isinstance(avro_type, str):
+            python_type = PRIMITIVE_TYPES.get(avro_type)
+            if python_type is None:
+                python_type = self.reference(avro_type, namespace)
+            return python_type
+        if isinstance(avro_type, list):
+            return self.union(avro_type, namespace)
+        if isinstance(avro_type, dict) and "type" in avro_type:
+            kind = avro_type["type"]
+            convert = CONVERTERS.get(kind) if isinstance(kind, str) else None
+            if convert is not None:
+                return convert(self, avro_type, namespace)
+            logical = logical_type(avro_type)
+            if logical is not None:
+                return logical
+            return self.convert(kind, namespace)
+        raise NotImplementedError(avro_type)
+
+    def reference(self, name: str, namespace: typing.Optional[str]) -> PythonType:
+        name = fullname(name, namespace)
+        if name in self._open_records:
+            # the class would have to be used in its own annotations
+            raise NotImplementedError(f"{name} references itself")
+        python_type = self._types.get(name)
+        if python_type is not None:
+            return python_type
+        definition = self.named_types.get(name)
+        if definition is None:
+            raise UnresolvedReferenceError(f"{name} is not defined by any schema")
+        if definition["type"] in RECORD_TYPES:
+            # the record is generated from the schema that defines it
+            python_type = interned(RECORD, name.rpartition(".")[2])
+        else:
+            python_type = CONVERTERS[definition["type"]](
+                self, definition, namespace_of(name)
+            )
+        self._types[name] = python_type
+        return python_type
+
+    def define(
+        self,
+        definition: NamedTypeJson,
+        namespace: typing.Optional[str],
+        python_type: PythonType,
+    ) -> str:
+        name = fullname(definition["name"], definition.get("namespace", namespace))
+        self._types[name] = python_type
+        self._definitions[name] = standalone(definition, namespace)
+        return name
+
+    def union(
+        self, avro_types: typing.List[AvroType], namespace: typing.Optional[str]
+    ) -> PythonType:
+        members = tuple(self.convert(t, namespace) for t in avro_types)
+        annotations = ", ".join(member.annotation for member in members)
+        if not faust_union(members):
+            raise NotImplementedError(
+                f"faust can't coerce typing.Union[{annotations}], the types of a "
+                "union other than null must be all records, or all of string, "
+                "bytes, long, double, boolean and enums"
+            )
+        return interned(UNION, f"typing.Union[{annotations}]", members)
+
+    def array(
+        self, avro_type: typing.Dict[str, typing.Any], namespace: typing.Optional[str]
+    ) -> PythonType:
+        items = self.convert(avro_type["items"], namespace)
+        return interned(ARRAY, f"typing.List[{items.annotation}]", (items,))
+
+    def map(
+        self, avro_type: typing.Dict[str, typing.Any], namespace: typing.Optional[str]
+    ) -> PythonType:
+        values = self.convert(avro_type["values"], namespace)
+        return interned(MAP, f"typing.Dict[str, {values.annotation}]", (values,))
+
+    def enum(
+        self, definition: NamedTypeJson, namespace: typing.Optional[str]
+    ) -> PythonType:
+        name = fullname(definition["name"], definition.get("namespace", namespace))
+        enum = PythonEnumClass(
+            name=name.rpartition(".")[2],
+            values=definition["symbols"],
+            namespace=namespace_of(name),
+        )
+        python_type = interned(ENUM, enum.name, enum=enum)
+        self.define(definition, namespace, python_type)
+        self.enums.append(python_type.enum or enum)
+        return python_type
+
+    def fixed(
+        self, definition: NamedTypeJson, namespace: typing.Optional[str]
+    ) -> PythonType:
+        name = fullname(definition["name"], definition.get("namespace", namespace))
+        fixed = PythonFixedType(
+            name=name.rpartition(".")[2],
+            size=definition["size"],
+            annotation=(
+                logical_type(definition) or PRIMITIVE_TYPES["bytes"]
+            ).annotation,
+            namespace=namespace_of(name),
+        )
+        python_type = interned(PRIMITIVE, fixed.annotation, fixed=fixed)
+        self.define(definition, namespace, python_type)
+        self.fixed_types.append(fixed)
+        return python_type
+
+    def record(
+        self, definition: NamedTypeJson, namespace: typing.Optional[str]
+    ) -> PythonType:
+        nested = bool(self._open_records)
+        python_type = interned(RECORD, definition["name"].rpartition(".")[2])
+        name = self.define(definition, namespace, python_type)
+        self._open_records.append(name)
+        fields = [
+            self.field(avro_field, namespace_of(name))
+            for avro_field in definition.get("fields", [])
+        ]
+        self._open_records.pop()
+
+        schema = standalone(definition, namespace)
+        if nested:
+            # the schema of a nested record stands on its own too, so it
+            # carries the definitions it uses from the rest of the file
+            schema = expand_references(
+                schema, {**self.named_types, **self._definitions}
+            )
+        elif self.named_types:
+            schema = expand_references(schema, self.named_types)
+        self.models.append(
+            PythonAvroModel(
+                name=python_type.annotation,
+                namespace=namespace_of(name),
+                example=definition.get("example"),
+                # ensures that fields with defaults are at the end  of the class definition
+                fields=sorted(fields, key=lambda x: x.has_default),
+                schema=schema,
+            )
+        )
+        return python_type
+
+
+# converters by avro type tag. unions are lists and primitives are plain
+# names, so neither needs an entry
+CONVERTERS: typing.Dict[
+    str,
+    typing.Callable[
+        [TypeConverter, typing.Dict[str, typing.Any], typing.Optional[str]], PythonType
+    ],
+] = {
+    "array": TypeConverter.array,
+    "map": TypeConverter.map,
+    "enum": TypeConverter.enum,
+    "fixed": TypeConverter.fixed,
+    "record": TypeConverter.record,
+    "error": TypeConverter.record,
+}
@@ -1,11 +1,15 @@
+import collections
 import dataclasses
+import functools
+import hashlib
 import json
+import threading
 import typing
 
-from dataclasses_avroschema import field_utils
-from dataclasses_avroschema.model_generator.lang.python.avro_to_python_utils import (
-    AVRO_TYPE_TO_PYTHON,
-)
+from faust_avro_model_codegen import schema_graph
+from faust_avro_model_codegen.json_backend import JsonLoads, json_loads
+from faust_avro_model_codegen.schema_graph import NamedTypeJson
+
 
 SchemaName: typing.TypeAlias = str
 SchemaJson: typing.TypeAlias = dict[str, typing.Any]
@@ -20,11 +24,180 @@ class SchemaData:
     def from_file(cls, file_stem: str, file_json: str) -> "SchemaData":
         return cls(name=file_stem, schema=json.loads(file_json))
 
+    @classmethod
+    def from_bytes(
+        cls, file_stem: str, raw: bytes, loads: typing.Optional[JsonLoads] = None
+    ) -> "LazySchemaData":
+        return LazySchemaData(name=file_stem, raw=raw, loads=loads)
+
+
+# decoded schemas are kept up to this many bytes of source, so identical files
+# decode once without holding every schema of a large run in memory
+DECODED_SCHEMA_CACHE_BYTES = 8 * 1024 * 1024
+
+
+class DecodedSchemaCache:
+    def __init__(self, max_bytes: int = DECODED_SCHEMA_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: collections.OrderedDict[str, typing.Tuple[SchemaJson, int]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, content_hash: str, raw: bytes, loads: JsonLoads) -> SchemaJson:
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+                return entry[0]
+        schema = loads(raw)
+        if len(raw) > self.max_bytes:
+            return schema
+        with self._lock:
+            if content_hash not in self._entries:
+                self._entries[content_hash] = (schema, len(raw))
+                self.size += len(raw)
+            while self.size > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.size -= size
+        return schema
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+decoded_schemas = DecodedSchemaCache()
+
+
+class LazySchemaData(SchemaData):
+    # holds the file's bytes and decodes them the first time schema is read
+    def __init__(
+        self,
+        name: SchemaName,
+        raw: bytes,
+        loads: typing.Optional[JsonLoads] = None,
+    ) -> None:
+        self.name = name
+        self.raw = raw
+        self.loads = loads
+        self._schema: typing.Optional[SchemaJson] = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r}, content_hash={self.content_hash!r})"
+
+    @functools.cached_property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.raw).hexdigest()
+
+    @property
+    def decoded(self) -> bool:
+        return self._schema is not None
+
+    @property
+    def schema(self) -> SchemaJson:  # type: ignore[override]
+        if self._schema is None:
+            self._schema = decoded_schemas.get(
+                self.content_hash, self.raw, self.loads or json_loads()
+            )
+        return self._schema
+
 
 @dataclasses.dataclass
 class PythonEnumClass:
     name: str
     values: typing.List[str]
+    namespace: typing.Optional[str] = None
+
+    @property
+    def fullname(self) -> str:
+        return schema_graph.fullname(self.name, self.namespace)
+
+
+@dataclasses.dataclass(frozen=True)
+class PythonFixedType:
+    # fixed types become the python type in annotation, not a class of their
+    # own, and are only kept to tell apart two definitions of one name
+    name: str
+    size: int
+    annotation: str
+    namespace: typing.Optional[str] = None
+
+    @property
+    def fullname(self) -> str:
+        return schema_graph.fullname(self.name, self.namespace)
+
+
+@dataclasses.dataclass(frozen=True)
+class PythonRecordClass:
+    # what is kept of a generated record to tell apart two definitions of
+    # one name, without holding on to its fields and schema
+    name: str
+    digest: str
+    namespace: typing.Optional[str] = None
+
+    @property
+    def fullname(self) -> str:
+        return schema_graph.fullname(self.name, self.namespace)
+
+
+NULL = "null"
+PRIMITIVE = "primitive"
+ENUM = "enum"
+RECORD = "record"
+ARRAY = "array"
+MAP = "map"
+UNION = "union"
+
+
+@dataclasses.dataclass(frozen=True)
+class PythonType:
+    # the python side of an avro type. kind is one of the constants above,
+    # items holds the array or map values and the union members
+    kind: str
+    annotation: str
+    items: typing.Tuple["PythonType", ...] = ()
+    enum: typing.Optional[PythonEnumClass] = dataclasses.field(
+        default=None, compare=False
+    )
+    # the fixed type a bytes or logical type is read from
+    fixed: typing.Optional[PythonFixedType] = dataclasses.field(
+        default=None, compare=False
+    )
+
+    @property
+    def members(self) -> typing.List["PythonType"]:
+        return [item for item in self.items if item.kind != NULL]
+
+    @property
+    def nullable(self) -> bool:
+        return self.kind == UNION and len(self.members) < len(self.items)
+
+    @property
+    def without_null(self) -> "PythonType":
+        # the other member of a union with null, otherwise the type itself
+        if self.kind == UNION and len(self.items) == 2:
+            members = self.members
+            if len(members) == 1:
+                return members[0]
+        return self
+
+    def records(self) -> typing.Iterator[str]:
+        if self.kind == RECORD:
+            yield self.annotation
+        for item in self.items:
+            yield from item.records()
+
+    def enums(self) -> typing.Iterator[PythonEnumClass]:
+        if self.enum is not None:
+            yield self.enum
+        for item in self.items:
+            yield from item.enums()
 
 
 @dataclasses.dataclass
@@ -34,6 +207,19 @@ class PythonAvroField:
     doc: typing.Optional[str] = None
     default: typing.Optional[typing.Any] = None
     has_default: bool = False
+    enum_items: typing.Optional[PythonEnumClass] = None
+    # the class of a record field, which may be None
+    record: typing.Optional[str] = None
+    # the converted type behind the annotation, shared by identical types
+    python_type: typing.Optional[PythonType] = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
+
+    @property
+    def records(self) -> typing.Set[str]:
+        if self.python_type is None:
+            return {self.record} if self.record else set()
+        return set(self.python_type.records())
 
 
 @dataclasses.dataclass
@@ -42,6 +228,25 @@ class PythonAvroModel:
     namespace: typing.Optional[str] = None
     example: typing.Optional[typing.Dict[str, typing.Any]] = None
     fields: typing.List[PythonAvroField] = dataclasses.field(default_factory=list)
+    schema: typing.Optional[SchemaJson] = None
+
+    @property
+    def fullname(self) -> str:
+        return schema_graph.fullname(self.name, self.namespace)
+
+    @property
+    def record_class(self) -> PythonRecordClass:
+        # the class is generated from the schema, models built without one
+        # only have their fields
+        if self.schema is not None:
+            definition = json.dumps(self.schema, sort_keys=True)
+        else:
+            definition = repr((self.example, self.fields))
+        return PythonRecordClass(
+            name=self.name,
+            digest=hashlib.sha256(definition.encode()).hexdigest(),
+            namespace=self.namespace,
+        )
 
 
 @dataclasses.dataclass
@@ -49,6 +254,7 @@ class CodeGenResultData:
     classes: list[typing.Any]
     dependencies: list[typing.Any]
     schemas: dict[str, typing.Any]
+    fixed_types: list[PythonFixedType] = dataclasses.field(default_factory=list)
 
     @classmethod
     def empty(cls) -> "CodeGenResultData":
@@ -58,131 +264,68 @@ class CodeGenResultData:
         classes = [*self.classes, *other.classes]
         dependencies = [*self.dependencies, *other.dependencies]
         schemas = {**self.schemas, **other.schemas}
+        fixed_types = [*self.fixed_types, *other.fixed_types]
         return self.__class__(
-            classes=classes, dependencies=dependencies, schemas=schemas
+            classes=classes,
+            dependencies=dependencies,
+            schemas=schemas,
+            fixed_types=fixed_types,
         )
 
+    def __iadd__(self, other: "CodeGenResultData") -> "CodeGenResultData":
+        self.classes.extend(other.classes)
+        self.dependencies.extend(other.dependencies)
+        self.schemas.update(other.schemas)
+        self.fixed_types.extend(other.fixed_types)
+        return self
+
     @classmethod
-    def from_schema_data(cls, schema_data: SchemaData) -> "CodeGenResultData":
-        c, deps = cls.parse_models_for_schema(schema_data.schema)
-        schema = {schema_data.name: schema_data.schema}
+    def concat(
+        cls, results: typing.Iterable["CodeGenResultData"]
+    ) -> "CodeGenResultData":
+        accum = cls.empty()
+        for result in results:
+            accum += result
+        return accum
+
+    @classmethod
+    def from_schema_data(
+        cls,
+        schema_data: SchemaData,
+        named_types: typing.Optional[typing.Mapping[str, NamedTypeJson]] = None,
+    ) -> "CodeGenResultData":
+        # imported on use, the converter builds on the classes defined here
+        from faust_avro_model_codegen.type_converter import TypeConverter
+
+        converter = TypeConverter(named_types)
+        c = converter.model(schema_data.schema)
+        schema = {schema_data.name: c.schema}
+        # records declared inside the schema come before the records using them
         return cls(
-            classes=[c],
-            dependencies=deps,
+            classes=converter.models,
+            dependencies=converter.enums,
             schemas=schema,
+            fixed_types=converter.fixed_types,
         )
 
     @classmethod
     def parse_models_for_schema(
         cls,
         schema: typing.Dict[str, typing.Any],
+        named_types: typing.Optional[typing.Mapping[str, NamedTypeJson]] = None,
     ) -> typing.Tuple[PythonAvroModel, typing.List[typing.Any]]:
-        fields = []
-        dependencies = []
-        for avro_field in schema["fields"]:
-            python_field, python_deps = cls.convert_avro_field_to_python(avro_field)
-            fields.append(python_field)
-            dependencies += python_deps
-
-        c = PythonAvroModel(
-            name=schema["name"],
-            namespace=schema.get("namespace"),
-            example=schema.get("example"),
-            # ensures that fields with defaults are at the end  of the class definition
-            fields=sorted(
-                [field for field in fields if field is not None],
-                key=lambda x: x.has_default,
-            ),
-        )
+        from faust_avro_model_codegen.type_converter import TypeConverter
 
-        return c, dependencies
+        converter = TypeConverter(named_types)
+        return converter.model(schema), converter.enums
 
     @staticmethod
     def convert_avro_field_to_python(
         field: dict[str, typing.Any],
+        namespace: typing.Optional[str] = None,
+        named_types: typing.Optional[typing.Mapping[str, NamedTypeJson]] = None,
     ) -> typing.Tuple[PythonAvroField, typing.List[PythonEnumClass | None]]:
-        match field["type"]:
-            case (
-                field_utils.STRING
-                | field_utils.LONG
-                | field_utils.INT
-                | field_utils.BOOLEAN
-                | field_utils.FLOAT
-                | field_utils.DOUBLE
-            ) as field_type:
-                return (
-                    PythonAvroField(
-                        name=field["name"],
-                        type=AVRO_TYPE_TO_PYTHON[field_type],
-                        doc=field.get("doc"),
-                        default=field.get("default"),
-                        has_default="default" in field,
-                    ),
-                    [],
-                )
-
-            case {"type": field_utils.LONG, "logicalType": logical_type}:
-                return (
-                    PythonAvroField(
-                        name=field["name"],
-                        type=AVRO_TYPE_TO_PYTHON[logical_type],
-                        doc=field.get("doc"),
-                        default=field.get("default"),
-                        has_default="default" in field,
-                    ),
-                    [],
-                )
-
-            case [
-                "null",
-                {
-                    "type": field_utils.ARRAY,
-                    "items": {
-                        "type": field_utils.ENUM,
-                        "name": name,
-                        "symbols": symbols,
-                    },
-                },
-            ]:
-                e = PythonEnumClass(name=name, values=symbols)
-                return (
-                    PythonAvroField(
-                        name=field["name"],
-                        type=f"typing.Union[None, typing.List[{name}]]",
-                        doc=field.get("doc"),
-                        default=field.get("default"),
-                        has_default="default" in field,
-                    ),
-                    [e],
-                )
-            case list(types):
-                resolved_types = ",".join([AVRO_TYPE_TO_PYTHON[t] for t in types])
-                displayed_types = f"typing.Union[{resolved_types}]"
-                return (
-                    PythonAvroField(
-                        name=field["name"],
-                        type=displayed_types,
-                        doc=field.get("doc"),
-                        default=field.get("default"),
-                        has_default="default" in field,
-                    ),
-                    [],
-                )
-
-            case {
-                "type": field_utils.ARRAY,
-                "items": {"type": field_utils.ENUM, "name": name, "symbols": symbols},
-            }:
-                e = PythonEnumClass(name=name, values=symbols)  # type: ignore
-                return (
-                    PythonAvroField(
-                        name=field["name"],
-                        type=f"typing.List[{name}]",
-                        doc=field.get("doc"),
-                        default=field.get("default"),
-                        has_default="default" in field,
-                    ),
-                    [e],
-                )
-            case _:
-                raise NotImplementedError(field)
+        from faust_avro_model_codegen.type_converter import TypeConverter
+
+        converter = TypeConverter(named_types)
+        return converter.field(field, namespace), list(converter.enums)
@@ -0,0 +1,100 @@
+import dataclasses
+import hashlib
+import json
+import pathlib
+import time
+import typing
+
+from faust_avro_model_codegen.fingerprint import DEFAULT_ALGORITHM, schema_fingerprint
+from faust_avro_model_codegen.types import SchemaName
+
+CACHE_FORMAT = 3
+
+
+@dataclasses.dataclass
+class CachedVerification:
+    fingerprint: str
+    schema_sha256: str
+    id: int
+    verified_at: float
+
+
+class VerificationCache:
+    def __init__(
+        self,
+        path: pathlib.Path,
+        schema_registry_url: str,
+        ttl: typing.Optional[float] = None,
+        algorithm: str = DEFAULT_ALGORITHM,
+        clock: typing.Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.schema_registry_url = schema_registry_url
+        self.ttl = ttl
+        self.algorithm = algorithm
+        self.clock = clock
+        self._registries = self._load()
+        self._entries = self._registries.setdefault(schema_registry_url, {})
+
+    def _load(self) -> dict[str, dict[SchemaName, CachedVerification]]:
+        try:
+            data = json.loads(self.path.read_text())
+            if data["format"] != CACHE_FORMAT or data["algorithm"] != self.algorithm:
+                return {}
+            return {
+                url: {s: CachedVerification(**e) for s, e in entries.items()}
+                for url, entries in data["registries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(
+                {
+                    "format": CACHE_FORMAT,
+                    "algorithm": self.algorithm,
+                    "registries": {
+                        url: {s: dataclasses.asdict(e) for s, e in entries.items()}
+                        for url, entries in self._registries.items()
+                    },
+                },
+                indent=2,
+                sort_keys=True,
+            )
+        )
+
+    def _key(self, schema: str) -> typing.Tuple[str, str]:
+        # the canonical form drops docs and defaults, which the registry does
+        # compare, so a digest of the schema json guards against those changes
+        exact = json.dumps(json.loads(schema), sort_keys=True, separators=(",", ":"))
+        return (
+            schema_fingerprint(schema, self.algorithm),
+            hashlib.sha256(exact.encode()).hexdigest(),
+        )
+
+    def lookup(self, subject: SchemaName, schema: str) -> typing.Optional[int]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        if self.ttl is not None and self.clock() - entry.verified_at > self.ttl:
+            return None
+        if (entry.fingerprint, entry.schema_sha256) != self._key(schema):
+            return None
+        return entry.id
+
+    def store(self, subject: SchemaName, schema: str, schema_id: int) -> None:
+        fingerprint, schema_sha256 = self._key(schema)
+        self._entries[subject] = CachedVerification(
+            fingerprint=fingerprint,
+            schema_sha256=schema_sha256,
+            id=schema_id,
+            verified_at=self.clock(),
+        )
+
+    def invalidate(self, subject: typing.Optional[SchemaName] = None) -> None:
+        if subject is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(subject, None)
@@ -0,0 +1,150 @@
+import dataclasses
+import pathlib
+import time
+import typing
+
+from .parallel import (
+    RenderedChunk,
+    assemble_module,
+    assemble_package,
+    load_schema,
+    merge_chunks,
+    package_modules,
+    render_chunk,
+)
+from .schema_graph import SchemaGraph
+from .template_renderer import RenderedTemplate, TemplateRenderer
+from .template_writer import TemplateWriter
+
+POLL_INTERVAL = 0.5
+DEBOUNCE = 0.2
+
+SchemaStat: typing.TypeAlias = typing.Tuple[int, int]
+
+
+@dataclasses.dataclass
+class SchemaChanges:
+    changed: typing.List[pathlib.Path]
+    removed: typing.List[pathlib.Path]
+
+
+def scan(
+    schema_files: typing.Iterable[pathlib.Path],
+) -> typing.Dict[pathlib.Path, SchemaStat]:
+    stats = {}
+    for schema_file in schema_files:
+        try:
+            stat = schema_file.stat()
+        except FileNotFoundError:
+            # removed between listing the directory and reading its stat
+            continue
+        stats[schema_file] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def poll_changes(
+    discover: typing.Callable[[], typing.Iterable[pathlib.Path]],
+    interval: float = POLL_INTERVAL,
+    debounce: float = DEBOUNCE,
+    known: typing.Optional[typing.Dict[pathlib.Path, SchemaStat]] = None,
+) -> typing.Iterator[SchemaChanges]:
+    known = scan(discover()) if known is None else known
+    while True:
+        time.sleep(interval)
+        current = scan(discover())
+        if current == known:
+            continue
+        # editors and checkouts touch files in bursts, so wait until the
+        # directory stops changing and regenerate once for all of them
+        while True:
+            time.sleep(debounce)
+            settled = scan(discover())
+            if settled == current:
+                break
+            current = settled
+        yield SchemaChanges(
+            changed=[f for f, stat in current.items() if known.get(f) != stat],
+            removed=[f for f in known if f not in current],
+        )
+        known = current
+
+
+class IncrementalBuild:
+    def __init__(
+        self,
+        renderer: TemplateRenderer,
+        writer: TemplateWriter,
+        output: pathlib.Path,
+        layout: str = "module",
+    ) -> None:
+        self.renderer = renderer
+        self.writer = writer
+        self.output = output
+        self.layout = layout
+        # the rendered classes of every schema stay in memory, so a change
+        # only converts and renders the schemas that changed and the ones
+        # that reference them
+        self.graph: SchemaGraph[pathlib.Path] = SchemaGraph(load_schema)
+        self.chunks: typing.Dict[pathlib.Path, RenderedChunk] = {}
+        self.modules: typing.Dict[pathlib.Path, str] = {}
+        self.written: typing.Dict[str, RenderedTemplate] = {}
+        self.pending = SchemaChanges(changed=[], removed=[])
+
+    @property
+    def schema_files(self) -> typing.List[pathlib.Path]:
+        return sorted(self.chunks)
+
+    def update(
+        self,
+        changed: typing.Iterable[pathlib.Path],
+        removed: typing.Iterable[pathlib.Path] = (),
+    ) -> None:
+        changed, removed = set(changed), set(removed)
+        # changes from an update that failed are applied with the next one
+        changed |= set(self.pending.changed) - removed
+        removed |= set(self.pending.removed) - changed
+        self.pending = SchemaChanges(changed=sorted(changed), removed=sorted(removed))
+        graph = self.graph.copy()
+        affected = graph.update({f: load_schema(f) for f in changed}, removed)
+        chunks = dict(self.chunks)
+        modules = dict(self.modules)
+        for schema_file in removed:
+            chunks.pop(schema_file, None)
+            modules.pop(schema_file, None)
+        for schema_file in graph.order(sorted(affected)):
+            chunks[schema_file] = render_chunk(
+                self.renderer,
+                [schema_file],
+                self.layout != "module",
+                graph.named_types([schema_file]),
+            )
+            if self.layout != "module" and schema_file in changed:
+                [modules[schema_file]] = package_modules(
+                    [schema_file], self.layout, graph
+                )
+        self.written = self._write(graph, chunks, modules)
+        self.graph = graph
+        self.chunks = chunks
+        self.modules = modules
+        self.pending = SchemaChanges(changed=[], removed=[])
+
+    def _write(
+        self,
+        graph: SchemaGraph[pathlib.Path],
+        chunks: typing.Dict[pathlib.Path, RenderedChunk],
+        modules: typing.Dict[pathlib.Path, str],
+    ) -> typing.Dict[str, RenderedTemplate]:
+        schema_files = graph.order(sorted(chunks))
+        if self.layout == "module":
+            module = assemble_module(self.renderer, [chunks[f] for f in schema_files])
+            self.writer.write(self.output, module)
+            return {self.output.name: module}
+        grouped: typing.Dict[str, typing.List[RenderedChunk]] = {}
+        for schema_file in schema_files:
+            grouped.setdefault(modules[schema_file], []).append(chunks[schema_file])
+        package = assemble_package(
+            self.renderer,
+            {name: merge_chunks(module) for name, module in grouped.items()},
+        )
+        self.writer.write_package(self.output, package, previous=self.written)
+        return package
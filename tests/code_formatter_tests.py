@@ -0,0 +1,133 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from faust_avro_model_codegen import TemplateWriter
+from faust_avro_model_codegen.code_formatter import CodeFormatter
+from faust_avro_model_codegen.template_renderer import RenderedTemplate
+
+
+def test_code_formatter_format_dedupes_and_removes_unused_imports(tmp_path: Path):
+    source = (
+        "import typing, enum\n"
+        "class A:\n"
+        "    x: typing.List[int]\n"
+        "import typing, enum, datetime\n"
+        "class B:\n"
+        "    y: typing.Optional[int]\n"
+    )
+    actual = CodeFormatter().format(source, tmp_path / "models.py")
+    expected = (
+        "import typing\n"
+        "\n"
+        "\n"
+        "class A:\n"
+        "    x: typing.List[int]\n"
+        "\n"
+        "\n"
+        "class B:\n"
+        "    y: typing.Optional[int]\n"
+    )
+    assert actual == expected
+
+
+def test_code_formatter_reuses_configuration_for_outputs_in_the_same_directory(
+    tmp_path: Path,
+):
+    formatter = CodeFormatter()
+
+    formatter.format("x = 1\n", tmp_path / "a.py")
+    isort_config = formatter.isort_config(tmp_path)
+    black_mode = formatter.black_mode(tmp_path)
+    formatter.format("y = 2\n", tmp_path / "b.py")
+
+    assert formatter.isort_config(tmp_path) is isort_config
+    assert formatter.black_mode(tmp_path) is black_mode
+
+
+def test_code_formatter_honours_black_configuration_of_the_output_project(
+    tmp_path: Path,
+):
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 20\n")
+
+    actual = CodeFormatter().format("x = [1111, 2222, 3333]\n", tmp_path / "m.py")
+
+    assert actual == "x = [\n    1111,\n    2222,\n    3333,\n]\n"
+
+
+def test_code_formatter_line_length_is_the_black_line_length_of_the_project(
+    tmp_path: Path,
+):
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 100\n")
+
+    assert CodeFormatter().line_length(tmp_path / "app" / "models.py") == 100
+
+
+@pytest.mark.parametrize(
+    "files, expected",
+    [
+        # a pyproject.toml without black settings doesn't end the search
+        (
+            {
+                "pyproject.toml": "[tool.black]\nline_length = 70\n",
+                "app/pyproject.toml": "",
+            },
+            70,
+        ),
+        # a repository root does, whatever its pyproject.toml says
+        (
+            {"pyproject.toml": "[tool.black]\nline-length = 70\n", "app/.git/HEAD": ""},
+            88,
+        ),
+        ({"app/pyproject.toml": "[tool.black]\nline-length = 110\n"}, 110),
+    ],
+)
+def test_code_formatter_line_length_finds_the_configuration_black_uses(
+    tmp_path: Path, files: dict, expected: int
+):
+    for name, text in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(text)
+    formatter = CodeFormatter()
+
+    actual = formatter.line_length(tmp_path / "app" / "models.py")
+
+    assert actual == expected
+    assert actual == formatter.black_mode(tmp_path / "app").line_length
+
+
+def test_template_writer_writes_formatted_output_with_a_single_write(
+    tmp_path: Path,
+):
+    outfile = tmp_path / "app" / "models.py"
+    writer = TemplateWriter()
+
+    with patch.object(Path, "write_text") as mock_write_text:
+        writer.write(outfile, RenderedTemplate("x  =  'a'\n"))
+
+    mock_write_text.assert_called_once_with('x = "a"\n')
+
+
+def test_template_writer_without_formatting_writes_rendered_text_as_is(
+    tmp_path: Path,
+):
+    outfile = tmp_path / "models.py"
+
+    TemplateWriter(format_output=False).write(outfile, RenderedTemplate("x  =  'a'\n"))
+
+    assert outfile.read_text() == "x  =  'a'\n"
+
+
+def test_template_writer_without_formatting_formats_overlong_lines(tmp_path: Path):
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 100\n")
+    outfile = tmp_path / "models.py"
+    fits = "x = '{}'\n".format("a" * 92)
+    too_long = "x = '{}'  # {}\n".format("a" * 92, "b" * 8)
+    writer = TemplateWriter(format_output=False)
+
+    writer.write(outfile, RenderedTemplate(fits))
+    assert outfile.read_text() == fits
+
+    writer.write(outfile, RenderedTemplate(too_long))
+    assert outfile.read_text() == too_long.replace("'", '"')
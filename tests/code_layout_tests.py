@@ -0,0 +1,183 @@
+import random
+import string
+import typing
+
+import black
+import pytest
+
+from faust_avro_model_codegen.code_layout import (
+    Atom,
+    Bracketed,
+    Clauses,
+    annotated_assignment,
+    call,
+    dict_literal,
+    layout,
+    literal,
+    string_literal,
+    type_annotation,
+)
+
+
+def _black(source: str) -> str:
+    return black.format_str(source, mode=black.Mode())
+
+
+def _word(rnd: random.Random, low: int, high: int) -> str:
+    return "x" + "".join(
+        rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(low, high))
+    )
+
+
+def _value(rnd: random.Random, depth: int = 0):
+    r = rnd.random()
+    if depth < 3 and r < 0.2:
+        return {
+            _word(rnd, 0, 12): _value(rnd, depth + 1) for _ in range(rnd.randint(0, 5))
+        }
+    if depth < 3 and r < 0.3:
+        return [_value(rnd, depth + 1) for _ in range(rnd.randint(0, 5))]
+    if r < 0.6:
+        return _word(rnd, 0, 50) + rnd.choice(["", "'", '"', "\\", "\n", "é"])
+    return rnd.choice([None, True, 3, 1.5, -2])
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("plain", '"plain"'),
+        ("it's", '"it\'s"'),
+        ('say "hi"', "'say \"hi\"'"),
+        ("both ' and \"", '"both \' and \\""'),
+        ("back\\slash", '"back\\\\slash"'),
+        (b"\xff\x01a", 'b"\\xff\\x01a"'),
+        (b'say "hi"', "b'say \"hi\"'"),
+    ],
+)
+def test_string_literal_normalises_quotes_like_black(
+    value: typing.Union[str, bytes], expected: str
+):
+    assert string_literal(value) == expected
+    assert _black(f"x = {expected}\n") == f"x = {expected}\n"
+
+
+def test_type_annotation_normalises_spacing_of_subscripts():
+    annotation = type_annotation("typing.Union[None,typing.List[Color]]")
+
+    assert annotation.flat() == "typing.Union[None, typing.List[Color]]"
+
+
+def test_type_annotation_keeps_the_keyword_arguments_of_annotated_types():
+    annotation = type_annotation(
+        "typing.Union[None,types.condecimal(max_digits=10,decimal_places=2)]"
+    )
+
+    assert annotation.flat() == (
+        "typing.Union[None, types.condecimal(max_digits=10, decimal_places=2)]"
+    )
+
+
+def test_type_annotation_raises_value_error_on_unbalanced_brackets():
+    with pytest.raises(ValueError):
+        type_annotation("typing.List[str]]")
+
+
+def test_annotated_assignment_is_stable_under_black():
+    rnd = random.Random(20240401)
+    for _ in range(300):
+        metadata = [('"doc": ', Atom(string_literal(_word(rnd, 0, 70))))]
+        kwargs = [("metadata", dict_literal(metadata))]
+        if rnd.random() < 0.5:
+            default = literal(_value(rnd, 1))
+            metadata.append(('"default": ', default))
+            kwargs.append(("default", default))
+        annotation = rnd.choice(
+            [
+                "str",
+                "typing.List[{}]",
+                "typing.Union[None, typing.List[{}]]",
+                "typing.Dict[str, types.condecimal(max_digits=38, decimal_places=9)]",
+            ]
+        ).format(_word(rnd, 1, 30).title())
+        source = "class A:\n{}\n".format(
+            annotated_assignment(
+                _word(rnd, 1, 40),
+                type_annotation(annotation),
+                call("field", kwargs),
+                depth=1,
+            )
+        )
+
+        assert _black(source) == source
+
+
+def test_layout_of_nested_literals_is_stable_under_black():
+    rnd = random.Random(7)
+    for _ in range(300):
+        node = dict_literal(
+            [
+                ("**", Atom("super().avro_schema_to_python(parent, case_type)")),
+                ('"example": ', literal(_value(rnd))),
+            ]
+        )
+        source = "def f():\n{}\n".format(layout(node, prefix="return ", depth=1))
+
+        assert _black(source) == source
+
+
+def test_layout_of_attribute_assignment_is_stable_under_black():
+    rnd = random.Random(11)
+    for _ in range(300):
+        name = _word(rnd, 1, 100)
+        source = "class A:\n    def f(self):\n{}\n{}\n".format(
+            layout(Atom(f"self.{name}"), "value = ", depth=2),
+            layout(Atom("value.default"), f"self.{name} = ", depth=2),
+        )
+
+        assert _black(source) == source
+
+
+def _conditional(rnd: random.Random, value: str, depth: int = 0) -> Clauses:
+    otherwise = (
+        _conditional(rnd, value, depth + 1)
+        if depth < 2 and rnd.random() < 0.4
+        else Atom(value)
+    )
+    converted = Bracketed(
+        f"{value}.{_word(rnd, 1, 30)}", "(", ")", [], is_collection=False
+    )
+    test = Atom(f"isinstance({value}, {_word(rnd, 1, 30).title()})")
+    return Clauses([("", converted), ("if ", test), ("else ", otherwise)], True)
+
+
+def test_layout_of_comprehensions_and_conditionals_is_stable_under_black():
+    rnd = random.Random(22)
+    for _ in range(300):
+        item = _word(rnd, 1, 10)
+        loop = Atom(f"{item} in {_word(rnd, 1, 30)}")
+        body = Clauses([("", _conditional(rnd, item)), ("for ", loop)])
+        if rnd.random() < 0.5:
+            node = Bracketed("", "[", "]", [("", body)], is_collection=False)
+        else:
+            body.parts[0] = (f"{_word(rnd, 1, 10)}: ", body.parts[0][1])
+            node = Bracketed("", "{", "}", [("", body)], is_collection=False)
+        source = "def f():\n{}\n{}\n".format(
+            layout(node, prefix=f"{_word(rnd, 1, 30)} = ", depth=1),
+            layout(_conditional(rnd, "value"), prefix="value = ", depth=1),
+        )
+
+        assert _black(source) == source
+
+
+def test_layout_of_lookups_is_stable_under_black_or_left_too_long():
+    rnd = random.Random(13)
+    for _ in range(300):
+        table = _word(rnd, 1, 80).upper()
+        target = rnd.choice(["value", f'data["{_word(rnd, 1, 20)}"]'])
+        source = "class A:\n    def f(self):\n{}\n".format(
+            layout(Atom(f"self._{table}[value]"), f"{target} = ", depth=2)
+        )
+
+        # black splits these at the subscript or the target when they don't
+        # fit, the writer formats them
+        assert _black(source) == source or max(map(len, source.splitlines())) > 88
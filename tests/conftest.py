@@ -1,10 +1,11 @@
+import asyncio
 import importlib
 import json
 import shutil
 from pathlib import Path
 from types import ModuleType
-from typing import Type, Any
-from unittest.mock import Mock, MagicMock
+from typing import Type, Optional
+from unittest.mock import Mock
 
 import httpx
 import pytest
@@ -12,7 +13,9 @@ import tomlkit
 from dataclasses_avroschema.faust import AvroRecord
 
 from faust_avro_model_codegen import TemplateWriter
+from faust_avro_model_codegen.manifest import BuildManifest
 from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
 from faust_avro_model_codegen.schema_verifier import SchemaVerifier
 from faust_avro_model_codegen.template_renderer import TemplateRenderer
 from faust_avro_model_codegen.types import (
@@ -56,6 +59,65 @@ def user_schema_data(user_avro_dict: dict) -> SchemaData:
     return SchemaData(name="user", schema=user_avro_dict)
 
 
+@pytest.fixture
+def page_view_schema_data() -> SchemaData:
+    avro_file = Path(__file__).parent / "schemas" / "page_view.avsc"
+    return SchemaData.from_file("page_view", avro_file.read_text())
+
+
+@pytest.fixture
+def long_names_schema_data() -> SchemaData:
+    # names long enough that black splits the generated lines its own way
+    nested_map = {
+        "type": "map",
+        "values": {
+            "type": "array",
+            "items": [
+                "null",
+                {"type": "map", "values": {"type": "array", "items": "string"}},
+            ],
+        },
+    }
+    field_name = "identifier_of_the_session_that_the_page_view_was_recorded_during"
+    return SchemaData(
+        name="long_names",
+        schema={
+            "type": "record",
+            "name": "PageViewRecordedByTheFrontendDuringAnAuthenticatedSession",
+            "namespace": "example.avro.analytics.sessions",
+            "fields": [
+                {"name": field_name, "type": "string"},
+                {"name": "groups", "type": nested_map, "default": {}},
+                {"name": f"{field_name}_groups", "type": nested_map},
+                {
+                    "name": "counts_of_the_page_views_in_the_session",
+                    "type": [
+                        "null",
+                        {"type": "array", "items": {"type": "map", "values": "long"}},
+                    ],
+                    "default": None,
+                },
+                {
+                    "name": "kind",
+                    "type": {
+                        "type": "enum",
+                        "name": "KindOfTheDeviceThatTheSessionWasRecordedOn",
+                        "symbols": [
+                            "DESKTOP_COMPUTER_OR_LAPTOP_WITH_A_KEYBOARD_AND_A_MOUSE",
+                            "MOBILE",
+                        ],
+                    },
+                },
+                {
+                    "name": f"{field_name}_digest",
+                    "type": ["null", "bytes"],
+                    "default": None,
+                },
+            ],
+        },
+    )
+
+
 @pytest.fixture
 def all_schemas(
     user_schema_data: SchemaData, blog_post_schema_data: SchemaData
@@ -90,7 +152,7 @@ def python_avro_model() -> PythonAvroModel:
             ),
             PythonAvroField(
                 name="favorite_number",
-                type="typing.Union[types.Int32,None]",
+                type="typing.Union[types.Int32, None]",
                 doc=None,
                 default=None,
                 has_default=False,
@@ -101,6 +163,9 @@ def python_avro_model() -> PythonAvroModel:
                 doc=None,
                 default=None,
                 has_default=False,
+                enum_items=PythonEnumClass(
+                    name="Color", values=["RED", "GREEN", "BLUE"]
+                ),
             ),
             PythonAvroField(
                 name="additional_field",
@@ -108,6 +173,9 @@ def python_avro_model() -> PythonAvroModel:
                 doc=None,
                 default=None,
                 has_default=False,
+                enum_items=PythonEnumClass(
+                    name="AdditionalColor", values=["YELLOW", "PURPLE", "ORANGE"]
+                ),
             ),
             PythonAvroField(
                 name="timestamp_field",
@@ -118,7 +186,7 @@ def python_avro_model() -> PythonAvroModel:
             ),
             PythonAvroField(
                 name="new_field",
-                type="typing.Union[None,str]",
+                type="typing.Union[None, str]",
                 doc=None,
                 default="null",
                 has_default=True,
@@ -224,54 +292,232 @@ def generated_modules_dict(generated_module: ModuleType) -> dict[str, Type[AvroR
     }
 
 
-class FakeHttpResponse:
-    def __init__(self, status_code: int, json: dict[str, Any]):
-        self.status_code = status_code
-        self._json = json
+@pytest.fixture
+def schema_dir(tmp_path: Path, user_avro_json: str, blog_post_avro_json: str) -> Path:
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    (schema_dir / "user.avsc").write_text(user_avro_json)
+    (schema_dir / "blog_post.avsc").write_text(blog_post_avro_json)
+    return schema_dir
 
-    def json(self):
-        return self._json
 
-    def raise_for_status(self):
-        if self.status_code >= 400:
-            raise httpx.HTTPStatusError("BOOM", request=Mock(), response=Mock())
+@pytest.fixture
+def referencing_schemas() -> dict[str, dict]:
+    # account references zip_address, which references region
+    return {
+        "account": {
+            "type": "record",
+            "name": "Account",
+            "namespace": "com.acme.accounts",
+            "fields": [
+                {"name": "id", "type": "string"},
+                {"name": "home", "type": "com.acme.geo.ZipAddress"},
+                {
+                    "name": "work",
+                    "type": ["null", "com.acme.geo.ZipAddress"],
+                    "default": None,
+                },
+            ],
+        },
+        "region": {
+            "type": "record",
+            "name": "Region",
+            "namespace": "com.acme.geo",
+            "fields": [{"name": "name", "type": "string"}],
+        },
+        "zip_address": {
+            "type": "record",
+            "name": "ZipAddress",
+            "namespace": "com.acme.geo",
+            "fields": [
+                {"name": "street", "type": "string"},
+                {"name": "region", "type": "Region"},
+                {
+                    "name": "since",
+                    "type": {"type": "long", "logicalType": "timestamp-millis"},
+                },
+            ],
+        },
+    }
 
 
 @pytest.fixture
-def mock_httpx_client_success() -> MagicMock:
-    client = MagicMock()
-    client.__enter__.return_value = client
-    client.__exit__.return_value = None
-    client.post.return_value = FakeHttpResponse(
-        status_code=200,
-        json={"id": 1},
-    )
-    return client
+def nested_schema() -> dict:
+    # records, enums and fixed types declared inline and used in containers
+    return {
+        "type": "record",
+        "name": "Order",
+        "namespace": "com.acme.shop",
+        "fields": [
+            {
+                "name": "customer",
+                "type": {
+                    "type": "record",
+                    "name": "Customer",
+                    "fields": [
+                        {"name": "name", "type": "string"},
+                        {
+                            "name": "tier",
+                            "type": {
+                                "type": "enum",
+                                "name": "Tier",
+                                "symbols": ["GOLD", "SILVER"],
+                            },
+                        },
+                    ],
+                },
+            },
+            {
+                "name": "lines",
+                "type": {
+                    "type": "array",
+                    "items": {
+                        "type": "record",
+                        "name": "Line",
+                        "fields": [
+                            {"name": "sku", "type": "string"},
+                            {
+                                "name": "price",
+                                "type": {
+                                    "type": "bytes",
+                                    "logicalType": "decimal",
+                                    "precision": 10,
+                                    "scale": 2,
+                                },
+                            },
+                            {
+                                "name": "shipped",
+                                "type": [
+                                    "null",
+                                    {"type": "long", "logicalType": "timestamp-millis"},
+                                ],
+                            },
+                        ],
+                    },
+                },
+            },
+            {"name": "by_sku", "type": {"type": "map", "values": "Line"}},
+            {"name": "tiers", "type": {"type": "map", "values": "Tier"}},
+            {"name": "digest", "type": {"type": "fixed", "name": "Digest", "size": 4}},
+            {"name": "payer", "type": ["null", "Customer", "Line"], "default": None},
+        ],
+    }
 
 
 @pytest.fixture
-def mock_httpx_client_failure() -> MagicMock:
-    client = MagicMock()
-    client.__enter__.return_value = client
-    client.__exit__.return_value = None
-    client.post.return_value = FakeHttpResponse(
-        status_code=404,
-        json={},
+def referencing_schema_dir(tmp_path: Path, referencing_schemas: dict) -> Path:
+    schema_dir = tmp_path / "referencing_schemas"
+    schema_dir.mkdir()
+    for name, schema in referencing_schemas.items():
+        (schema_dir / f"{name}.avsc").write_text(json.dumps(schema))
+    return schema_dir
+
+
+def inline_address(*fields: str) -> dict:
+    return {
+        "type": "record",
+        "name": "Address",
+        "fields": [{"name": f, "type": "string"} for f in fields],
+    }
+
+
+@pytest.fixture
+def inline_address_schema_dir(tmp_path: Path) -> Path:
+    # every schema defines the same shop.Address inline
+    schema_dir = tmp_path / "inline_address_schemas"
+    schema_dir.mkdir()
+    for name in ("A", "B", "C"):
+        schema = {
+            "type": "record",
+            "name": name,
+            "namespace": "shop",
+            "fields": [{"name": "address", "type": inline_address("street")}],
+        }
+        (schema_dir / f"{name.lower()}.avsc").write_text(json.dumps(schema))
+    return schema_dir
+
+
+@pytest.fixture
+def build_manifest(tmp_path: Path, schema_dir: Path) -> BuildManifest:
+    return BuildManifest(
+        manifest_file=tmp_path / ".models.py.manifest.json",
+        schema_files=AvroSchemaDirectoryParser.schema_files(schema_dir),
+        template_files=TemplateRenderer.template_files(),
+        settings_digest="settings",
     )
-    return client
+
+
+class FakeSchemaRegistry:
+    def __init__(
+        self,
+        subjects: Optional[dict[str, int]] = None,
+        unavailable_responses: int = 0,
+        latency: float = 0.0,
+    ):
+        self.subjects = subjects or {}
+        self.unavailable_responses = unavailable_responses
+        self.latency = latency
+        self.requests: list[httpx.Request] = []
+        self.clients_created = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if self.unavailable_responses > 0:
+            self.unavailable_responses -= 1
+            return httpx.Response(503, json={"error_code": 50003})
+
+        subject = request.url.path.removeprefix("/subjects/")
+        if subject not in self.subjects:
+            return httpx.Response(
+                404, json={"error_code": 40401, "message": "Subject not found."}
+            )
+        return httpx.Response(
+            200,
+            json={
+                "subject": subject,
+                "id": self.subjects[subject],
+                "version": 1,
+                "schema": json.loads(request.content)["schema"],
+            },
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        self.clients_created += 1
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+@pytest.fixture
+def fake_registry() -> FakeSchemaRegistry:
+    return FakeSchemaRegistry(subjects={"blog_post-value": 1, "user-value": 2})
+
+
+@pytest.fixture
+def empty_registry() -> FakeSchemaRegistry:
+    return FakeSchemaRegistry()
 
 
 @pytest.fixture
-def successful_verifier(mock_httpx_client_success: MagicMock) -> SchemaVerifier:
+def successful_verifier(fake_registry: FakeSchemaRegistry) -> SchemaVerifier:
     return SchemaVerifier(
         schema_registry_url="http://localhost:8082",
-        client=lambda: mock_httpx_client_success,
+        client=fake_registry.client,
+        backoff=0,
     )
 
 
 @pytest.fixture
-def failed_verifier(mock_httpx_client_failure: MagicMock) -> SchemaVerifier:
+def failed_verifier(empty_registry: FakeSchemaRegistry) -> SchemaVerifier:
     return SchemaVerifier(
         schema_registry_url="http://localhost:8082",
-        client=lambda: mock_httpx_client_failure,
+        client=empty_registry.client,
+        backoff=0,
     )
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from faust_avro_model_codegen import json_backend
+from faust_avro_model_codegen.json_backend import (
+    JsonBackendError,
+    json_loads,
+    orjson_loads,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_backends():
+    json_loads.cache_clear()
+    yield
+    json_loads.cache_clear()
+
+
+@pytest.fixture
+def without_orjson(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(json_backend, "orjson_available", lambda: False)
+
+
+def test_json_loads_selects_the_json_module():
+    assert json_loads("json") is json.loads
+
+
+def test_json_loads_prefers_orjson_when_installed():
+    pytest.importorskip("orjson")
+
+    assert json_loads() is orjson_loads
+    assert json_loads("orjson") is orjson_loads
+
+
+def test_json_loads_falls_back_to_json_without_orjson(without_orjson):
+    assert json_loads() is json.loads
+
+
+def test_json_loads_rejects_orjson_backend_without_orjson(without_orjson):
+    with pytest.raises(JsonBackendError):
+        json_loads("orjson")
+
+
+def test_json_loads_rejects_unknown_backends():
+    with pytest.raises(JsonBackendError):
+        json_loads("ujson")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b'{"name": "user", "default": 1.5, "doc": "caf\\u00e9"}',
+        b'{"name": "big", "default": 123456789012345678901234567890}',
+        b'{"name": "surrogate", "doc": "\\ud800"}',
+        '{"name": "text"}',
+    ],
+)
+def test_orjson_loads_decodes_like_json(raw):
+    pytest.importorskip("orjson")
+
+    assert orjson_loads(raw) == json.loads(raw)
+
+
+def test_orjson_loads_raises_json_errors_for_invalid_documents():
+    pytest.importorskip("orjson")
+
+    with pytest.raises(json.JSONDecodeError):
+        orjson_loads(b'{"name": ')
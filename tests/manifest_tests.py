@@ -0,0 +1,120 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from faust_avro_model_codegen.manifest import (
+    BuildManifest,
+    FileFingerprint,
+    Manifest,
+)
+
+
+def test_build_manifest_is_not_up_to_date_when_no_manifest_exists(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("")
+
+    assert build_manifest.is_up_to_date(outfile) is False
+
+
+def test_build_manifest_is_up_to_date_after_recording_output(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+
+    build_manifest.record(outfile)
+
+    assert build_manifest.is_up_to_date(outfile) is True
+
+
+def test_build_manifest_is_not_up_to_date_when_a_schema_changes(
+    build_manifest: BuildManifest, tmp_path: Path, schema_dir: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+    build_manifest.record(outfile)
+
+    (schema_dir / "user.avsc").write_text('{"type": "record"}')
+
+    assert build_manifest.is_up_to_date(outfile) is False
+
+
+def test_build_manifest_is_not_up_to_date_when_a_schema_is_added(
+    build_manifest: BuildManifest, tmp_path: Path, schema_dir: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+    build_manifest.record(outfile)
+    new_schema = schema_dir / "comment.avsc"
+    new_schema.write_text("{}")
+
+    build_manifest.schema_files.append(new_schema)
+
+    assert build_manifest.is_up_to_date(outfile) is False
+
+
+def test_build_manifest_is_not_up_to_date_when_the_output_was_edited(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+    build_manifest.record(outfile)
+
+    outfile.write_text("class User: pass\n")
+
+    assert build_manifest.is_up_to_date(outfile) is False
+
+
+def test_build_manifest_is_not_up_to_date_when_settings_change(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+    build_manifest.record(outfile)
+
+    build_manifest.settings_digest = "other settings"
+
+    assert build_manifest.is_up_to_date(outfile) is False
+
+
+def test_manifest_round_trips_through_json(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("class User: ...\n")
+    build_manifest.record(outfile)
+
+    manifest = build_manifest.load()
+
+    assert manifest is not None
+    assert Manifest.from_json(manifest.to_json()) == manifest
+
+
+def test_file_fingerprint_reuses_known_digest_when_stat_is_unchanged(
+    tmp_path: Path,
+):
+    schema = tmp_path / "user.avsc"
+    schema.write_text("{}")
+    known = FileFingerprint.from_path(schema)
+
+    with patch.object(Path, "read_bytes") as mock_read_bytes:
+        actual = FileFingerprint.from_path(schema, known)
+
+    mock_read_bytes.assert_not_called()
+    assert actual is known
+
+
+def test_build_manifest_is_not_up_to_date_when_a_package_module_was_edited(
+    build_manifest: BuildManifest, tmp_path: Path
+):
+    package_dir = tmp_path / "models"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "user.py").write_text("class User: ...\n")
+    build_manifest.record(package_dir)
+    assert build_manifest.is_up_to_date(package_dir) is True
+
+    (package_dir / "user.py").write_text("class User: pass\n")
+
+    assert build_manifest.is_up_to_date(package_dir) is False
@@ -1,8 +1,22 @@
+import dataclasses
+import datetime
+import decimal
+import importlib.util
+import io
+import json
+import sys
 from pathlib import Path
 from types import ModuleType
 from unittest.mock import Mock, patch
 
+import fastavro
+import pytest
+from dataclasses_avroschema import AvroModel
+
+from faust_avro_model_codegen import TemplateWriter
+from faust_avro_model_codegen.manifest import BuildManifest
 from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
 from faust_avro_model_codegen.template_renderer import TemplateRenderer
 from faust_avro_model_codegen.types import SchemaData
 
@@ -18,95 +32,362 @@ def test_generate_module_passes_expected_arguments_to_write_method(
             "This file is generated by: avro_code_gen\n"
             "Do not edit this file directly unless absolutely necessary!\n"
             '"""\n'
-            "import typing, enum\n"
             "\n"
+            "import dataclasses\n"
             "from dataclasses import dataclass, field\n"
-            "from dataclasses_avroschema import types, AvroModel\n"
-            "from dataclasses_avroschema.schema_generator import CT\n"
-            "\n"
+            "import datetime\n"
+            "import enum\n"
+            "import io\n"
+            "import json\n"
+            "import typing\n"
             "\n"
+            "from dataclasses_avroschema import AvroModel, case, types\n"
+            "from dataclasses_avroschema.faust import AvroRecord\n"
+            "from dataclasses_avroschema.schema_generator import CT\n"
+            "import fastavro\n"
             "\n"
             "\n"
             "class Color(str, enum.Enum):\n"
             '    RED = "RED"\n'
             '    GREEN = "GREEN"\n'
             '    BLUE = "BLUE"\n'
-            "    \n"
+            "\n"
             "\n"
             "class AdditionalColor(str, enum.Enum):\n"
             '    YELLOW = "YELLOW"\n'
             '    PURPLE = "PURPLE"\n'
             '    ORANGE = "ORANGE"\n'
-            "    \n"
-            "\n"
-            "\n"
-            "\n"
-            "import typing, enum, dataclasses, datetime\n"
-            "\n"
-            "from dataclasses import dataclass, field\n"
-            "from dataclasses_avroschema.schema_generator import CT\n"
-            "from dataclasses_avroschema.faust import AvroRecord\n"
             "\n"
             "\n"
             "@dataclass\n"
             "class User(AvroRecord):\n"
             "    def __post_init__(self) -> None:\n"
-            "        for _field in dataclasses.fields(self):\n"
-            "            value = getattr(self, _field.name)\n"
-            "            if isinstance(value, dataclasses.Field):\n"
-            "                setattr(self, _field.name, value.default)\n"
-            "            if isinstance(value, typing.List):\n"
-            "                item: enum.Enum\n"
-            "                for index, item in enumerate(value):\n"
-            "                    if issubclass(item.__class__, enum.Enum):\n"
-            "                        value[index] = item.value\n"
+            "        value = self.favorite_number\n"
+            "        if isinstance(value, dataclasses.Field):\n"
+            "            self.favorite_number = None\n"
+            "        values = self.favorite_colors\n"
+            "        if isinstance(values, list):\n"
+            "            for index, item in enumerate(values):\n"
+            "                if isinstance(item, enum.Enum):\n"
+            "                    values[index] = item.value\n"
+            "        value = self.additional_field\n"
+            "        if isinstance(value, dataclasses.Field):\n"
+            "            self.additional_field = None\n"
+            "        values = self.additional_field\n"
+            "        if isinstance(values, list):\n"
+            "            for index, item in enumerate(values):\n"
+            "                if isinstance(item, enum.Enum):\n"
+            "                    values[index] = item.value\n"
+            "        value = self.new_field\n"
+            "        if isinstance(value, dataclasses.Field):\n"
+            "            self.new_field = value.default\n"
+            "\n"
             '    name: str = field(metadata={"doc": "None"})\n'
-            '    favorite_number: typing.Union[types.Int32,None] = field(metadata={"doc": '
-            '"None"})\n'
+            '    favorite_number: typing.Union[types.Int32, None] = field(metadata={"doc": "None"})\n'
             '    favorite_colors: typing.List[Color] = field(metadata={"doc": "None"})\n'
-            "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = "
-            'field(metadata={"doc": "None"})\n'
+            "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = field(\n"
+            '        metadata={"doc": "None"}\n'
+            "    )\n"
             '    timestamp_field: datetime.datetime = field(metadata={"doc": "None"})\n'
-            '    new_field: typing.Union[None,str] = field(metadata={"doc": "None", '
-            '"default": None}, default=None)\n'
-            "    \n"
+            "    new_field: typing.Union[None, str] = field(\n"
+            '        metadata={"doc": "None", "default": None}, default=None\n'
+            "    )\n"
             "\n"
-            "    \n"
+            "    _AVRO_SCHEMA = {\n"
+            '        "namespace": "example.avro",\n'
+            '        "type": "record",\n'
+            '        "name": "User",\n'
+            '        "fields": [\n'
+            '            {"name": "name", "type": "string"},\n'
+            '            {"name": "favorite_number", "type": ["int", "null"]},\n'
+            "            {\n"
+            '                "name": "favorite_colors",\n'
+            '                "type": {\n'
+            '                    "type": "array",\n'
+            '                    "items": {\n'
+            '                        "type": "enum",\n'
+            '                        "name": "Color",\n'
+            '                        "symbols": ["RED", "GREEN", "BLUE"],\n'
+            "                    },\n"
+            "                },\n"
+            "            },\n"
+            '            {"name": "new_field", "type": ["null", "string"], "default": None},\n'
+            "            {\n"
+            '                "name": "additional_field",\n'
+            '                "type": [\n'
+            '                    "null",\n'
+            "                    {\n"
+            '                        "type": "array",\n'
+            '                        "items": {\n'
+            '                            "type": "enum",\n'
+            '                            "name": "AdditionalColor",\n'
+            '                            "symbols": ["YELLOW", "PURPLE", "ORANGE"],\n'
+            "                        },\n"
+            "                    },\n"
+            "                ],\n"
+            "            },\n"
+            "            {\n"
+            '                "name": "timestamp_field",\n'
+            '                "type": {"type": "long", "logicalType": "timestamp-millis"},\n'
+            "            },\n"
+            "        ],\n"
+            "    }\n"
+            "    _AVRO_SCHEMA_JSON = json.dumps(_AVRO_SCHEMA)\n"
+            "    _AVRO_PARSED_SCHEMA = fastavro.parse_schema(_AVRO_SCHEMA)\n"
             "\n"
-            "    class Meta:\n"
-            '        namespace = "example.avro"\n'
-            "    \n"
+            "    @classmethod\n"
+            "    def avro_schema(\n"
+            "        cls: typing.Type[CT],\n"
+            "        case_type: typing.Optional[str] = None,\n"
+            "        **kwargs: typing.Any,\n"
+            "    ) -> str:\n"
+            "        if case_type is None and not kwargs:\n"
+            "            return cls._AVRO_SCHEMA_JSON\n"
+            "        return super().avro_schema(case_type, **kwargs)\n"
             "\n"
-            "import typing, enum, dataclasses, datetime\n"
+            "    @classmethod\n"
+            "    def avro_schema_to_python(\n"
+            "        cls: typing.Type[CT],\n"
+            "        parent: typing.Optional[AvroModel] = None,\n"
+            "        case_type: typing.Optional[str] = None,\n"
+            "    ) -> typing.Dict[str, typing.Any]:\n"
+            "        if parent is not None:\n"
+            "            return super().avro_schema_to_python(parent, case_type)\n"
+            "        if case_type is not None:\n"
+            "            return case.case_record(json.loads(cls._AVRO_SCHEMA_JSON), case_type)\n"
+            "        return cls._AVRO_SCHEMA\n"
             "\n"
-            "from dataclasses import dataclass, field\n"
-            "from dataclasses_avroschema.schema_generator import CT\n"
-            "from dataclasses_avroschema.faust import AvroRecord\n"
+            '    _COLOR_SYMBOLS = {"RED": "RED", "GREEN": "GREEN", "BLUE": "BLUE"}\n'
+            "    _ADDITIONAL_COLOR_SYMBOLS = {\n"
+            '        "YELLOW": "YELLOW",\n'
+            '        "PURPLE": "PURPLE",\n'
+            '        "ORANGE": "ORANGE",\n'
+            "    }\n"
+            "\n"
+            "    def to_dict(self) -> typing.Dict[str, typing.Any]:\n"
+            "        data = {\n"
+            '            "name": self.name,\n'
+            '            "favorite_number": self.favorite_number,\n'
+            '            "favorite_colors": self.favorite_colors,\n'
+            '            "additional_field": self.additional_field,\n'
+            '            "timestamp_field": self.timestamp_field,\n'
+            '            "new_field": self.new_field,\n'
+            "        }\n"
+            '        value = data["favorite_colors"]\n'
+            '        data["favorite_colors"] = list(map(self._COLOR_SYMBOLS.__getitem__, value))\n'
+            '        value = data["additional_field"]\n'
+            "        if value is not None:\n"
+            '            data["additional_field"] = list(\n'
+            "                map(self._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+            "            )\n"
+            "        return data\n"
+            "\n"
+            "    def to_json(self, **kwargs: typing.Any) -> str:\n"
+            "        data = self.to_dict()\n"
+            '        value = data["timestamp_field"]\n'
+            '        data["timestamp_field"] = value.strftime("%Y-%m-%dT%H:%M:%S%z")\n'
+            "        return json.dumps(data, **kwargs)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_dict(\n"
+            "        cls,\n"
+            "        data: typing.Mapping[str, typing.Any],\n"
+            '    ) -> "User":\n'
+            "        return cls(\n"
+            '            name=data["name"],\n'
+            '            favorite_number=data.get("favorite_number"),\n'
+            '            favorite_colors=data["favorite_colors"],\n'
+            '            additional_field=data.get("additional_field"),\n'
+            '            timestamp_field=data["timestamp_field"],\n'
+            '            new_field=data.get("new_field"),\n'
+            "        )\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_json(\n"
+            "        cls,\n"
+            "        json_data: typing.Union[str, bytes],\n"
+            '    ) -> "User":\n'
+            "        data = json.loads(json_data)\n"
+            '        value = data["favorite_colors"]\n'
+            '        data["favorite_colors"] = list(map(cls._COLOR_SYMBOLS.__getitem__, value))\n'
+            '        value = data.get("additional_field")\n'
+            "        if value is not None:\n"
+            '            data["additional_field"] = list(\n'
+            "                map(cls._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+            "            )\n"
+            '        value = data["timestamp_field"]\n'
+            '        data["timestamp_field"] = datetime.datetime.fromisoformat(value)\n'
+            "        return cls.from_dict(data)\n"
+            "\n"
+            "    def to_representation(self) -> typing.Dict[str, typing.Any]:\n"
+            "        payload = self.to_dict()\n"
+            "        if self._options.include_metadata:\n"
+            '            payload[self._blessed_key] = {"ns": self._options.namespace}\n'
+            "        return payload\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_data(\n"
+            "        cls,\n"
+            "        data: typing.Mapping[str, typing.Any],\n"
+            "        *,\n"
+            "        preferred_type: typing.Optional[type] = None,\n"
+            '    ) -> "User":\n'
+            "        model = cls._maybe_namespace(data, preferred_type=preferred_type)\n"
+            "        if isinstance(data, dict) and model in (None, cls):\n"
+            "            return cls.from_dict(data)\n"
+            "        return super().from_data(data, preferred_type=preferred_type)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def encode_many(\n"
+            "        cls,\n"
+            '        records: typing.Iterable["User"],\n'
+            "    ) -> typing.List[bytes]:\n"
+            "        write = fastavro.schemaless_writer\n"
+            "        schema = cls._AVRO_PARSED_SCHEMA\n"
+            "        encoded = []\n"
+            "        for record in records:\n"
+            "            buffer = io.BytesIO()\n"
+            "            write(buffer, schema, record.to_dict())\n"
+            "            encoded.append(buffer.getvalue())\n"
+            "        return encoded\n"
+            "\n"
+            "    @classmethod\n"
+            "    def decode_many(\n"
+            "        cls,\n"
+            "        buffers: typing.Iterable[bytes],\n"
+            '    ) -> typing.List["User"]:\n'
+            "        read = fastavro.schemaless_reader\n"
+            "        schema = cls._AVRO_PARSED_SCHEMA\n"
+            "        from_dict = cls.from_dict\n"
+            "        return [from_dict(read(io.BytesIO(buffer), schema)) for buffer in buffers]\n"
+            "\n"
+            "    class Meta:\n"
+            '        namespace = "example.avro"\n'
             "\n"
             "\n"
             "@dataclass\n"
             "class BlogPost(AvroRecord):\n"
-            "    def __post_init__(self) -> None:\n"
-            "        for _field in dataclasses.fields(self):\n"
-            "            value = getattr(self, _field.name)\n"
-            "            if isinstance(value, dataclasses.Field):\n"
-            "                setattr(self, _field.name, value.default)\n"
-            "            if isinstance(value, typing.List):\n"
-            "                item: enum.Enum\n"
-            "                for index, item in enumerate(value):\n"
-            "                    if issubclass(item.__class__, enum.Enum):\n"
-            "                        value[index] = item.value\n"
             '    id: str = field(metadata={"doc": "None"})\n'
             '    title: str = field(metadata={"doc": "None"})\n'
             '    content: str = field(metadata={"doc": "None"})\n'
             '    author: str = field(metadata={"doc": "None"})\n'
-            "    \n"
             "\n"
-            "    \n"
+            "    _AVRO_SCHEMA = {\n"
+            '        "type": "record",\n'
+            '        "name": "BlogPost",\n'
+            '        "namespace": "example.avro",\n'
+            '        "fields": [\n'
+            '            {"name": "id", "type": "string"},\n'
+            '            {"name": "title", "type": "string"},\n'
+            '            {"name": "content", "type": "string"},\n'
+            '            {"name": "author", "type": "string"},\n'
+            "        ],\n"
+            "    }\n"
+            "    _AVRO_SCHEMA_JSON = json.dumps(_AVRO_SCHEMA)\n"
+            "    _AVRO_PARSED_SCHEMA = fastavro.parse_schema(_AVRO_SCHEMA)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def avro_schema(\n"
+            "        cls: typing.Type[CT],\n"
+            "        case_type: typing.Optional[str] = None,\n"
+            "        **kwargs: typing.Any,\n"
+            "    ) -> str:\n"
+            "        if case_type is None and not kwargs:\n"
+            "            return cls._AVRO_SCHEMA_JSON\n"
+            "        return super().avro_schema(case_type, **kwargs)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def avro_schema_to_python(\n"
+            "        cls: typing.Type[CT],\n"
+            "        parent: typing.Optional[AvroModel] = None,\n"
+            "        case_type: typing.Optional[str] = None,\n"
+            "    ) -> typing.Dict[str, typing.Any]:\n"
+            "        if parent is not None:\n"
+            "            return super().avro_schema_to_python(parent, case_type)\n"
+            "        if case_type is not None:\n"
+            "            return case.case_record(json.loads(cls._AVRO_SCHEMA_JSON), case_type)\n"
+            "        return cls._AVRO_SCHEMA\n"
+            "\n"
+            "    def to_dict(self) -> typing.Dict[str, typing.Any]:\n"
+            "        return {\n"
+            '            "id": self.id,\n'
+            '            "title": self.title,\n'
+            '            "content": self.content,\n'
+            '            "author": self.author,\n'
+            "        }\n"
+            "\n"
+            "    def to_json(self, **kwargs: typing.Any) -> str:\n"
+            "        return json.dumps(self.to_dict(), **kwargs)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_dict(\n"
+            "        cls,\n"
+            "        data: typing.Mapping[str, typing.Any],\n"
+            '    ) -> "BlogPost":\n'
+            "        return cls(\n"
+            '            id=data["id"],\n'
+            '            title=data["title"],\n'
+            '            content=data["content"],\n'
+            '            author=data["author"],\n'
+            "        )\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_json(\n"
+            "        cls,\n"
+            "        json_data: typing.Union[str, bytes],\n"
+            '    ) -> "BlogPost":\n'
+            "        return cls.from_dict(json.loads(json_data))\n"
+            "\n"
+            "    def to_representation(self) -> typing.Dict[str, typing.Any]:\n"
+            "        payload = self.to_dict()\n"
+            "        if self._options.include_metadata:\n"
+            '            payload[self._blessed_key] = {"ns": self._options.namespace}\n'
+            "        return payload\n"
+            "\n"
+            "    @classmethod\n"
+            "    def from_data(\n"
+            "        cls,\n"
+            "        data: typing.Mapping[str, typing.Any],\n"
+            "        *,\n"
+            "        preferred_type: typing.Optional[type] = None,\n"
+            '    ) -> "BlogPost":\n'
+            "        model = cls._maybe_namespace(data, preferred_type=preferred_type)\n"
+            "        if isinstance(data, dict) and model in (None, cls):\n"
+            "            return cls.from_dict(data)\n"
+            "        return super().from_data(data, preferred_type=preferred_type)\n"
+            "\n"
+            "    @classmethod\n"
+            "    def encode_many(\n"
+            "        cls,\n"
+            '        records: typing.Iterable["BlogPost"],\n'
+            "    ) -> typing.List[bytes]:\n"
+            "        write = fastavro.schemaless_writer\n"
+            "        schema = cls._AVRO_PARSED_SCHEMA\n"
+            "        encoded = []\n"
+            "        for record in records:\n"
+            "            buffer = io.BytesIO()\n"
+            "            write(buffer, schema, record.to_dict())\n"
+            "            encoded.append(buffer.getvalue())\n"
+            "        return encoded\n"
+            "\n"
+            "    @classmethod\n"
+            "    def decode_many(\n"
+            "        cls,\n"
+            "        buffers: typing.Iterable[bytes],\n"
+            '    ) -> typing.List["BlogPost"]:\n'
+            "        read = fastavro.schemaless_reader\n"
+            "        schema = cls._AVRO_PARSED_SCHEMA\n"
+            "        from_dict = cls.from_dict\n"
+            "        return [from_dict(read(io.BytesIO(buffer), schema)) for buffer in buffers]\n"
             "\n"
             "    class Meta:\n"
             '        namespace = "example.avro"\n'
-            "    \n"
+            "\n"
+            "\n"
+            "def warmup() -> None:\n"
+            "    for record in [User, BlogPost]:\n"
+            "        record.avro_schema_to_python()\n"
+            "        record.get_fields()\n"
         )
         assert actual_out is outfile
         assert actual_generated == expected_generated
@@ -137,3 +418,494 @@ def test_verify_schemas_passes_expected_arguments_to_verify(
     }
 
     assert actual_call_args == expected_call_args
+
+
+def test_verify_schemas_raises_value_error_without_a_verifier(
+    all_schemas: list[SchemaData],
+):
+    code_gen = FaustAvroModelGen(
+        renderer=TemplateRenderer.from_current_directory(),
+        verifier=None,
+        writer=TemplateWriter(),
+    )
+
+    with pytest.raises(ValueError):
+        code_gen.verify_schemas(all_schemas, "fake_app.models")
+
+
+def test_generate_package_imports_records_lazily_and_verifies_them(
+    mock_code_gen: FaustAvroModelGen,
+    all_schemas: list[SchemaData],
+    schema_dir: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    package_dir = tmp_path / "split_models"
+    package_dir.mkdir()
+    stale = package_dir / "removed.py"
+    stale.write_text('""" NOTICE!!\n"""\n')
+    handwritten = package_dir / "helpers.py"
+    handwritten.write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    mock_code_gen.generate_package_from_files(
+        AvroSchemaDirectoryParser.schema_files(schema_dir), package_dir, "schema"
+    )
+    package = importlib.import_module("split_models")
+
+    assert stale.exists() is False
+    assert handwritten.exists() is True
+    assert "split_models.user" not in sys.modules
+    assert package.User.__module__ == "split_models.user"
+    assert "split_models.blog_post" not in sys.modules
+
+    mock_code_gen.verify_schemas(all_schemas, "split_models")
+
+    [[actual_call_args], _] = mock_code_gen.verifier.verify.call_args
+    assert actual_call_args == {"blog_post": package.BlogPost, "user": package.User}
+
+
+def test_generate_module_skips_all_work_when_manifest_is_up_to_date(
+    mock_code_gen: FaustAvroModelGen,
+    all_schemas: list[SchemaData],
+    outfile: Path,
+    build_manifest: BuildManifest,
+) -> None:
+    assert mock_code_gen.generate_module(all_schemas, outfile, build_manifest) is True
+
+    with patch.object(mock_code_gen, "write") as mock_write:
+        actual = mock_code_gen.generate_module(all_schemas, outfile, build_manifest)
+
+    mock_write.assert_not_called()
+    assert actual is False
+
+
+def test_generated_post_init_normalizes_enums_and_omitted_fields(
+    generated_module: ModuleType,
+):
+    user = generated_module.User(
+        name="name",
+        favorite_number=None,
+        favorite_colors=[generated_module.Color.RED, "BLUE"],
+        additional_field=None,
+        timestamp_field=datetime.datetime(2024, 1, 1),
+    )
+
+    assert user.favorite_number is None
+    assert user.favorite_colors == ["RED", "BLUE"]
+    assert type(user.favorite_colors[0]) is str
+    assert user.additional_field is None
+    assert user.new_field is None
+    assert "__post_init__" not in vars(generated_module.BlogPost)
+
+
+def _load_generated_module(
+    schemas: list[SchemaData], path: Path, compact: bool, frozen: bool
+) -> ModuleType:
+    code_gen = FaustAvroModelGen(
+        renderer=TemplateRenderer.from_current_directory(
+            compact=compact, frozen=frozen
+        ),
+        verifier=Mock(),
+        writer=TemplateWriter(format_output=False),
+    )
+    code_gen.generate_module(schemas, path)
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[path.stem] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_frozen_records_reject_assignment_after_construction(
+    all_schemas: list[SchemaData], tmp_path: Path
+):
+    module = _load_generated_module(
+        all_schemas, tmp_path / "frozen_models.py", compact=False, frozen=True
+    )
+    post = module.BlogPost(id="1", title="title", content="content", author="me")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        post.title = "other"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        del post.title
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        post.extra = "attribute"
+    assert "extra" not in vars(post)
+    assert module.BlogPost.loads(post.dumps()) == post
+
+
+def test_compact_records_drop_the_per_instance_evaluated_fields_set(
+    all_schemas: list[SchemaData], tmp_path: Path
+):
+    module = _load_generated_module(
+        all_schemas, tmp_path / "compact_models.py", compact=True, frozen=True
+    )
+    post = module.BlogPost(id="1", title="title", content="content", author="me")
+    user = module.User(
+        name="name",
+        favorite_number=None,
+        favorite_colors=[module.Color.RED],
+        additional_field=None,
+        timestamp_field=datetime.datetime(2024, 1, 1),
+    )
+
+    assert "__evaluated_fields__" not in vars(post)
+    assert module.BlogPost.loads(post.dumps()) == post
+    # faust lazily coerces list fields and keeps needing the set for them
+    assert vars(user)["__evaluated_fields__"] == set()
+    assert user.favorite_colors == ["RED"]
+
+
+def test_generated_records_return_their_embedded_source_schema(
+    generated_module: ModuleType, user_avro_dict: dict
+):
+    with patch.object(generated_module.User, "generate_schema") as generate_schema:
+        assert generated_module.User.avro_schema_to_python() == user_avro_dict
+        assert generated_module.User.avro_schema() == json.dumps(user_avro_dict)
+    generate_schema.assert_not_called()
+
+    camel_case = json.loads(generated_module.User.avro_schema(case_type="camelcase"))
+    assert [f["name"] for f in camel_case["fields"]][:2] == ["name", "favoriteNumber"]
+    assert generated_module.User.avro_schema_to_python() == user_avro_dict
+
+
+def test_generated_module_warmup_primes_every_record(generated_module: ModuleType):
+    generated_module.warmup()
+
+    assert generated_module.User._parser is not None
+    assert generated_module.BlogPost._parser is not None
+
+
+def test_generated_dict_and_json_conversions_match_the_generic_path(
+    generated_module: ModuleType,
+):
+    user = generated_module.User(
+        name="name",
+        favorite_number=7,
+        favorite_colors=["RED", "BLUE"],
+        additional_field=["PURPLE"],
+        timestamp_field=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+    user.favorite_colors.append(generated_module.Color.GREEN)
+
+    assert user.to_dict() == AvroModel.to_dict(user)
+    assert [type(color) for color in user.to_dict()["favorite_colors"]] == [str] * 3
+    assert user.to_json() == AvroModel.to_json(user)
+    assert generated_module.User.from_dict(user.to_dict()) == user
+    assert generated_module.User.from_json(user.to_json()) == user
+    with pytest.raises(KeyError):
+        generated_module.User.from_json(user.to_json().replace("PURPLE", "PINK"))
+
+
+def test_generated_from_dict_applies_defaults_for_omitted_fields(
+    generated_module: ModuleType,
+):
+    user = generated_module.User.from_dict(
+        {
+            "name": "name",
+            "favorite_number": None,
+            "favorite_colors": [],
+            "additional_field": None,
+            "timestamp_field": datetime.datetime(2024, 1, 1),
+        }
+    )
+
+    assert user.new_field is None
+    assert generated_module.User.from_dict(user.to_representation()) == user
+
+
+def test_faust_codecs_use_the_generated_conversions(generated_module: ModuleType):
+    post = generated_module.BlogPost(
+        id="1", title="title", content="content", author="me"
+    )
+    payload = post.dumps(serializer="json")
+
+    with patch.object(
+        generated_module.BlogPost,
+        "from_dict",
+        wraps=generated_module.BlogPost.from_dict,
+    ) as from_dict:
+        assert generated_module.BlogPost.loads(payload, serializer="json") == post
+    from_dict.assert_called_once()
+    assert json.loads(payload)["__faust"] == {"ns": post._options.namespace}
+
+
+def test_generated_batch_codecs_round_trip_against_the_source_schemas(
+    generated_modules_dict: dict, schema_dir: Path
+):
+    timestamp = datetime.datetime(2024, 1, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    user = generated_modules_dict["user"]
+    blog_post = generated_modules_dict["blog_post"]
+    records = {
+        "user": [
+            user(
+                name="name",
+                favorite_number=None,
+                favorite_colors=["RED", "BLUE"],
+                additional_field=None,
+                timestamp_field=timestamp,
+            ),
+            user(
+                name="other",
+                favorite_number=7,
+                favorite_colors=[],
+                additional_field=["PURPLE"],
+                timestamp_field=timestamp,
+                new_field="new",
+            ),
+        ],
+        "blog_post": [
+            blog_post(id="1", title="title", content="content", author="me"),
+        ],
+    }
+
+    for schema_file in sorted(schema_dir.glob("*.avsc")):
+        model = generated_modules_dict[schema_file.stem]
+        schema = fastavro.parse_schema(json.loads(schema_file.read_text()))
+        expected = records[schema_file.stem]
+
+        encoded = model.encode_many(expected)
+        assert [
+            fastavro.schemaless_reader(io.BytesIO(buffer), schema) for buffer in encoded
+        ] == [record.to_dict() for record in expected]
+
+        written = []
+        for record in expected:
+            buffer = io.BytesIO()
+            fastavro.schemaless_writer(buffer, schema, record.to_dict())
+            written.append(buffer.getvalue())
+        assert written == encoded
+        assert model.decode_many(written) == expected
+
+
+def test_generated_records_convert_records_of_other_schemas(
+    referencing_schemas: dict, tmp_path: Path
+):
+    schemas = [SchemaData(name=n, schema=s) for n, s in referencing_schemas.items()]
+    module = _load_generated_module(
+        schemas, tmp_path / "referencing_models.py", compact=False, frozen=False
+    )
+    since = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    home = {"street": "Main St", "region": {"name": "North"}, "since": since}
+    account = module.Account(id="1", home=home)
+
+    assert isinstance(account.home, module.ZipAddress)
+    assert isinstance(account.home.region, module.Region)
+    assert account.work is None
+    assert account.to_dict() == {"id": "1", "home": home, "work": None}
+    assert module.Account.from_dict(account.to_dict()) == account
+    assert account.to_json() == AvroModel.to_json(account)
+    assert module.Account.from_json(account.to_json()) == account
+    assert module.Account.decode_many(module.Account.encode_many([account])) == [
+        account
+    ]
+    schema = module.Account.avro_schema_to_python()
+    assert schema["fields"][1]["type"]["fields"][1]["type"] == (
+        referencing_schemas["region"]
+    )
+    assert schema["fields"][2]["type"] == ["null", "com.acme.geo.ZipAddress"]
+
+
+def test_generated_records_convert_nested_records_in_containers(
+    nested_schema: dict, tmp_path: Path
+):
+    module = _load_generated_module(
+        [SchemaData(name="order", schema=nested_schema)],
+        tmp_path / "nested_models.py",
+        compact=False,
+        frozen=False,
+    )
+    shipped = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    customer = module.Customer(name="Ann", tier="GOLD")
+    line = module.Line(sku="x1", price=decimal.Decimal("1.50"), shipped=shipped)
+    order = module.Order(
+        customer=customer,
+        lines=[line],
+        by_sku={"x1": line},
+        tiers={"Ann": "SILVER"},
+        digest=b"abcd",
+    )
+    line_data = {"sku": "x1", "price": decimal.Decimal("1.50"), "shipped": shipped}
+
+    data = order.to_dict()
+
+    assert data["lines"] == [line_data]
+    assert data["by_sku"] == {"x1": line_data}
+    assert dataclasses.replace(order, payer=line).to_dict()["payer"] == line_data
+    assert module.Order.from_dict(data) == order
+    assert module.Order.decode_many(module.Order.encode_many([order])) == [order]
+    assert json.loads(order.to_json())["lines"] == [
+        {"sku": "x1", "price": "1.50", "shipped": "2024-01-01T00:00:00+0000"}
+    ]
+    restored = module.Order.from_json(order.to_json())
+    assert restored.lines == [line]
+    assert restored.by_sku == {"x1": line}
+    assert module.Line.avro_schema_to_python()["namespace"] == "com.acme.shop"
+
+
+def test_generated_records_convert_micro_precision_times_and_decimals(
+    tmp_path: Path,
+):
+    micros = {"type": "long", "logicalType": "timestamp-micros"}
+    schema = {
+        "type": "record",
+        "name": "Payment",
+        "namespace": "shop",
+        "fields": [
+            {"name": "at", "type": micros},
+            {"name": "time", "type": {"type": "long", "logicalType": "time-micros"}},
+            {
+                "name": "amount",
+                "type": {
+                    "type": "bytes",
+                    "logicalType": "decimal",
+                    "precision": 10,
+                    "scale": 2,
+                },
+            },
+            {
+                "name": "refunds",
+                "type": ["null", {"type": "array", "items": micros}],
+                "default": None,
+            },
+        ],
+    }
+    module = _load_generated_module(
+        [SchemaData(name="payment", schema=schema)],
+        tmp_path / "logical_models.py",
+        compact=False,
+        frozen=False,
+    )
+    at = datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc)
+    payment = module.Payment(
+        at=at,
+        time=datetime.time(1, 2, 3, 456789),
+        amount=decimal.Decimal("12.34"),
+        refunds=[at],
+    )
+
+    module.warmup()
+
+    assert module.Payment.decode_many(module.Payment.encode_many([payment])) == [
+        payment
+    ]
+    assert payment.to_json() == AvroModel.to_json(payment)
+    assert json.loads(payment.to_json()) == {
+        "at": "2024-01-02T03:04:05+0000",
+        "time": "01:02:03",
+        "amount": "12.34",
+        "refunds": ["2024-01-02T03:04:05+0000"],
+    }
+    assert module.Payment.from_json(payment.to_json()) == module.Payment(
+        at=at.replace(microsecond=0),
+        time=datetime.time(1, 2, 3),
+        amount=decimal.Decimal("12.34"),
+        refunds=[at.replace(microsecond=0)],
+    )
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_generated_records_copy_mutable_defaults_and_decode_bytes_defaults(
+    tmp_path: Path, frozen: bool
+):
+    schema = {
+        "type": "record",
+        "name": "Parcel",
+        "namespace": "shop",
+        "fields": [
+            {"name": "id", "type": "string"},
+            {
+                "name": "tags",
+                "type": {"type": "array", "items": "string"},
+                "default": [],
+            },
+            {"name": "sizes", "type": {"type": "map", "values": "long"}, "default": {}},
+            {
+                "name": "labels",
+                "type": {"type": "array", "items": "bytes"},
+                "default": ["ÿ\u0001"],
+            },
+            {"name": "seal", "type": "bytes", "default": "ÿa"},
+            {
+                "name": "code",
+                "type": {"type": "fixed", "name": "Code", "size": 2},
+                "default": "\u0000é",
+            },
+            {"name": "note", "type": ["bytes", "null"], "default": "ok"},
+        ],
+    }
+    module = _load_generated_module(
+        [SchemaData(name="parcel", schema=schema)],
+        tmp_path / f"default_models_{frozen}.py",
+        compact=False,
+        frozen=frozen,
+    )
+    first, second = module.Parcel(id="a"), module.Parcel.from_dict({"id": "b"})
+
+    module.warmup()
+
+    assert first.tags is not second.tags and first.sizes is not second.sizes
+    assert first.labels is not second.labels
+    assert (first.labels, first.seal, first.code, first.note) == (
+        [b"\xff\x01"],
+        b"\xffa",
+        b"\x00\xe9",
+        b"ok",
+    )
+    assert module.Parcel.decode_many(module.Parcel.encode_many([first])) == [first]
+    # the schema dataclasses_avroschema derives keeps the avro defaults
+    derived = AvroModel.avro_schema_to_python.__func__(module.Parcel)
+    assert [f.get("default") for f in derived["fields"]] == [
+        f.get("default") for f in schema["fields"]
+    ]
+
+
+def test_generate_module_rejects_unions_faust_cannot_coerce(
+    mock_code_gen: FaustAvroModelGen, outfile: Path
+):
+    line = {"type": "record", "name": "Line", "fields": []}
+    schema = {
+        "type": "record",
+        "name": "Note",
+        "fields": [{"name": "body", "type": ["null", "string", line]}],
+    }
+
+    with pytest.raises(NotImplementedError, match="faust can't coerce"):
+        mock_code_gen.generate_module([SchemaData(name="note", schema=schema)], outfile)
+    assert not outfile.exists()
+
+
+def test_generated_records_accept_unions_of_several_literal_types(tmp_path: Path):
+    schema = {
+        "type": "record",
+        "name": "Setting",
+        "fields": [
+            {"name": "value", "type": ["null", "string", "long", "boolean"]},
+        ],
+    }
+    module = _load_generated_module(
+        [SchemaData(name="setting", schema=schema)],
+        tmp_path / "union_models.py",
+        compact=False,
+        frozen=False,
+    )
+
+    module.warmup()
+
+    for value in (None, "on", 3, True):
+        setting = module.Setting(value=value)
+        assert module.Setting.from_json(setting.to_json()) == setting
+        assert module.Setting.decode_many(module.Setting.encode_many([setting])) == [
+            setting
+        ]
+
+
+def test_verify_schemas_offline_checks_the_schema_files_without_a_registry(
+    all_schemas: list[SchemaData], mock_code_gen: FaustAvroModelGen, outfile: Path
+):
+    report = FaustAvroModelGen.verify_schemas_offline(all_schemas)
+
+    assert len(report.verified) == len(all_schemas)
+    assert not outfile.exists()
+    mock_code_gen.verifier.verify.assert_not_called()
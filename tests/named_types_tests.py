@@ -0,0 +1,114 @@
+import pytest
+
+from faust_avro_model_codegen.named_types import (
+    ConflictingNamedTypeError,
+    NamedTypeRegistry,
+)
+from faust_avro_model_codegen.types import (
+    PythonAvroField,
+    PythonAvroModel,
+    PythonEnumClass,
+    PythonFixedType,
+)
+
+
+def address(*fields: str, namespace: str = "shop") -> PythonAvroModel:
+    return PythonAvroModel(
+        name="Address",
+        namespace=namespace,
+        fields=[PythonAvroField(name=f, type="str") for f in fields],
+        schema={
+            "type": "record",
+            "name": "Address",
+            "namespace": namespace,
+            "fields": [{"name": f, "type": "string"} for f in fields],
+        },
+    )
+
+
+def test_named_type_registry_keeps_each_fully_qualified_name_once_in_order():
+    color = PythonEnumClass(name="Color", values=["RED"], namespace="example")
+    size = PythonEnumClass(name="Size", values=["S", "M"], namespace="example")
+
+    registry = NamedTypeRegistry.from_dependencies(
+        [
+            color,
+            size,
+            PythonEnumClass(name="Color", values=["RED"], namespace="example"),
+        ]
+    )
+
+    assert list(registry) == [color, size]
+    assert len(registry) == 2
+
+
+def test_named_type_registry_rejects_redefinitions_with_other_symbols():
+    registry = NamedTypeRegistry()
+    registry.register(PythonEnumClass(name="Color", values=["RED"], namespace="a"))
+
+    with pytest.raises(ConflictingNamedTypeError, match="a.Color"):
+        registry.register(
+            PythonEnumClass(name="Color", values=["RED", "BLUE"], namespace="a")
+        )
+
+
+def test_named_type_registry_rejects_types_that_share_a_class_name():
+    registry = NamedTypeRegistry()
+    registry.register(PythonEnumClass(name="Color", values=["RED"], namespace="a"))
+
+    with pytest.raises(ConflictingNamedTypeError, match="class Color"):
+        registry.register(PythonEnumClass(name="Color", values=["RED"], namespace="b"))
+
+
+def test_named_type_registry_keeps_each_record_once():
+    registry = NamedTypeRegistry()
+
+    assert registry.register(address("street"))
+    assert not registry.register(address("street"))
+    assert registry.records() == [address("street").record_class]
+    assert "shop.Address" in registry
+
+
+def test_named_type_registry_rejects_records_redefined_with_other_fields():
+    registry = NamedTypeRegistry.from_dependencies([address("street")])
+
+    with pytest.raises(ConflictingNamedTypeError, match="shop.Address has two"):
+        registry.register(address("zip"))
+
+
+def test_named_type_registry_rejects_records_and_enums_that_share_a_class_name():
+    registry = NamedTypeRegistry.from_dependencies([address("street")])
+
+    with pytest.raises(ConflictingNamedTypeError, match="class Address"):
+        registry.register(PythonEnumClass(name="Address", values=["HOME"]))
+    with pytest.raises(ConflictingNamedTypeError, match="class Address"):
+        registry.register(address("street", namespace="other"))
+
+
+def test_named_type_registry_tracks_fixed_types_without_a_class():
+    digest = PythonFixedType(name="Digest", size=16, annotation="bytes", namespace="a")
+    registry = NamedTypeRegistry.from_dependencies(
+        [digest, PythonFixedType(name="Digest", size=8, annotation="bytes")]
+    )
+
+    assert not registry.register(digest)
+    assert registry.enums() == [] and registry.records() == []
+    assert len(registry) == 2
+    with pytest.raises(ConflictingNamedTypeError, match="a.Digest"):
+        registry.register(
+            PythonFixedType(name="Digest", size=8, annotation="bytes", namespace="a")
+        )
+
+
+@pytest.mark.parametrize(
+    "named_type, fullname",
+    [
+        (PythonEnumClass(name="Color", values=[]), "Color"),
+        (PythonEnumClass(name="Color", values=[], namespace="a.b"), "a.b.Color"),
+        (PythonEnumClass(name="c.Color", values=[], namespace="a.b"), "c.Color"),
+    ],
+)
+def test_python_enum_class_fullname_follows_avro_naming_rules(
+    named_type: PythonEnumClass, fullname: str
+):
+    assert named_type.fullname == fullname
@@ -0,0 +1,188 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from faust_avro_model_codegen.fingerprint import parsing_canonical_form
+from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+from faust_avro_model_codegen.offline_verifier import (
+    OfflineSchemaVerifier,
+    SchemaMismatchError,
+)
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
+from faust_avro_model_codegen.schema_graph import expand_references
+from faust_avro_model_codegen.type_converter import TypeConverter
+from faust_avro_model_codegen.types import SchemaData
+from tests.conftest import inline_address
+
+
+def test_offline_verifier_matches_every_generated_class(all_schemas: list[SchemaData]):
+    result = FaustAvroModelGen.convert_schemas(all_schemas)
+
+    report = OfflineSchemaVerifier().check(result, all_schemas)
+
+    assert report.ok
+    assert sorted(report.verified) == sorted(
+        f"{c.namespace}.{c.name}" for c in result.classes
+    )
+    assert len(report.verified) == len(all_schemas)
+
+
+def test_offline_verifier_matches_nested_and_referenced_records(
+    nested_schema: dict, referencing_schemas: dict[str, dict]
+):
+    schemas = [
+        SchemaData(name="order", schema=nested_schema),
+        *(SchemaData(name=n, schema=s) for n, s in referencing_schemas.items()),
+    ]
+    result = FaustAvroModelGen.convert_schemas(schemas)
+
+    report = OfflineSchemaVerifier().check(result, schemas)
+
+    assert report.failures == {}
+    assert len(report.verified) == len(result.classes) == 6
+
+
+def test_offline_verifier_reports_structural_differences(
+    all_schemas: list[SchemaData],
+):
+    result = FaustAvroModelGen.convert_schemas(all_schemas)
+    user = next(c for c in result.classes if c.name == "User")
+    user.schema = copy.deepcopy(user.schema)
+    first, *_, last = user.schema["fields"]
+    first["type"] = "bytes"
+    user.schema["fields"].remove(last)
+    user.schema["fields"].append({"name": "nickname", "type": "string"})
+
+    report = OfflineSchemaVerifier().check(result, all_schemas)
+
+    assert list(report.failures) == ["example.avro.User"]
+    assert report.failures["example.avro.User"] == "; ".join(
+        [
+            f"example.avro.User: missing field {last['name']} in the embedded schema",
+            "example.avro.User: unexpected field nickname in the embedded schema",
+            f'example.avro.User.{first["name"]}: expected "string", got "bytes"'
+            " in the embedded schema",
+        ]
+    )
+    with pytest.raises(SchemaMismatchError) as exc_info:
+        OfflineSchemaVerifier().verify(result, all_schemas)
+    assert list(exc_info.value.failures) == ["example.avro.User"]
+
+
+def test_offline_verifier_checks_the_types_the_fields_were_converted_to(
+    all_schemas: list[SchemaData],
+):
+    result = FaustAvroModelGen.convert_schemas(all_schemas)
+    user = next(c for c in result.classes if c.name == "User")
+    name = next(f for f in user.fields if f.name == "name")
+    name.python_type = TypeConverter().field_type("bytes", None)
+
+    report = OfflineSchemaVerifier().check(result, all_schemas)
+
+    assert report.failures == {
+        "example.avro.User": 'example.avro.User.name: expected "string", got "bytes"'
+        " in the converted fields"
+    }
+
+
+def test_offline_verifier_matches_logical_and_fixed_types():
+    schema = {
+        "type": "record",
+        "name": "Payment",
+        "namespace": "shop",
+        "fields": [
+            {"name": "at", "type": {"type": "long", "logicalType": "timestamp-micros"}},
+            {"name": "id", "type": {"type": "string", "logicalType": "uuid"}},
+            {
+                "name": "amount",
+                "type": {
+                    "type": "fixed",
+                    "name": "Amount",
+                    "size": 8,
+                    "logicalType": "decimal",
+                    "precision": 18,
+                    "scale": 2,
+                },
+            },
+            {"name": "refund", "type": ["null", "Amount"], "default": None},
+            {"name": "count", "type": "int"},
+        ],
+    }
+    schemas = [SchemaData(name="payment", schema=schema)]
+
+    report = OfflineSchemaVerifier().check(
+        FaustAvroModelGen.convert_schemas(schemas), schemas
+    )
+
+    assert report.failures == {}
+    assert list(report.verified) == ["shop.Payment"]
+
+
+def test_offline_verifier_counts_records_declared_by_several_schemas_once(
+    inline_address_schema_dir: Path,
+):
+    schemas = list(AvroSchemaDirectoryParser.parse_dir(inline_address_schema_dir))
+
+    report = OfflineSchemaVerifier().verify(
+        FaustAvroModelGen.convert_schemas(schemas), schemas
+    )
+
+    assert sorted(report.verified) == ["shop.A", "shop.Address", "shop.B", "shop.C"]
+    assert report.repeated == {"shop.Address": 3}
+
+
+def test_offline_verifier_reports_records_declared_differently(
+    inline_address_schema_dir: Path,
+):
+    schema = json.loads((inline_address_schema_dir / "c.avsc").read_text())
+    schema["fields"][0]["type"] = inline_address("zip")
+    (inline_address_schema_dir / "c.avsc").write_text(json.dumps(schema))
+    schemas = list(AvroSchemaDirectoryParser.parse_dir(inline_address_schema_dir))
+
+    report = OfflineSchemaVerifier().check(
+        FaustAvroModelGen.convert_schemas(schemas), schemas
+    )
+
+    # C is generated with the Address that A declares
+    assert report.failures == {
+        "shop.Address": "shop.Address has two different definitions",
+        "shop.C": "shop.C.address: missing field zip in the converted fields; "
+        "shop.C.address: unexpected field street in the converted fields",
+    }
+    assert sorted(report.verified) == ["shop.A", "shop.B"]
+
+
+def test_offline_verifier_reports_classes_without_a_schema_file(
+    all_schemas: list[SchemaData],
+):
+    result = FaustAvroModelGen.convert_schemas(all_schemas)
+
+    report = OfflineSchemaVerifier().check(result, all_schemas[1:])
+
+    assert list(report.failures.values()) == ["not defined by any schema file"]
+
+
+def test_expanded_canonical_form_writes_out_named_types_wherever_they_are_used():
+    kind = {"type": "enum", "name": "Kind", "symbols": ["HOME"]}
+    defined_first = {
+        "type": "record",
+        "name": "Address",
+        "fields": [{"name": "a", "type": kind}, {"name": "b", "type": "Kind"}],
+    }
+    defined_last = {
+        "type": "record",
+        "name": "Address",
+        "fields": [{"name": "a", "type": "Kind"}, {"name": "b", "type": kind}],
+    }
+    named_types = {"Kind": kind}
+
+    assert parsing_canonical_form(defined_first, expand=True) == (
+        '{"name":"Address","type":"record","fields":['
+        '{"name":"a","type":{"name":"Kind","type":"enum","symbols":["HOME"]}},'
+        '{"name":"b","type":{"name":"Kind","type":"enum","symbols":["HOME"]}}]}'
+    )
+    assert parsing_canonical_form(
+        expand_references(defined_last, named_types), expand=True
+    ) == parsing_canonical_form(defined_first, expand=True)
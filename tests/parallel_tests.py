@@ -0,0 +1,310 @@
+import importlib.util
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from faust_avro_model_codegen.code_formatter import CodeFormatter
+from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+from faust_avro_model_codegen.named_types import ConflictingNamedTypeError
+from faust_avro_model_codegen.parallel import (
+    chunked,
+    module_name,
+    package_modules,
+    render_package_files,
+    render_schema_files,
+    schema_graph,
+    stream_schema_files,
+)
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
+from faust_avro_model_codegen.schema_graph import SchemaCycleError
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.types import decoded_schemas
+from tests.conftest import inline_address
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+
+@pytest.mark.parametrize(
+    "chunk_size, options",
+    [(None, {}), (1, {}), (2, {}), (1, {"compact": True, "frozen": True})],
+)
+def test_render_schema_files_in_parallel_is_byte_identical_to_serial(
+    chunk_size: int, options: dict
+):
+    schema_files = AvroSchemaDirectoryParser.schema_files(SCHEMA_DIR)
+    renderer = TemplateRenderer.from_current_directory(**options)
+
+    serial = render_schema_files(renderer, schema_files, jobs=1)
+    parallel = render_schema_files(
+        renderer, schema_files, jobs=2, chunk_size=chunk_size
+    )
+
+    assert parallel == serial
+
+
+def test_render_schema_files_raises_value_error_when_jobs_is_not_positive():
+    renderer = TemplateRenderer.from_current_directory()
+
+    with pytest.raises(ValueError):
+        render_schema_files(renderer, [], jobs=0)
+
+
+def test_schema_graph_is_built_by_the_workers_without_decoding_in_the_parent():
+    schema_files = AvroSchemaDirectoryParser.schema_files(SCHEMA_DIR)
+    serial = schema_graph(schema_files)
+    decoded_schemas.clear()
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = schema_graph(schema_files, executor, chunk_size=2)
+
+    assert parallel.nodes == serial.nodes
+    assert len(decoded_schemas) == 0
+
+
+def test_chunked_splits_items_in_order():
+    items = [Path(str(i)) for i in range(5)]
+
+    assert chunked(items, 2) == [items[0:2], items[2:4], items[4:5]]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_module_from_files_writes_same_module_as_generate_module(
+    mock_code_gen: FaustAvroModelGen, tmp_path: Path, jobs: int
+):
+    from_schemas = tmp_path / "from_schemas.py"
+    from_files = tmp_path / "from_files.py"
+
+    mock_code_gen.generate_module(
+        AvroSchemaDirectoryParser.parse_dir(SCHEMA_DIR), from_schemas
+    )
+    mock_code_gen.generate_module_from_files(
+        AvroSchemaDirectoryParser.schema_files(SCHEMA_DIR), from_files, jobs=jobs
+    )
+
+    assert from_files.read_text() == from_schemas.read_text()
+
+
+def test_render_schema_files_defines_shared_enums_once(tmp_path: Path):
+    schema_files = []
+    for name in ("First", "Second", "Third"):
+        schema_file = tmp_path / f"{name.lower()}.avsc"
+        schema_file.write_text(
+            json.dumps(
+                {
+                    "type": "record",
+                    "name": name,
+                    "namespace": "example.avro",
+                    "fields": [
+                        {
+                            "name": "colors",
+                            "type": {
+                                "type": "array",
+                                "items": {
+                                    "type": "enum",
+                                    "name": "Color",
+                                    "symbols": ["RED", "GREEN"],
+                                },
+                            },
+                        }
+                    ],
+                }
+            )
+        )
+        schema_files.append(schema_file)
+    renderer = TemplateRenderer.from_current_directory()
+
+    serial = render_schema_files(renderer, schema_files, jobs=1)
+    parallel = render_schema_files(renderer, schema_files, jobs=2, chunk_size=1)
+
+    assert serial.count("class Color(str, enum.Enum):") == 1
+    assert parallel == serial
+
+
+@pytest.mark.parametrize(
+    "layout, modules",
+    [
+        ("schema", ["blog_post", "page_view", "user"]),
+        ("namespace", ["example_avro", "example_avro_analytics"]),
+    ],
+)
+def test_package_modules_groups_schema_files_by_layout(layout: str, modules: list):
+    schema_files = AvroSchemaDirectoryParser.schema_files(SCHEMA_DIR)
+
+    actual = package_modules(schema_files, layout)
+
+    assert list(actual) == modules
+    assert sorted(f for files in actual.values() for f in files) == schema_files
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("page-view", "page_view"),
+        ("2fa", "_2fa"),
+        ("class", "class_"),
+        ("_enums", "_enums_"),
+    ],
+)
+def test_module_name_is_a_valid_module_that_does_not_shadow_generated_ones(
+    name: str, expected: str
+):
+    assert module_name(name) == expected
+
+
+@pytest.mark.parametrize("layout", ["schema", "namespace"])
+def test_render_package_files_is_formatted_and_matches_in_parallel(layout: str):
+    schema_files = AvroSchemaDirectoryParser.schema_files(SCHEMA_DIR)
+    renderer = TemplateRenderer.from_current_directory()
+
+    serial = render_package_files(renderer, schema_files, layout, jobs=1)
+    parallel = render_package_files(renderer, schema_files, layout, jobs=2)
+
+    assert parallel == serial
+    assert serial["_enums.py"].count("(str, enum.Enum):") == 3
+    formatter = CodeFormatter()
+    for name, source in serial.items():
+        assert formatter.format(source, SCHEMA_DIR / name) == source
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_render_schema_files_defines_referenced_records_first(
+    referencing_schema_dir: Path, jobs: int
+):
+    schema_files = AvroSchemaDirectoryParser.schema_files(referencing_schema_dir)
+    renderer = TemplateRenderer.from_current_directory()
+
+    actual = render_schema_files(renderer, schema_files, jobs=jobs, chunk_size=1)
+
+    classes = [line for line in actual.splitlines() if line.startswith("class ")]
+    assert classes == [
+        "class Region(AvroRecord):",
+        "class ZipAddress(AvroRecord):",
+        "class Account(AvroRecord):",
+    ]
+    assert actual == render_schema_files(renderer, schema_files)
+
+
+@pytest.mark.parametrize(
+    "layout, expected",
+    [
+        (
+            "schema",
+            {
+                "account.py": ["from .zip_address import ZipAddress"],
+                "region.py": [],
+                "zip_address.py": ["from .region import Region"],
+            },
+        ),
+        (
+            "namespace",
+            {
+                "com_acme_accounts.py": ["from .com_acme_geo import ZipAddress"],
+                "com_acme_geo.py": [],
+            },
+        ),
+    ],
+)
+def test_render_package_files_imports_records_from_other_modules(
+    referencing_schema_dir: Path, layout: str, expected: dict
+):
+    schema_files = AvroSchemaDirectoryParser.schema_files(referencing_schema_dir)
+    renderer = TemplateRenderer.from_current_directory()
+
+    actual = render_package_files(renderer, schema_files, layout, jobs=1)
+
+    imports = {
+        name: [line for line in source.splitlines() if line.startswith("from .")]
+        for name, source in actual.items()
+        if name != "__init__.py"
+    }
+    assert imports == expected
+    assert actual == render_package_files(renderer, schema_files, layout, jobs=2)
+    formatter = CodeFormatter()
+    for name, source in actual.items():
+        assert formatter.format(source, referencing_schema_dir / name) == source
+
+
+def test_render_package_files_rejects_modules_that_would_import_each_other(
+    tmp_path: Path,
+):
+    for name, namespace, reference in [
+        ("a", "first", "second.B"),
+        ("b", "second", "first.C"),
+        ("c", "first", "string"),
+    ]:
+        schema = {
+            "type": "record",
+            "name": name.upper(),
+            "namespace": namespace,
+            "fields": [{"name": "field", "type": reference}],
+        }
+        (tmp_path / f"{name}.avsc").write_text(json.dumps(schema))
+    schema_files = AvroSchemaDirectoryParser.schema_files(tmp_path)
+    renderer = TemplateRenderer.from_current_directory()
+
+    with pytest.raises(SchemaCycleError):
+        render_package_files(renderer, schema_files, "namespace")
+    assert len(render_package_files(renderer, schema_files, "schema")) == 4
+
+
+def _import_module(path: Path, source: str):
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[path.stem] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_render_schema_files_defines_a_record_inlined_by_several_schemas_once(
+    inline_address_schema_dir: Path, tmp_path: Path, jobs: int
+):
+    schema_files = AvroSchemaDirectoryParser.schema_files(inline_address_schema_dir)
+    renderer = TemplateRenderer.from_current_directory()
+
+    actual = render_schema_files(renderer, schema_files, jobs=jobs, chunk_size=1)
+
+    assert actual.count("class Address(AvroRecord):") == 1
+    assert actual == "".join(stream_schema_files(renderer, schema_files))
+    module = _import_module(tmp_path / "inline_address_models.py", actual)
+    address = module.Address(street="Main Street")
+    for record in (module.A, module.B, module.C):
+        assert record(address=address).to_dict() == {
+            "address": {"street": "Main Street"}
+        }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_render_schema_files_rejects_a_record_inlined_with_other_fields(
+    inline_address_schema_dir: Path, jobs: int
+):
+    schema = json.loads((inline_address_schema_dir / "c.avsc").read_text())
+    schema["fields"][0]["type"] = inline_address("zip")
+    (inline_address_schema_dir / "c.avsc").write_text(json.dumps(schema))
+    schema_files = AvroSchemaDirectoryParser.schema_files(inline_address_schema_dir)
+    renderer = TemplateRenderer.from_current_directory()
+
+    with pytest.raises(ConflictingNamedTypeError, match="shop.Address has two"):
+        render_schema_files(renderer, schema_files, jobs=jobs, chunk_size=1)
+    with pytest.raises(ConflictingNamedTypeError, match="shop.Address has two"):
+        "".join(stream_schema_files(renderer, schema_files))
+    with pytest.raises(ConflictingNamedTypeError, match="shop.Address has two"):
+        render_package_files(renderer, schema_files, "schema", jobs=jobs)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_render_package_files_imports_a_record_inlined_by_several_schemas(
+    inline_address_schema_dir: Path, jobs: int
+):
+    schema_files = AvroSchemaDirectoryParser.schema_files(inline_address_schema_dir)
+    renderer = TemplateRenderer.from_current_directory()
+
+    actual = render_package_files(renderer, schema_files, "schema", jobs=jobs)
+
+    assert [n for n, s in actual.items() if "class Address(" in s] == ["a.py"]
+    assert "from .a import Address" in actual["b.py"]
+    assert "from .a import Address" in actual["c.py"]
@@ -0,0 +1,101 @@
+import itertools
+import threading
+from pathlib import Path
+
+from faust_avro_model_codegen import TemplateWriter, profiling
+from faust_avro_model_codegen.models_generator import FaustAvroModelGen
+from faust_avro_model_codegen.profiling import Profiler
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.types import SchemaData
+
+
+def ticking_clock(step: float = 1.0):
+    ticks = itertools.count()
+    return lambda: next(ticks) * step
+
+
+def test_profiler_subtracts_nested_stages_from_the_stage_around_them():
+    profiler = Profiler(clock=ticking_clock())
+
+    with profiler.stage("write"):
+        with profiler.stage("convert", "user"):
+            pass
+        with profiler.stage("convert", "blog_post"):
+            pass
+
+    assert {name: t.seconds for name, t in profiler.stages.items()} == {
+        "convert": 2.0,
+        "write": 3.0,
+    }
+    assert profiler.stages["convert"].calls == 2
+    assert profiler.slowest() == [
+        ("user", "convert", 1.0),
+        ("blog_post", "convert", 1.0),
+    ]
+
+
+def test_profiler_keeps_the_stages_of_each_thread_apart():
+    profiler = Profiler(clock=ticking_clock())
+
+    def format_module():
+        with profiler.stage("black"):
+            pass
+
+    with profiler.stage("write"):
+        thread = threading.Thread(target=format_module)
+        thread.start()
+        thread.join()
+
+    # the thread's stage is not nested in the stage of the main thread
+    assert {name: t.seconds for name, t in profiler.stages.items()} == {
+        "black": 1.0,
+        "write": 3.0,
+    }
+
+
+def test_profiler_reports_the_slowest_schemas_first():
+    profiler = Profiler(clock=ticking_clock())
+    profiler.schema_time("registry", "user", 0.5)
+    profiler.schema_time("registry", "blog_post", 2.0)
+    profiler.schema_time("registry", "page_view", 1.0)
+
+    report = profiler.report(slowest=2)
+
+    assert report["slowest_schemas"] == [
+        {"schema": "blog_post", "stage": "registry", "seconds": 2.0},
+        {"schema": "page_view", "stage": "registry", "seconds": 1.0},
+    ]
+
+
+def test_stages_record_nothing_without_a_profiler():
+    assert not profiling.enabled()
+
+    assert profiling.stage("convert", "user") is profiling.stage("render")
+    profiling.schema_time("registry", "user", 1.0)
+
+
+def test_generate_module_times_every_stage(
+    all_schemas: list[SchemaData], outfile: Path
+):
+    app = FaustAvroModelGen(
+        renderer=TemplateRenderer.from_current_directory(),
+        verifier=None,
+        writer=TemplateWriter(),
+    )
+
+    with profiling.profiled(Profiler()) as profiler:
+        app.generate_module(all_schemas, outfile)
+
+    assert not profiling.enabled()
+    assert list(profiler.stages) == [
+        "parse",
+        "convert",
+        "render",
+        "isort",
+        "autoflake",
+        "black",
+        "write",
+    ]
+    assert {schema for schema, _, _ in profiler.slowest()} == {
+        s.name for s in all_schemas
+    }
@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import pytest
+
+from faust_avro_model_codegen.schema_dir_parser import (
+    AvroSchemaDirectoryParser,
+    DuplicateSchemaNameError,
+    compile_patterns,
+)
+
+
+@pytest.fixture
+def schema_tree(tmp_path: Path) -> Path:
+    for relative in [
+        "top.avsc",
+        "notes.txt",
+        "events/page_view.avsc",
+        "events/clicks/click.avsc",
+        "events/vendor/copy.avsc",
+        "vendor/library.avsc",
+        "users/user.avsc",
+    ]:
+        path = tmp_path / "repo" / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'{{"name": "{path.stem}"}}')
+    return tmp_path / "repo"
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    [
+        ("*.avsc", "user.avsc", True),
+        ("*.avsc", "users/user.avsc", False),
+        ("**/*.avsc", "user.avsc", True),
+        ("**/*.avsc", "a/b/user.avsc", True),
+        ("users/?ser.avsc", "users/user.avsc", True),
+        ("**/vendor/**", "events/vendor/copy.avsc", True),
+        ("**/vendor/**", "vendored/copy.avsc", False),
+    ],
+)
+def test_compile_patterns_matches_globs_against_relative_paths(
+    pattern: str, path: str, expected: bool
+):
+    assert (compile_patterns([pattern]).fullmatch(path) is not None) is expected
+
+
+def test_schema_files_only_finds_top_level_schemas_by_default(schema_tree: Path):
+    assert AvroSchemaDirectoryParser.schema_files(schema_tree) == [
+        schema_tree / "top.avsc"
+    ]
+
+
+def test_discover_walks_every_root_recursively_and_skips_excluded_paths(
+    schema_tree: Path,
+):
+    actual = AvroSchemaDirectoryParser.discover(
+        [schema_tree / "users", schema_tree, schema_tree / "missing"],
+        include=["**/*.avsc"],
+        exclude=["**/vendor/**", "top.avsc"],
+    )
+
+    assert actual == [
+        schema_tree / "events" / "clicks" / "click.avsc",
+        schema_tree / "events" / "page_view.avsc",
+        schema_tree / "users" / "user.avsc",
+    ]
+
+
+@pytest.mark.parametrize(
+    "pattern", ["vendor", "vendor/", "vendor/**", "**/vendor", "**/vendor/**"]
+)
+def test_discover_excludes_everything_in_a_folder_the_pattern_matches(
+    schema_tree: Path, pattern: str
+):
+    actual = AvroSchemaDirectoryParser.discover(
+        [schema_tree], include=["**/*.avsc"], exclude=[pattern]
+    )
+
+    assert schema_tree / "vendor" / "library.avsc" not in actual
+    assert (schema_tree / "events" / "vendor" / "copy.avsc" in actual) is (
+        not pattern.startswith("**")
+    )
+
+
+def test_discover_excludes_files_without_pruning_folders(schema_tree: Path):
+    actual = AvroSchemaDirectoryParser.discover(
+        [schema_tree], include=["**/*.avsc"], exclude=["**/*y.avsc"]
+    )
+
+    assert schema_tree / "vendor" / "library.avsc" not in actual
+    assert schema_tree / "events" / "vendor" / "copy.avsc" not in actual
+    assert schema_tree / "events" / "page_view.avsc" in actual
+
+
+def test_discover_rejects_schemas_with_the_same_file_name(schema_tree: Path):
+    (schema_tree / "events" / "user.avsc").write_text('{"name": "user"}')
+
+    with pytest.raises(DuplicateSchemaNameError) as exc_info:
+        AvroSchemaDirectoryParser.discover([schema_tree], include=["**/*.avsc"])
+
+    assert str(exc_info.value) == (
+        f"{schema_tree / 'events' / 'user.avsc'} and "
+        f"{schema_tree / 'users' / 'user.avsc'} are both named user"
+    )
+
+
+def test_discover_lists_a_schema_found_from_two_roots_once(schema_tree: Path):
+    actual = AvroSchemaDirectoryParser.discover(
+        [schema_tree, schema_tree / "users"], include=["**/*.avsc"]
+    )
+
+    assert actual.count(schema_tree / "users" / "user.avsc") == 1
+
+
+def test_parse_files_reads_schemas_in_the_given_order(schema_tree: Path):
+    schema_files = AvroSchemaDirectoryParser.discover(
+        [schema_tree], include=["**/*.avsc"]
+    )[::-1]
+
+    actual = AvroSchemaDirectoryParser.parse_files(schema_files)
+
+    assert [s.schema["name"] for s in actual] == [f.stem for f in schema_files]
@@ -0,0 +1,143 @@
+import pytest
+
+from faust_avro_model_codegen.schema_graph import (
+    SchemaCycleError,
+    SchemaGraph,
+    SchemaNode,
+    UnresolvedReferenceError,
+    expand_references,
+)
+
+
+def record(name: str, *types, namespace: str = "com.acme") -> dict:
+    return {
+        "type": "record",
+        "name": name,
+        "namespace": namespace,
+        "fields": [{"name": f"f{i}", "type": t} for i, t in enumerate(types)],
+    }
+
+
+def graph_of(schemas: dict) -> SchemaGraph[str]:
+    return SchemaGraph.from_schemas(schemas.items(), schemas.__getitem__)
+
+
+def test_schema_node_lists_definitions_and_references_to_other_schemas():
+    schema = record(
+        "User",
+        {"type": "enum", "name": "Color", "symbols": ["RED"]},
+        {"type": "array", "items": "Color"},
+        {"type": "map", "values": ["null", "Address"]},
+        "other.Team",
+        "string",
+    )
+
+    actual = SchemaNode.from_schema(schema)
+
+    assert actual.defines == {"com.acme.User", "com.acme.Color"}
+    assert actual.references == {"com.acme.Address", "other.Team"}
+    assert actual.namespace == "com.acme"
+
+
+def test_order_puts_referenced_schemas_first_and_keeps_the_given_order_otherwise():
+    graph = graph_of(
+        {
+            "a": record("A", "C"),
+            "b": record("B"),
+            "c": record("C", "D"),
+            "d": record("D"),
+        }
+    )
+
+    assert graph.order() == ["b", "d", "c", "a"]
+    assert graph.order(["a", "b", "c"]) == ["b", "c", "a"]
+
+
+def test_order_raises_when_schemas_reference_each_other():
+    graph = graph_of({"a": record("A", "B"), "b": record("B", "A"), "c": record("C")})
+
+    with pytest.raises(SchemaCycleError, match="a, b"):
+        graph.order()
+
+
+def test_order_raises_for_references_no_schema_defines():
+    graph = graph_of({"a": record("A", "Missing")})
+
+    with pytest.raises(UnresolvedReferenceError, match="com.acme.Missing"):
+        graph.order()
+
+
+def test_dependents_include_schemas_that_reference_them_transitively():
+    graph = graph_of(
+        {
+            "a": record("A", "B"),
+            "b": record("B", "C"),
+            "c": record("C"),
+            "d": record("D"),
+        }
+    )
+
+    assert graph.dependents(["c"]) == {"a", "b", "c"}
+    assert graph.dependents(["a"]) == {"a"}
+
+
+def test_update_returns_the_changed_schemas_and_their_dependents():
+    schemas = {"a": record("A", "B"), "b": record("B"), "c": record("C")}
+    graph = graph_of(schemas)
+
+    assert graph.update({"b": record("B", "string")}) == {"a", "b"}
+    assert graph.update({}, removed=["b"]) == {"a"}
+    # a new definition resolves the references that were waiting for it
+    assert graph.update({"e": record("B")}) == {"a", "e"}
+    assert graph.order() == ["c", "e", "a"]
+
+
+def test_named_types_include_the_definitions_referenced_definitions_need():
+    zone = {"type": "enum", "name": "Zone", "symbols": ["EU"]}
+    graph = graph_of(
+        {
+            "user": record("User", "geo.Address"),
+            "address": record("Address", zone, namespace="geo"),
+            "unused": record("Unused"),
+        }
+    )
+
+    actual = graph.named_types(["user"])
+
+    assert actual == {"geo.Address": record("Address", zone, namespace="geo")}
+    assert graph.named_types(["address"]) == {}
+
+
+def test_named_types_keep_the_namespace_a_nested_definition_inherits():
+    zone = {"type": "enum", "name": "Zone", "symbols": ["EU"]}
+    graph = graph_of(
+        {"user": record("User", "geo.Zone"), "zone": record("Z", zone, namespace="geo")}
+    )
+
+    assert graph.named_types(["user"]) == {"geo.Zone": {**zone, "namespace": "geo"}}
+
+
+def test_expand_references_inlines_each_definition_where_it_is_first_used():
+    address = record("Address", "string", namespace="geo")
+    schema = record("User", "geo.Address", ["null", "geo.Address"], "Address")
+
+    actual = expand_references(schema, {"geo.Address": address})
+
+    assert actual == record("User", address, ["null", "geo.Address"], "Address")
+    assert schema == record("User", "geo.Address", ["null", "geo.Address"], "Address")
+
+
+def test_expand_references_inlines_types_defined_inside_other_types_once():
+    kind = {"type": "enum", "name": "Kind", "namespace": "geo", "symbols": ["HOME"]}
+    address = record(
+        "Address",
+        {"type": "enum", "name": "Kind", "symbols": ["HOME"]},
+        namespace="geo",
+    )
+    schema = record("User", "geo.Kind", "geo.Address")
+
+    actual = expand_references(schema, {"geo.Kind": kind, "geo.Address": address})
+
+    assert actual == record(
+        "User", kind, record("Address", "geo.Kind", namespace="geo")
+    )
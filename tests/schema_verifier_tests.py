@@ -1,60 +1,210 @@
-from typing import Type, cast
-from unittest.mock import Mock, MagicMock
+import json
+from typing import Type
 
+import httpx
 import pytest
 from dataclasses_avroschema.faust import AvroRecord
 
-from faust_avro_model_codegen.schema_verifier import SchemaNotAbleToBeVerified
+from faust_avro_model_codegen.schema_verifier import (
+    SchemaNotAbleToBeVerified,
+    SchemaVerifier,
+    VerificationReport,
+)
+from tests.conftest import FakeSchemaRegistry
 
 
 def test_verifier_raises_schema_not_able_to_be_verified_when_check_sr_fails(
-    failed_verifier: Mock, generated_modules_dict: dict[str, Type[AvroRecord]]
+    failed_verifier: SchemaVerifier,
+    generated_modules_dict: dict[str, Type[AvroRecord]],
 ):
     with pytest.raises(SchemaNotAbleToBeVerified):
         failed_verifier.verify(generated_modules_dict)
 
 
+def test_verifier_reports_every_failed_schema_in_one_error(
+    failed_verifier: SchemaVerifier,
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    with pytest.raises(SchemaNotAbleToBeVerified) as exc_info:
+        failed_verifier.verify(generated_modules_dict)
+
+    assert sorted(exc_info.value.failures) == ["blog_post", "user"]
+
+
+def test_verifier_returns_registry_ids_of_verified_schemas(
+    successful_verifier: SchemaVerifier,
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    actual = successful_verifier.verify(generated_modules_dict)
+
+    assert actual == VerificationReport(verified={"blog_post": 1, "user": 2})
+
+
 def test_verifier_passes_expected_args_to_http_client(
-    successful_verifier: Mock,
+    successful_verifier: SchemaVerifier,
     generated_modules_dict: dict[str, Type[AvroRecord]],
-    mock_httpx_client_success: MagicMock,
+    fake_registry: FakeSchemaRegistry,
+    blog_post_avro_dict: dict,
+    user_avro_dict: dict,
 ):
     successful_verifier.verify(generated_modules_dict)
-    [[[first_url], first_payload], [[second_url], second_payload]] = cast(
-        MagicMock, mock_httpx_client_success.post
-    ).call_args_list
+    [first, second] = sorted(fake_registry.requests, key=lambda r: str(r.url))
 
+    # generated records embed their source schema verbatim
     expected_args = [
         "http://localhost:8082/subjects/blog_post-value",
-        {
-            "json": {
-                "schema": '{"type": "record", "name": "BlogPost", "fields": '
-                '[{"doc": "None", "name": "id", "type": "string"}, '
-                '{"doc": "None", "name": "title", "type": "string"}, '
-                '{"doc": "None", "name": "content", "type": "string"}, '
-                '{"doc": "None", "name": "author", "type": "string"}], '
-                '"namespace": "example.avro"}'
-            }
-        },
+        {"schema": json.dumps(blog_post_avro_dict)},
         "http://localhost:8082/subjects/user-value",
-        {
-            "json": {
-                "schema": '{"type": "record", "name": "User", "fields": [{"doc": '
-                '"None", "name": "name", "type": "string"}, {"doc": '
-                '"None", "name": "favorite_number", "type": ["int", '
-                '"null"]}, {"doc": "None", "name": "favorite_colors", '
-                '"type": {"type": "array", "items": {"type": "enum", '
-                '"name": "Color", "symbols": ["RED", "GREEN", "BLUE"]}, '
-                '"name": "favorite_color"}}, {"doc": "None", "name": '
-                '"additional_field", "type": ["null", {"type": "array", '
-                '"items": {"type": "enum", "name": "AdditionalColor", '
-                '"symbols": ["YELLOW", "PURPLE", "ORANGE"]}, "name": '
-                '"additional_field"}]}, {"doc": "None", "name": '
-                '"timestamp_field", "type": {"type": "long", '
-                '"logicalType": "timestamp-millis"}}, {"doc": "None", '
-                '"default": null, "name": "new_field", "type": ["null", '
-                '"string"]}], "namespace": "example.avro"}'
-            }
-        },
+        {"schema": json.dumps(user_avro_dict)},
+    ]
+    actual_args = [
+        str(first.url),
+        json.loads(first.content),
+        str(second.url),
+        json.loads(second.content),
     ]
-    assert [first_url, first_payload, second_url, second_payload] == expected_args
+    assert actual_args == expected_args
+
+
+def test_verifier_uses_a_single_pooled_client_for_all_subjects(
+    successful_verifier: SchemaVerifier,
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+    fake_registry: FakeSchemaRegistry,
+):
+    successful_verifier.verify(generated_modules_dict)
+
+    assert fake_registry.clients_created == 1
+    assert len(fake_registry.requests) == 2
+
+
+def test_verifier_retries_unavailable_registry_with_backoff(
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    registry = FakeSchemaRegistry(
+        subjects={"blog_post-value": 1, "user-value": 2}, unavailable_responses=3
+    )
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=registry.client,
+        retries=3,
+        backoff=0,
+    )
+
+    actual = verifier.verify(generated_modules_dict)
+
+    assert actual.ok
+    assert len(registry.requests) == 5
+
+
+def test_verifier_gives_up_after_configured_retries(
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    registry = FakeSchemaRegistry(
+        subjects={"blog_post-value": 1, "user-value": 2}, unavailable_responses=100
+    )
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=registry.client,
+        retries=2,
+        backoff=0,
+    )
+
+    with pytest.raises(SchemaNotAbleToBeVerified) as exc_info:
+        verifier.verify(generated_modules_dict)
+
+    assert sorted(exc_info.value.failures) == ["blog_post", "user"]
+    assert len(registry.requests) == 6
+
+
+def test_verifier_collects_transport_errors_as_failures(
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=lambda: httpx.AsyncClient(transport=httpx.MockTransport(unreachable)),
+        retries=1,
+        backoff=0,
+    )
+
+    with pytest.raises(SchemaNotAbleToBeVerified) as exc_info:
+        verifier.verify(generated_modules_dict)
+
+    assert sorted(exc_info.value.failures) == ["blog_post", "user"]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>not json</html>"),
+        httpx.Response(200, json={"error_code": 0}),
+        httpx.Response(200, json=["not", "an", "object"]),
+    ],
+)
+def test_verifier_collects_unexpected_responses_as_failures(
+    generated_modules_dict: dict[str, Type[AvroRecord]], response: httpx.Response
+):
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: response)
+        ),
+        backoff=0,
+    )
+
+    with pytest.raises(SchemaNotAbleToBeVerified) as exc_info:
+        verifier.verify(generated_modules_dict)
+
+    assert sorted(exc_info.value.failures) == ["blog_post", "user"]
+    assert all(
+        reason.startswith("unexpected response from SR")
+        for reason in exc_info.value.failures.values()
+    )
+
+
+def test_verifier_collects_other_request_errors_without_cancelling_the_rest(
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+    fake_registry: FakeSchemaRegistry,
+):
+    async def undecodable_user(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/subjects/user-value":
+            raise httpx.DecodingError("malformed gzip data", request=request)
+        return await fake_registry.handler(request)
+
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(undecodable_user)
+        ),
+        backoff=0,
+    )
+
+    with pytest.raises(SchemaNotAbleToBeVerified) as exc_info:
+        verifier.verify(generated_modules_dict)
+
+    assert list(exc_info.value.failures) == ["user"]
+    assert len(fake_registry.requests) == 1
+
+
+def test_verifier_bounds_the_number_of_concurrent_requests(
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    many_classes = {
+        f"{name}_{i}": cls
+        for i in range(10)
+        for name, cls in generated_modules_dict.items()
+    }
+    registry = FakeSchemaRegistry(
+        subjects={f"{name}-value": 1 for name in many_classes}, latency=0.01
+    )
+    verifier = SchemaVerifier(
+        schema_registry_url="http://localhost:8082",
+        client=registry.client,
+        max_concurrency=3,
+    )
+
+    verifier.verify(many_classes)
+
+    assert registry.max_in_flight == 3
@@ -34,3 +34,33 @@ def test_settings_from_toml_returns_expected_settings_object_from_standalone_tom
 def test_settings_from_toml_returns_default_settings_object_when_no_toml_files_exist():
     with pytest.raises(ConfigNotFoundError):
         Settings.from_toml()
+
+
+def test_settings_manifest_path_defaults_to_hidden_file_next_to_outfile():
+    settings = Settings(outfile=Path("fake_app/models.py"))
+
+    assert settings.manifest_path == Path("fake_app/.models.py.manifest.json")
+
+
+def test_settings_digest_changes_when_a_setting_changes():
+    assert Settings().digest() != Settings(outfile=Path("other.py")).digest()
+
+
+def test_settings_digest_changes_with_the_format_mode():
+    assert Settings().digest() != Settings().digest(format_output=False)
+
+
+def test_settings_output_path_is_a_package_named_after_outfile_for_split_layouts():
+    module = Settings(outfile=Path("fake_app/models.py"))
+    package = Settings(outfile=Path("fake_app/models.py"), output_layout="namespace")
+
+    assert module.output_path == Path("fake_app/models.py")
+    assert package.output_path == Path("fake_app/models")
+
+
+def test_settings_schema_roots_prefer_schema_dirs_over_schema_dir():
+    assert Settings(schema_dir=Path("a")).schema_roots == [Path("a")]
+    assert Settings(schema_dirs=[Path("b"), Path("c")]).schema_roots == [
+        Path("b"),
+        Path("c"),
+    ]
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# cumulative microseconds reported by -X importtime for the CLI module, the
+# verify and formatting stacks alone take longer than this
+STARTUP_BUDGET_US = 400_000
+RUNS = 3
+HEAVY_MODULES = ["httpx", "black", "isort", "autoflake", "dataclasses_avroschema"]
+
+
+def import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "module", ["faust_avro_model_codegen", "faust_avro_model_codegen.__main__"]
+)
+def test_cli_cold_start_stays_within_budget(module: str):
+    runs = [import_times(module) for _ in range(RUNS)]
+
+    assert min(times[module] for times in runs) <= STARTUP_BUDGET_US
+    assert [m for m in HEAVY_MODULES if m in runs[0]] == []
+
+
+@pytest.mark.parametrize("options", [["--check"], ["--check", "--no-format"]])
+def test_check_run_does_not_import_the_formatters(tmp_path: Path, options: list):
+    root = Path(__file__).parent.parent
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 100\n")
+    (tmp_path / "faust_avro_model_codegen.toml").write_text(
+        f'schema_dir = "{root / "tests" / "schemas"}"\n'
+        'outfile = "app/models.py"\n'
+        'schema_registry_url = "http://localhost:8082"\n'
+        'faust_app_models_module = "models"\n'
+    )
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-m",
+            "faust_avro_model_codegen",
+            *options,
+        ],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(root)},
+    )
+    imported = {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    assert "is out of date" in result.stdout
+    assert [m for m in ["black", "isort", "autoflake"] if m in imported] == []
@@ -1,10 +1,20 @@
+from pathlib import Path
+
 import pytest
 
-from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.code_formatter import CodeFormatter
+from faust_avro_model_codegen.template_renderer import (
+    TEMPLATE_DIR,
+    TemplateRenderer,
+    required_imports,
+    template_environment,
+)
+from faust_avro_model_codegen.template_writer import TemplateWriter
 from faust_avro_model_codegen.types import (
     PythonEnumClass,
     PythonAvroModel,
     CodeGenResultData,
+    SchemaData,
 )
 
 
@@ -14,6 +24,41 @@ def test_template_renderer_from_current_directory_returns_instance_of_template_R
     assert isinstance(renderer, TemplateRenderer)
 
 
+def test_template_renderer_loads_templates_from_user_directories_first(
+    python_enum_class: PythonEnumClass, tmp_path: Path
+):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "enum.py.jinja2").write_text("class {{ c.name }}: ...\n")
+
+    renderer = TemplateRenderer.from_current_directory(
+        template_dirs=[template_dir], cache_dir=tmp_path / "cache"
+    )
+
+    assert renderer.render(python_enum_class) == "class Color: ..."
+    assert TemplateRenderer.template_files([template_dir]) == sorted(
+        [template_dir / "enum.py.jinja2"]
+        + [t for t in TEMPLATE_DIR.glob("*.jinja2") if t.name != "enum.py.jinja2"]
+    )
+
+
+def test_template_renderer_reuses_compiled_templates_from_the_cache_dir(
+    python_avro_model: PythonAvroModel, tmp_path: Path
+):
+    cache_dir = tmp_path / "cache"
+    expected = TemplateRenderer.from_current_directory(cache_dir=cache_dir).render(
+        python_avro_model
+    )
+    compiled = {f: f.stat().st_mtime_ns for f in cache_dir.iterdir()}
+    template_environment.cache_clear()
+
+    renderer = TemplateRenderer.from_current_directory(cache_dir=cache_dir)
+
+    assert len(compiled) == 4
+    assert {f: f.stat().st_mtime_ns for f in cache_dir.iterdir()} == compiled
+    assert renderer.render(python_avro_model) == expected
+
+
 def test_template_renderer_render_returns_expected_rendered_template_with_python_enum_class(
     python_enum_class: PythonEnumClass,
 ):
@@ -24,7 +69,6 @@ def test_template_renderer_render_returns_expected_rendered_template_with_python
         '    RED = "RED"\n'
         '    GREEN = "GREEN"\n'
         '    BLUE = "BLUE"\n'
-        "    "
     )
     assert actual == expected
 
@@ -35,45 +79,139 @@ def test_template_renderer_render_returns_expected_rendered_template_with_python
     renderer = TemplateRenderer.from_current_directory()
     actual = renderer.render(python_avro_model)
     expected = (
-        "import typing, enum, dataclasses, datetime\n"
-        "\n"
-        "from dataclasses import dataclass, field\n"
-        "from dataclasses_avroschema.schema_generator import CT\n"
-        "from dataclasses_avroschema.faust import AvroRecord\n"
-        "\n"
-        "\n"
         "@dataclass\n"
         "class User(AvroRecord):\n"
         "    def __post_init__(self) -> None:\n"
-        "        for _field in dataclasses.fields(self):\n"
-        "            value = getattr(self, _field.name)\n"
-        "            if isinstance(value, dataclasses.Field):\n"
-        "                setattr(self, _field.name, value.default)\n"
-        "            if isinstance(value, typing.List):\n"
-        "                item: enum.Enum\n"
-        "                for index, item in enumerate(value):\n"
-        "                    if issubclass(item.__class__, enum.Enum):\n"
-        "                        value[index] = item.value\n"
+        "        value = self.favorite_number\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.favorite_number = None\n"
+        "        values = self.favorite_colors\n"
+        "        if isinstance(values, list):\n"
+        "            for index, item in enumerate(values):\n"
+        "                if isinstance(item, enum.Enum):\n"
+        "                    values[index] = item.value\n"
+        "        value = self.additional_field\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.additional_field = None\n"
+        "        values = self.additional_field\n"
+        "        if isinstance(values, list):\n"
+        "            for index, item in enumerate(values):\n"
+        "                if isinstance(item, enum.Enum):\n"
+        "                    values[index] = item.value\n"
+        "        value = self.new_field\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.new_field = value.default\n"
+        "\n"
         '    name: str = field(metadata={"doc": "None"})\n'
-        '    favorite_number: typing.Union[types.Int32,None] = field(metadata={"doc": '
-        '"None"})\n'
+        '    favorite_number: typing.Union[types.Int32, None] = field(metadata={"doc": "None"})\n'
         '    favorite_colors: typing.List[Color] = field(metadata={"doc": "None"})\n'
-        "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = "
-        'field(metadata={"doc": "None"})\n'
+        "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = field(\n"
+        '        metadata={"doc": "None"}\n'
+        "    )\n"
         '    timestamp_field: datetime.datetime = field(metadata={"doc": "None"})\n'
-        '    new_field: typing.Union[None,str] = field(metadata={"doc": "None", '
-        '"default": null}, default=null)\n'
-        "    \n"
+        "    new_field: typing.Union[None, str] = field(\n"
+        '        metadata={"doc": "None", "default": "null"}, default="null"\n'
+        "    )\n"
+        "\n"
+        '    _COLOR_SYMBOLS = {"RED": "RED", "GREEN": "GREEN", "BLUE": "BLUE"}\n'
+        "    _ADDITIONAL_COLOR_SYMBOLS = {\n"
+        '        "YELLOW": "YELLOW",\n'
+        '        "PURPLE": "PURPLE",\n'
+        '        "ORANGE": "ORANGE",\n'
+        "    }\n"
+        "\n"
+        "    def to_dict(self) -> typing.Dict[str, typing.Any]:\n"
+        "        data = {\n"
+        '            "name": self.name,\n'
+        '            "favorite_number": self.favorite_number,\n'
+        '            "favorite_colors": self.favorite_colors,\n'
+        '            "additional_field": self.additional_field,\n'
+        '            "timestamp_field": self.timestamp_field,\n'
+        '            "new_field": self.new_field,\n'
+        "        }\n"
+        '        value = data["favorite_colors"]\n'
+        '        data["favorite_colors"] = list(map(self._COLOR_SYMBOLS.__getitem__, value))\n'
+        '        value = data["additional_field"]\n'
+        "        if value is not None:\n"
+        '            data["additional_field"] = list(\n'
+        "                map(self._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+        "            )\n"
+        "        return data\n"
+        "\n"
+        "    def to_json(self, **kwargs: typing.Any) -> str:\n"
+        "        data = self.to_dict()\n"
+        '        value = data["timestamp_field"]\n'
+        '        data["timestamp_field"] = value.strftime("%Y-%m-%dT%H:%M:%S%z")\n'
+        "        return json.dumps(data, **kwargs)\n"
+        "\n"
+        "    @classmethod\n"
+        "    def from_dict(\n"
+        "        cls,\n"
+        "        data: typing.Mapping[str, typing.Any],\n"
+        '    ) -> "User":\n'
+        "        return cls(\n"
+        '            name=data["name"],\n'
+        '            favorite_number=data.get("favorite_number"),\n'
+        '            favorite_colors=data["favorite_colors"],\n'
+        '            additional_field=data.get("additional_field"),\n'
+        '            timestamp_field=data["timestamp_field"],\n'
+        '            new_field=data.get("new_field"),\n'
+        "        )\n"
         "\n"
-        "    \n"
+        "    @classmethod\n"
+        "    def from_json(\n"
+        "        cls,\n"
+        "        json_data: typing.Union[str, bytes],\n"
+        '    ) -> "User":\n'
+        "        data = json.loads(json_data)\n"
+        '        value = data["favorite_colors"]\n'
+        '        data["favorite_colors"] = list(map(cls._COLOR_SYMBOLS.__getitem__, value))\n'
+        '        value = data.get("additional_field")\n'
+        "        if value is not None:\n"
+        '            data["additional_field"] = list(\n'
+        "                map(cls._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+        "            )\n"
+        '        value = data["timestamp_field"]\n'
+        '        data["timestamp_field"] = datetime.datetime.fromisoformat(value)\n'
+        "        return cls.from_dict(data)\n"
+        "\n"
+        "    def to_representation(self) -> typing.Dict[str, typing.Any]:\n"
+        "        payload = self.to_dict()\n"
+        "        if self._options.include_metadata:\n"
+        '            payload[self._blessed_key] = {"ns": self._options.namespace}\n'
+        "        return payload\n"
+        "\n"
+        "    @classmethod\n"
+        "    def from_data(\n"
+        "        cls,\n"
+        "        data: typing.Mapping[str, typing.Any],\n"
+        "        *,\n"
+        "        preferred_type: typing.Optional[type] = None,\n"
+        '    ) -> "User":\n'
+        "        model = cls._maybe_namespace(data, preferred_type=preferred_type)\n"
+        "        if isinstance(data, dict) and model in (None, cls):\n"
+        "            return cls.from_dict(data)\n"
+        "        return super().from_data(data, preferred_type=preferred_type)\n"
         "\n"
         "    class Meta:\n"
         '        namespace = "example.avro"\n'
-        "    "
     )
     assert actual == expected
 
 
+def test_template_renderer_renders_codec_methods_for_record_without_fields():
+    renderer = TemplateRenderer.from_current_directory()
+    actual = renderer.render(PythonAvroModel(name="Empty"))
+
+    assert actual.startswith(
+        "@dataclass\n"
+        "class Empty(AvroRecord):\n"
+        "    def to_dict(self) -> typing.Dict[str, typing.Any]:\n"
+        "        return {}\n"
+    )
+    assert "        return cls()\n" in actual
+
+
 def test_template_renderer_renders_expected_value_when_provided_code_gen_result_data(
     codegen_result_from_avro_schema: CodeGenResultData,
 ) -> None:
@@ -84,64 +222,243 @@ def test_template_renderer_renders_expected_value_when_provided_code_gen_result_
         "This file is generated by: avro_code_gen\n"
         "Do not edit this file directly unless absolutely necessary!\n"
         '"""\n'
-        "import typing, enum\n"
         "\n"
+        "import dataclasses\n"
         "from dataclasses import dataclass, field\n"
-        "from dataclasses_avroschema import types, AvroModel\n"
-        "from dataclasses_avroschema.schema_generator import CT\n"
-        "\n"
+        "import datetime\n"
+        "import enum\n"
+        "import io\n"
+        "import json\n"
+        "import typing\n"
         "\n"
+        "from dataclasses_avroschema import AvroModel, case, types\n"
+        "from dataclasses_avroschema.faust import AvroRecord\n"
+        "from dataclasses_avroschema.schema_generator import CT\n"
+        "import fastavro\n"
         "\n"
         "\n"
         "class Color(str, enum.Enum):\n"
         '    RED = "RED"\n'
         '    GREEN = "GREEN"\n'
         '    BLUE = "BLUE"\n'
-        "    \n"
+        "\n"
         "\n"
         "class AdditionalColor(str, enum.Enum):\n"
         '    YELLOW = "YELLOW"\n'
         '    PURPLE = "PURPLE"\n'
         '    ORANGE = "ORANGE"\n'
-        "    \n"
-        "\n"
-        "\n"
-        "\n"
-        "import typing, enum, dataclasses, datetime\n"
-        "\n"
-        "from dataclasses import dataclass, field\n"
-        "from dataclasses_avroschema.schema_generator import CT\n"
-        "from dataclasses_avroschema.faust import AvroRecord\n"
         "\n"
         "\n"
         "@dataclass\n"
         "class User(AvroRecord):\n"
         "    def __post_init__(self) -> None:\n"
-        "        for _field in dataclasses.fields(self):\n"
-        "            value = getattr(self, _field.name)\n"
-        "            if isinstance(value, dataclasses.Field):\n"
-        "                setattr(self, _field.name, value.default)\n"
-        "            if isinstance(value, typing.List):\n"
-        "                item: enum.Enum\n"
-        "                for index, item in enumerate(value):\n"
-        "                    if issubclass(item.__class__, enum.Enum):\n"
-        "                        value[index] = item.value\n"
+        "        value = self.favorite_number\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.favorite_number = None\n"
+        "        values = self.favorite_colors\n"
+        "        if isinstance(values, list):\n"
+        "            for index, item in enumerate(values):\n"
+        "                if isinstance(item, enum.Enum):\n"
+        "                    values[index] = item.value\n"
+        "        value = self.additional_field\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.additional_field = None\n"
+        "        values = self.additional_field\n"
+        "        if isinstance(values, list):\n"
+        "            for index, item in enumerate(values):\n"
+        "                if isinstance(item, enum.Enum):\n"
+        "                    values[index] = item.value\n"
+        "        value = self.new_field\n"
+        "        if isinstance(value, dataclasses.Field):\n"
+        "            self.new_field = value.default\n"
+        "\n"
         '    name: str = field(metadata={"doc": "None"})\n'
-        '    favorite_number: typing.Union[types.Int32,None] = field(metadata={"doc": '
-        '"None"})\n'
+        '    favorite_number: typing.Union[types.Int32, None] = field(metadata={"doc": "None"})\n'
         '    favorite_colors: typing.List[Color] = field(metadata={"doc": "None"})\n'
-        "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = "
-        'field(metadata={"doc": "None"})\n'
+        "    additional_field: typing.Union[None, typing.List[AdditionalColor]] = field(\n"
+        '        metadata={"doc": "None"}\n'
+        "    )\n"
         '    timestamp_field: datetime.datetime = field(metadata={"doc": "None"})\n'
-        '    new_field: typing.Union[None,str] = field(metadata={"doc": "None", '
-        '"default": None}, default=None)\n'
-        "    \n"
+        "    new_field: typing.Union[None, str] = field(\n"
+        '        metadata={"doc": "None", "default": None}, default=None\n'
+        "    )\n"
+        "\n"
+        "    _AVRO_SCHEMA = {\n"
+        '        "namespace": "example.avro",\n'
+        '        "type": "record",\n'
+        '        "name": "User",\n'
+        '        "fields": [\n'
+        '            {"name": "name", "type": "string"},\n'
+        '            {"name": "favorite_number", "type": ["int", "null"]},\n'
+        "            {\n"
+        '                "name": "favorite_colors",\n'
+        '                "type": {\n'
+        '                    "type": "array",\n'
+        '                    "items": {\n'
+        '                        "type": "enum",\n'
+        '                        "name": "Color",\n'
+        '                        "symbols": ["RED", "GREEN", "BLUE"],\n'
+        "                    },\n"
+        "                },\n"
+        "            },\n"
+        '            {"name": "new_field", "type": ["null", "string"], "default": None},\n'
+        "            {\n"
+        '                "name": "additional_field",\n'
+        '                "type": [\n'
+        '                    "null",\n'
+        "                    {\n"
+        '                        "type": "array",\n'
+        '                        "items": {\n'
+        '                            "type": "enum",\n'
+        '                            "name": "AdditionalColor",\n'
+        '                            "symbols": ["YELLOW", "PURPLE", "ORANGE"],\n'
+        "                        },\n"
+        "                    },\n"
+        "                ],\n"
+        "            },\n"
+        "            {\n"
+        '                "name": "timestamp_field",\n'
+        '                "type": {"type": "long", "logicalType": "timestamp-millis"},\n'
+        "            },\n"
+        "        ],\n"
+        "    }\n"
+        "    _AVRO_SCHEMA_JSON = json.dumps(_AVRO_SCHEMA)\n"
+        "    _AVRO_PARSED_SCHEMA = fastavro.parse_schema(_AVRO_SCHEMA)\n"
+        "\n"
+        "    @classmethod\n"
+        "    def avro_schema(\n"
+        "        cls: typing.Type[CT],\n"
+        "        case_type: typing.Optional[str] = None,\n"
+        "        **kwargs: typing.Any,\n"
+        "    ) -> str:\n"
+        "        if case_type is None and not kwargs:\n"
+        "            return cls._AVRO_SCHEMA_JSON\n"
+        "        return super().avro_schema(case_type, **kwargs)\n"
+        "\n"
+        "    @classmethod\n"
+        "    def avro_schema_to_python(\n"
+        "        cls: typing.Type[CT],\n"
+        "        parent: typing.Optional[AvroModel] = None,\n"
+        "        case_type: typing.Optional[str] = None,\n"
+        "    ) -> typing.Dict[str, typing.Any]:\n"
+        "        if parent is not None:\n"
+        "            return super().avro_schema_to_python(parent, case_type)\n"
+        "        if case_type is not None:\n"
+        "            return case.case_record(json.loads(cls._AVRO_SCHEMA_JSON), case_type)\n"
+        "        return cls._AVRO_SCHEMA\n"
+        "\n"
+        '    _COLOR_SYMBOLS = {"RED": "RED", "GREEN": "GREEN", "BLUE": "BLUE"}\n'
+        "    _ADDITIONAL_COLOR_SYMBOLS = {\n"
+        '        "YELLOW": "YELLOW",\n'
+        '        "PURPLE": "PURPLE",\n'
+        '        "ORANGE": "ORANGE",\n'
+        "    }\n"
+        "\n"
+        "    def to_dict(self) -> typing.Dict[str, typing.Any]:\n"
+        "        data = {\n"
+        '            "name": self.name,\n'
+        '            "favorite_number": self.favorite_number,\n'
+        '            "favorite_colors": self.favorite_colors,\n'
+        '            "additional_field": self.additional_field,\n'
+        '            "timestamp_field": self.timestamp_field,\n'
+        '            "new_field": self.new_field,\n'
+        "        }\n"
+        '        value = data["favorite_colors"]\n'
+        '        data["favorite_colors"] = list(map(self._COLOR_SYMBOLS.__getitem__, value))\n'
+        '        value = data["additional_field"]\n'
+        "        if value is not None:\n"
+        '            data["additional_field"] = list(\n'
+        "                map(self._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+        "            )\n"
+        "        return data\n"
         "\n"
-        "    \n"
+        "    def to_json(self, **kwargs: typing.Any) -> str:\n"
+        "        data = self.to_dict()\n"
+        '        value = data["timestamp_field"]\n'
+        '        data["timestamp_field"] = value.strftime("%Y-%m-%dT%H:%M:%S%z")\n'
+        "        return json.dumps(data, **kwargs)\n"
+        "\n"
+        "    @classmethod\n"
+        "    def from_dict(\n"
+        "        cls,\n"
+        "        data: typing.Mapping[str, typing.Any],\n"
+        '    ) -> "User":\n'
+        "        return cls(\n"
+        '            name=data["name"],\n'
+        '            favorite_number=data.get("favorite_number"),\n'
+        '            favorite_colors=data["favorite_colors"],\n'
+        '            additional_field=data.get("additional_field"),\n'
+        '            timestamp_field=data["timestamp_field"],\n'
+        '            new_field=data.get("new_field"),\n'
+        "        )\n"
+        "\n"
+        "    @classmethod\n"
+        "    def from_json(\n"
+        "        cls,\n"
+        "        json_data: typing.Union[str, bytes],\n"
+        '    ) -> "User":\n'
+        "        data = json.loads(json_data)\n"
+        '        value = data["favorite_colors"]\n'
+        '        data["favorite_colors"] = list(map(cls._COLOR_SYMBOLS.__getitem__, value))\n'
+        '        value = data.get("additional_field")\n'
+        "        if value is not None:\n"
+        '            data["additional_field"] = list(\n'
+        "                map(cls._ADDITIONAL_COLOR_SYMBOLS.__getitem__, value)\n"
+        "            )\n"
+        '        value = data["timestamp_field"]\n'
+        '        data["timestamp_field"] = datetime.datetime.fromisoformat(value)\n'
+        "        return cls.from_dict(data)\n"
+        "\n"
+        "    def to_representation(self) -> typing.Dict[str, typing.Any]:\n"
+        "        payload = self.to_dict()\n"
+        "        if self._options.include_metadata:\n"
+        '            payload[self._blessed_key] = {"ns": self._options.namespace}\n'
+        "        return payload\n"
+        "\n"
+        "    @classmethod\n"
+        "    def from_data(\n"
+        "        cls,\n"
+        "        data: typing.Mapping[str, typing.Any],\n"
+        "        *,\n"
+        "        preferred_type: typing.Optional[type] = None,\n"
+        '    ) -> "User":\n'
+        "        model = cls._maybe_namespace(data, preferred_type=preferred_type)\n"
+        "        if isinstance(data, dict) and model in (None, cls):\n"
+        "            return cls.from_dict(data)\n"
+        "        return super().from_data(data, preferred_type=preferred_type)\n"
+        "\n"
+        "    @classmethod\n"
+        "    def encode_many(\n"
+        "        cls,\n"
+        '        records: typing.Iterable["User"],\n'
+        "    ) -> typing.List[bytes]:\n"
+        "        write = fastavro.schemaless_writer\n"
+        "        schema = cls._AVRO_PARSED_SCHEMA\n"
+        "        encoded = []\n"
+        "        for record in records:\n"
+        "            buffer = io.BytesIO()\n"
+        "            write(buffer, schema, record.to_dict())\n"
+        "            encoded.append(buffer.getvalue())\n"
+        "        return encoded\n"
+        "\n"
+        "    @classmethod\n"
+        "    def decode_many(\n"
+        "        cls,\n"
+        "        buffers: typing.Iterable[bytes],\n"
+        '    ) -> typing.List["User"]:\n'
+        "        read = fastavro.schemaless_reader\n"
+        "        schema = cls._AVRO_PARSED_SCHEMA\n"
+        "        from_dict = cls.from_dict\n"
+        "        return [from_dict(read(io.BytesIO(buffer), schema)) for buffer in buffers]\n"
         "\n"
         "    class Meta:\n"
         '        namespace = "example.avro"\n'
-        "    \n"
+        "\n"
+        "\n"
+        "def warmup() -> None:\n"
+        "    for record in [User]:\n"
+        "        record.avro_schema_to_python()\n"
+        "        record.get_fields()\n"
     )
     assert actual == expected
 
@@ -152,3 +469,153 @@ def test_template_renderer_render_raises_value_error_when_given_unhandled_value(
     renderer = TemplateRenderer.from_current_directory()
     with pytest.raises(ValueError):
         renderer.render("not a valid value")  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"compact": True}, {"frozen": True}, {"compact": True, "frozen": True}],
+)
+def test_template_renderer_output_is_unchanged_by_the_formatting_pipeline(
+    all_schemas: list[SchemaData],
+    page_view_schema_data: SchemaData,
+    tmp_path: Path,
+    options: dict,
+) -> None:
+    code_gen_result = CodeGenResultData.concat(
+        CodeGenResultData.from_schema_data(s)
+        for s in [*all_schemas, page_view_schema_data]
+    )
+    renderer = TemplateRenderer.from_current_directory(**options)
+    rendered = renderer.render(code_gen_result)
+
+    formatted = CodeFormatter().format(rendered, tmp_path / "models.py")
+
+    assert formatted == rendered
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"compact": True}, {"frozen": True}, {"compact": True, "frozen": True}],
+)
+def test_template_renderer_output_without_formatting_is_byte_identical_to_formatted(
+    all_schemas: list[SchemaData],
+    page_view_schema_data: SchemaData,
+    long_names_schema_data: SchemaData,
+    tmp_path: Path,
+    options: dict,
+) -> None:
+    results = [
+        CodeGenResultData.from_schema_data(s)
+        for s in [*all_schemas, page_view_schema_data, long_names_schema_data]
+    ]
+    renderer = TemplateRenderer.from_current_directory(**options)
+    formatted = tmp_path / "formatted" / "models.py"
+    written = tmp_path / "written" / "models.py"
+    streamed = tmp_path / "streamed" / "models.py"
+
+    TemplateWriter().write(
+        formatted, renderer.render(CodeGenResultData.concat(results))
+    )
+    TemplateWriter(format_output=False).write(
+        written, renderer.render(CodeGenResultData.concat(results))
+    )
+    TemplateWriter(format_output=False).write_stream(
+        streamed, renderer.generate_module(iter(results))
+    )
+
+    assert written.read_bytes() == formatted.read_bytes()
+    assert streamed.read_bytes() == formatted.read_bytes()
+
+
+@pytest.mark.parametrize("line_length", [100, 120])
+def test_template_renderer_lays_out_code_for_the_black_line_length_of_the_project(
+    all_schemas: list[SchemaData], tmp_path: Path, line_length: int
+) -> None:
+    (tmp_path / "pyproject.toml").write_text(
+        f"[tool.black]\nline-length = {line_length}\n"
+    )
+    formatter = CodeFormatter()
+    outfile = tmp_path / "models.py"
+    renderer = TemplateRenderer.from_current_directory(
+        line_length=formatter.line_length(outfile)
+    )
+
+    rendered = renderer.render(
+        CodeGenResultData.concat(
+            CodeGenResultData.from_schema_data(s) for s in all_schemas
+        )
+    )
+
+    assert formatter.format(rendered, outfile) == rendered
+    assert rendered != TemplateRenderer.from_current_directory().render(
+        CodeGenResultData.concat(
+            CodeGenResultData.from_schema_data(s) for s in all_schemas
+        )
+    )
+
+
+def test_template_renderer_generate_module_streams_the_rendered_module(
+    all_schemas: list[SchemaData], page_view_schema_data: SchemaData
+) -> None:
+    results = [
+        CodeGenResultData.from_schema_data(s)
+        for s in [*all_schemas, page_view_schema_data]
+    ]
+    renderer = TemplateRenderer.from_current_directory()
+
+    streamed = renderer.generate_module(iter(results))
+
+    assert "".join(streamed) == renderer.render(CodeGenResultData.concat(results))
+
+
+def test_required_imports_returns_only_enum_for_enum_dependencies() -> None:
+    code_gen_result = CodeGenResultData(
+        classes=[],
+        dependencies=[PythonEnumClass(name="Color", values=["RED"])],
+        schemas={},
+    )
+
+    assert required_imports(code_gen_result) == ["import enum"]
+
+
+def test_required_imports_includes_embedded_schema_imports(
+    page_view_schema_data: SchemaData,
+) -> None:
+    code_gen_result = CodeGenResultData.from_schema_data(page_view_schema_data)
+
+    assert required_imports(code_gen_result) == [
+        "import dataclasses",
+        "from dataclasses import dataclass, field",
+        "import datetime",
+        "import enum",
+        "import io",
+        "import json",
+        "import typing",
+        "",
+        "from dataclasses_avroschema import AvroModel, case, types",
+        "from dataclasses_avroschema.faust import AvroRecord",
+        "from dataclasses_avroschema.schema_generator import CT",
+        "import fastavro",
+    ]
+
+
+def test_required_imports_includes_frozen_record_imports() -> None:
+    code_gen_result = CodeGenResultData(
+        classes=[PythonAvroModel(name="Empty")], dependencies=[], schemas={}
+    )
+
+    assert required_imports(code_gen_result) == [
+        "from dataclasses import dataclass, field",
+        "import json",
+        "import typing",
+        "",
+        "from dataclasses_avroschema.faust import AvroRecord",
+    ]
+    assert required_imports(code_gen_result, frozen=True) == [
+        "import dataclasses",
+        "from dataclasses import dataclass, field",
+        "import json",
+        "import typing",
+        "",
+        "from dataclasses_avroschema.faust import AvroRecord",
+    ]
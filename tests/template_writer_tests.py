@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from faust_avro_model_codegen.template_writer import TemplateWriter
+
+
+def test_template_writer_write_stream_writes_every_chunk(tmp_path: Path):
+    outfile = tmp_path / "app" / "models.py"
+
+    TemplateWriter(format_output=False).write_stream(outfile, ["a = 1\n", "b = 2\n"])
+
+    assert outfile.read_text() == "a = 1\nb = 2\n"
+    assert list(outfile.parent.iterdir()) == [outfile]
+
+
+def test_template_writer_write_stream_keeps_previous_module_when_rendering_fails(
+    tmp_path: Path,
+):
+    outfile = tmp_path / "models.py"
+    outfile.write_text("a = 1\n")
+
+    def chunks() -> Iterator[str]:
+        yield "b = 2\n"
+        raise ValueError("rendering failed")
+
+    with pytest.raises(ValueError):
+        TemplateWriter(format_output=False).write_stream(outfile, chunks())
+
+    assert outfile.read_text() == "a = 1\n"
+    assert list(tmp_path.iterdir()) == [outfile]
+
+
+def test_template_writer_write_stream_formats_modules_with_overlong_lines(
+    tmp_path: Path,
+):
+    outfile = tmp_path / "models.py"
+    items = ", ".join(f'"item{i}"' for i in range(12))
+
+    TemplateWriter(format_output=False).write_stream(
+        outfile, ["a  =  1\n", "values = [", items, "]\n"]
+    )
+
+    assert outfile.read_text() == "a = 1\nvalues = [\n{}]\n".format(
+        "".join(f'    "item{i}",\n' for i in range(12))
+    )
+    assert list(tmp_path.iterdir()) == [outfile]
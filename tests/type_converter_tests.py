@@ -0,0 +1,198 @@
+import json
+
+import pytest
+
+from faust_avro_model_codegen.schema_graph import UnresolvedReferenceError
+from faust_avro_model_codegen.type_converter import TypeConverter
+from faust_avro_model_codegen.types import PythonEnumClass, PythonFixedType
+
+
+@pytest.mark.parametrize(
+    "avro_type, expected",
+    [
+        ("bytes", "bytes"),
+        ({"type": "string"}, "str"),
+        ({"type": "int", "logicalType": "date"}, "datetime.date"),
+        ({"type": "long", "logicalType": "unknown"}, "int"),
+        ({"type": "long", "logicalType": "timestamp-micros"}, "types.DateTimeMicro"),
+        (
+            {"type": "bytes", "logicalType": "decimal", "precision": 4},
+            "types.condecimal(max_digits=4, decimal_places=0)",
+        ),
+        (
+            {
+                "type": "fixed",
+                "name": "Amount",
+                "size": 8,
+                "logicalType": "decimal",
+                "precision": 10,
+                "scale": 2,
+            },
+            "types.condecimal(max_digits=10, decimal_places=2)",
+        ),
+        ({"type": "bytes", "logicalType": "decimal", "scale": 2}, "bytes"),
+        ({"type": "fixed", "name": "Digest", "size": 16}, "bytes"),
+        ({"type": "map", "values": "long"}, "typing.Dict[str, int]"),
+        (
+            {"type": "array", "items": {"type": "map", "values": ["null", "double"]}},
+            "typing.List[typing.Dict[str, typing.Union[None, float]]]",
+        ),
+        (["string", "null", "long"], "typing.Union[str, None, int]"),
+        (["null", "int"], "typing.Union[None, types.Int32]"),
+    ],
+)
+def test_type_converter_annotates_avro_types(avro_type, expected: str):
+    python_field = TypeConverter().field({"name": "f", "type": avro_type}, "ns")
+
+    assert python_field.type == expected
+
+
+@pytest.mark.parametrize(
+    "avro_type, annotation",
+    [
+        (
+            ["null", "string", {"type": "record", "name": "Line", "fields": []}],
+            "typing.Union[None, str, Line]",
+        ),
+        (["string", "int"], "typing.Union[str, types.Int32]"),
+        (
+            ["string", {"type": "array", "items": "string"}],
+            "typing.Union[str, typing.List[str]]",
+        ),
+        (
+            {"type": "array", "items": ["long", {"type": "map", "values": "long"}]},
+            "typing.Union[int, typing.Dict[str, int]]",
+        ),
+    ],
+)
+def test_type_converter_rejects_unions_faust_cannot_coerce(avro_type, annotation: str):
+    with pytest.raises(NotImplementedError) as exc_info:
+        TypeConverter().field({"name": "f", "type": avro_type}, None)
+
+    assert str(exc_info.value).startswith(f"faust can't coerce {annotation},")
+
+
+def test_type_converter_declares_nested_records_before_their_parent(
+    nested_schema: dict,
+):
+    converter = TypeConverter()
+
+    order = converter.model(nested_schema)
+
+    assert [model.name for model in converter.models] == ["Customer", "Line", "Order"]
+    assert converter.models[-1] is order
+    assert [f.type for f in order.fields] == [
+        "Customer",
+        "typing.List[Line]",
+        "typing.Dict[str, Line]",
+        "typing.Dict[str, Tier]",
+        "bytes",
+        "typing.Union[None, Customer, Line]",
+    ]
+    assert converter.enums == [
+        PythonEnumClass(
+            name="Tier", values=["GOLD", "SILVER"], namespace="com.acme.shop"
+        )
+    ]
+
+
+def test_type_converter_gives_nested_records_a_standalone_schema(nested_schema: dict):
+    converter = TypeConverter()
+    converter.model(nested_schema)
+    customer = converter.models[0]
+
+    assert customer.namespace == "com.acme.shop"
+    assert customer.schema == {
+        **nested_schema["fields"][0]["type"],
+        "namespace": "com.acme.shop",
+    }
+
+
+def test_type_converter_inlines_earlier_definitions_in_nested_schemas():
+    tier = {"type": "enum", "name": "Tier", "symbols": ["GOLD"]}
+    schema = {
+        "type": "record",
+        "name": "Account",
+        "fields": [
+            {"name": "tier", "type": tier},
+            {
+                "name": "owner",
+                "type": {
+                    "type": "record",
+                    "name": "Owner",
+                    "fields": [{"name": "tier", "type": "Tier"}],
+                },
+            },
+        ],
+    }
+    converter = TypeConverter()
+
+    converter.model(schema)
+
+    assert converter.models[0].schema["fields"] == [{"name": "tier", "type": tier}]
+
+
+def test_type_converter_shares_one_python_type_between_identical_types():
+    avro_type = {"type": "map", "values": {"type": "array", "items": "string"}}
+    fields = [
+        {"name": "a", "type": avro_type},
+        # decoded separately, with the keys in another order
+        {"name": "b", "type": json.loads(json.dumps(avro_type))},
+        {
+            "name": "c",
+            "type": {"values": {"items": "string", "type": "array"}, "type": "map"},
+        },
+    ]
+
+    memoized = TypeConverter()
+    a, b, c = [memoized.field(field, None) for field in fields]
+    d = TypeConverter(memoize=False).field(fields[0], None)
+
+    assert a.python_type is b.python_type is c.python_type is d.python_type
+
+
+def test_type_converter_keeps_enums_of_different_symbols_apart():
+    first = TypeConverter().field(
+        {"name": "a", "type": {"type": "enum", "name": "E", "symbols": ["A"]}}, None
+    )
+    second = TypeConverter().field(
+        {"name": "a", "type": {"type": "enum", "name": "E", "symbols": ["B"]}}, None
+    )
+
+    assert first.python_type is not second.python_type
+    assert second.python_type.enum.values == ["B"]
+
+
+def test_type_converter_resolves_named_types_of_other_schemas():
+    named_types = {
+        "geo.Kind": {
+            "type": "enum",
+            "name": "Kind",
+            "namespace": "geo",
+            "symbols": ["HOME"],
+        },
+        "geo.Hash": {"type": "fixed", "name": "Hash", "namespace": "geo", "size": 8},
+    }
+    converter = TypeConverter(named_types)
+
+    kinds = converter.field(
+        {"name": "kinds", "type": {"type": "map", "values": "Kind"}}, "geo"
+    )
+    digest = converter.field({"name": "digest", "type": "geo.Hash"}, None)
+
+    assert kinds.type == "typing.Dict[str, Kind]"
+    assert digest.type == "bytes"
+    assert converter.enums == [
+        PythonEnumClass(name="Kind", values=["HOME"], namespace="geo")
+    ]
+    assert converter.models == []
+    assert converter.fixed_types == [
+        PythonFixedType(name="Hash", size=8, annotation="bytes", namespace="geo")
+    ]
+
+
+def test_type_converter_raises_for_unresolved_references_in_containers():
+    with pytest.raises(UnresolvedReferenceError, match="geo.Address"):
+        TypeConverter().field(
+            {"name": "homes", "type": {"type": "array", "items": "Address"}}, "geo"
+        )
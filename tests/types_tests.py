@@ -1,6 +1,12 @@
+import json
+import typing
+
 import pytest
 
+from faust_avro_model_codegen.schema_graph import UnresolvedReferenceError
 from faust_avro_model_codegen.types import (
+    DecodedSchemaCache,
+    LazySchemaData,
     SchemaData,
     CodeGenResultData,
     PythonAvroModel,
@@ -16,6 +22,86 @@ def test_schema_data_from_file(user_avro_json: str, user_avro_dict):
     assert actual == expected
 
 
+@pytest.fixture
+def counting_loads() -> typing.Callable[[bytes], typing.Any]:
+    def loads(raw: bytes) -> typing.Any:
+        loads.calls += 1  # type: ignore[attr-defined]
+        return json.loads(raw)
+
+    loads.calls = 0  # type: ignore[attr-defined]
+    return loads
+
+
+@pytest.fixture(autouse=True)
+def empty_decoded_schemas(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        "faust_avro_model_codegen.types.decoded_schemas", DecodedSchemaCache()
+    )
+
+
+def test_schema_data_from_bytes_decodes_on_first_schema_access(
+    user_avro_json: str, user_avro_dict, counting_loads
+):
+    actual = SchemaData.from_bytes("user", user_avro_json.encode(), counting_loads)
+
+    assert isinstance(actual, SchemaData)
+    assert not actual.decoded
+    assert "user" in repr(actual)
+    assert counting_loads.calls == 0
+    assert actual.schema == user_avro_dict
+    assert actual.schema is actual.schema
+    assert actual.decoded
+    assert counting_loads.calls == 1
+
+
+def test_lazy_schema_data_decodes_identical_content_once(
+    user_avro_json: str, counting_loads
+):
+    raw = user_avro_json.encode()
+    first = LazySchemaData("user", raw, counting_loads)
+    second = LazySchemaData("user_copy", raw, counting_loads)
+
+    assert first.content_hash == second.content_hash
+    assert first.schema is second.schema
+    assert counting_loads.calls == 1
+
+
+def test_lazy_schema_data_converts_like_eager_schema_data(
+    user_avro_json: str, user_schema_data: SchemaData
+):
+    lazy = SchemaData.from_bytes("user", user_avro_json.encode())
+
+    actual = CodeGenResultData.from_schema_data(lazy)
+
+    assert actual == CodeGenResultData.from_schema_data(user_schema_data)
+
+
+def test_decoded_schema_cache_evicts_least_recently_used_past_its_size(
+    counting_loads,
+):
+    cache = DecodedSchemaCache(max_bytes=20)
+    raws = [b'{"name": "a"}', b'{"name": "b"}']
+
+    cache.get("a", raws[0], counting_loads)
+    cache.get("b", raws[1], counting_loads)
+    cache.get("b", raws[1], counting_loads)
+
+    assert len(cache) == 1
+    assert cache.size == len(raws[1])
+    assert counting_loads.calls == 2
+
+
+def test_decoded_schema_cache_skips_documents_larger_than_the_cache(
+    counting_loads,
+):
+    cache = DecodedSchemaCache(max_bytes=4)
+
+    actual = cache.get("a", b'{"name": "a"}', counting_loads)
+
+    assert actual == {"name": "a"}
+    assert len(cache) == 0
+
+
 def test_codegen_result_data_empty():
     actual = CodeGenResultData.empty()
     expected = CodeGenResultData(classes=[], dependencies=[], schemas={})
@@ -62,6 +148,14 @@ def test_codegen_result_data_from_schema_data_returns_expected_value(
     user_schema_data: SchemaData,
 ):
     actual = CodeGenResultData.from_schema_data(user_schema_data)
+    color = PythonEnumClass(
+        name="Color", values=["RED", "GREEN", "BLUE"], namespace="example.avro"
+    )
+    additional_color = PythonEnumClass(
+        name="AdditionalColor",
+        values=["YELLOW", "PURPLE", "ORANGE"],
+        namespace="example.avro",
+    )
     expected = CodeGenResultData(
         classes=[
             PythonAvroModel(
@@ -78,7 +172,7 @@ def test_codegen_result_data_from_schema_data_returns_expected_value(
                     ),
                     PythonAvroField(
                         name="favorite_number",
-                        type="typing.Union[types.Int32,None]",
+                        type="typing.Union[types.Int32, None]",
                         doc=None,
                         default=None,
                         has_default=False,
@@ -89,6 +183,7 @@ def test_codegen_result_data_from_schema_data_returns_expected_value(
                         doc=None,
                         default=None,
                         has_default=False,
+                        enum_items=color,
                     ),
                     PythonAvroField(
                         name="additional_field",
@@ -96,6 +191,7 @@ def test_codegen_result_data_from_schema_data_returns_expected_value(
                         doc=None,
                         default=None,
                         has_default=False,
+                        enum_items=additional_color,
                     ),
                     PythonAvroField(
                         name="timestamp_field",
@@ -106,20 +202,16 @@ def test_codegen_result_data_from_schema_data_returns_expected_value(
                     ),
                     PythonAvroField(
                         name="new_field",
-                        type="typing.Union[None,str]",
+                        type="typing.Union[None, str]",
                         doc=None,
                         default=None,
                         has_default=True,
                     ),
                 ],
+                schema=user_schema_data.schema,
             )
         ],
-        dependencies=[
-            PythonEnumClass(name="Color", values=["RED", "GREEN", "BLUE"]),
-            PythonEnumClass(
-                name="AdditionalColor", values=["YELLOW", "PURPLE", "ORANGE"]
-            ),
-        ],
+        dependencies=[color, additional_color],
         schemas={
             "user": {
                 "fields": [
@@ -172,8 +264,108 @@ def test_avro_schema_raises_not_implemented_error_if_its_not_handled():
         "name": "User",
         "fields": [
             {"name": "name", "type": "string"},
-            {"name": "data", "type": "bytes"},
+            {"name": "referrer", "type": ["null", "User"]},
         ],
     }
     with pytest.raises(NotImplementedError):
         CodeGenResultData.from_schema_data(SchemaData(name="user", schema=avro_schema))
+
+
+def test_codegen_result_data_inplace_add_appends_to_the_left_operand():
+    a = CodeGenResultData(classes=["a"], dependencies=["a"], schemas={"a": "a"})
+    b = CodeGenResultData(classes=["b"], dependencies=["b"], schemas={"b": "b"})
+    classes = a.classes
+
+    a += b
+
+    assert a.classes is classes
+    assert a == CodeGenResultData(
+        classes=["a", "b"], dependencies=["a", "b"], schemas={"a": "a", "b": "b"}
+    )
+
+
+def test_codegen_result_data_concat_equals_folding_with_add():
+    results = [
+        CodeGenResultData(classes=[n], dependencies=[n], schemas={n: n}) for n in "abc"
+    ]
+    expected = results[0] + results[1] + results[2]
+
+    assert CodeGenResultData.concat(results) == expected
+
+
+def test_codegen_result_data_concat_does_not_mutate_its_inputs():
+    a = CodeGenResultData(classes=["a"], dependencies=["a"], schemas={"a": "a"})
+    b = CodeGenResultData(classes=["b"], dependencies=["b"], schemas={"b": "b"})
+
+    CodeGenResultData.concat([a, b])
+
+    assert a == CodeGenResultData(classes=["a"], dependencies=["a"], schemas={"a": "a"})
+
+
+def test_convert_avro_field_to_python_keeps_the_enum_namespace_over_the_records():
+    field = {
+        "name": "colors",
+        "type": {
+            "type": "array",
+            "items": {
+                "type": "enum",
+                "name": "Color",
+                "namespace": "shared",
+                "symbols": ["RED"],
+            },
+        },
+    }
+
+    python_field, [enum] = CodeGenResultData.convert_avro_field_to_python(
+        field, "example.avro"
+    )
+
+    assert enum.fullname == "shared.Color"
+    assert python_field.enum_items == enum
+
+
+@pytest.mark.parametrize(
+    "avro_type, expected",
+    [
+        ("geo.Address", "Address"),
+        (["null", "Address"], "typing.Union[None, Address]"),
+    ],
+)
+def test_convert_avro_field_to_python_references_records_of_other_schemas(
+    avro_type, expected: str
+):
+    named_types = {"geo.Address": {"type": "record", "name": "Address", "fields": []}}
+
+    python_field, deps = CodeGenResultData.convert_avro_field_to_python(
+        {"name": "home", "type": avro_type}, "geo", named_types
+    )
+
+    assert python_field.type == expected
+    assert python_field.record == "Address"
+    assert deps == []
+
+
+def test_convert_avro_field_to_python_raises_for_unresolved_references():
+    with pytest.raises(UnresolvedReferenceError, match="geo.Address"):
+        CodeGenResultData.convert_avro_field_to_python(
+            {"name": "home", "type": "Address"}, "geo"
+        )
+
+
+def test_codegen_result_data_embeds_referenced_definitions_in_the_schema(
+    referencing_schemas: dict,
+):
+    region = referencing_schemas["region"]
+    zip_address = SchemaData(
+        name="zip_address", schema=referencing_schemas["zip_address"]
+    )
+
+    actual = CodeGenResultData.from_schema_data(
+        zip_address, {"com.acme.geo.Region": region}
+    )
+
+    [region_field] = [
+        f for f in actual.classes[0].schema["fields"] if f["name"] == "region"
+    ]
+    assert region_field["type"] == region
+    assert actual.schemas == {"zip_address": actual.classes[0].schema}
@@ -0,0 +1,153 @@
+from pathlib import Path
+from typing import Type
+
+from dataclasses_avroschema.faust import AvroRecord
+
+from faust_avro_model_codegen.fingerprint import (
+    parsing_canonical_form,
+    schema_fingerprint,
+)
+from faust_avro_model_codegen.schema_verifier import SchemaVerifier
+from faust_avro_model_codegen.verification_cache import VerificationCache
+from tests.conftest import FakeSchemaRegistry
+
+SCHEMA = (
+    '{"type": "record", "name": "User", "fields": [{"name": "name", "type": "string"}]}'
+)
+CHANGED_SCHEMA = (
+    '{"type": "record", "name": "User", "fields": [{"name": "name", "type": "long"}]}'
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parsing_canonical_form_drops_attributes_irrelevant_to_parsing():
+    schema = {
+        "type": "record",
+        "name": "User",
+        "namespace": "example.avro",
+        "doc": "a user",
+        "fields": [{"name": "name", "type": "string", "doc": "the name"}],
+    }
+
+    assert parsing_canonical_form(schema) == (
+        '{"name":"example.avro.User","type":"record",'
+        '"fields":[{"name":"name","type":"string"}]}'
+    )
+
+
+def test_schema_fingerprint_is_equal_for_equivalent_schema_text():
+    reordered = '{"fields": [{"type": "string", "name": "name"}], "name": "User", "type": "record"}'
+
+    assert schema_fingerprint(SCHEMA) == schema_fingerprint(reordered)
+    assert schema_fingerprint(SCHEMA, "SHA-256") == schema_fingerprint(
+        reordered, "SHA-256"
+    )
+
+
+def test_verification_cache_returns_stored_registry_id_for_unchanged_schema(
+    tmp_path: Path,
+):
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+    cache.store("user", SCHEMA, 7)
+
+    assert cache.lookup("user", SCHEMA) == 7
+    assert cache.lookup("user", CHANGED_SCHEMA) is None
+    assert cache.lookup("blog_post", SCHEMA) is None
+
+
+def test_verification_cache_hits_when_only_the_formatting_changed(tmp_path: Path):
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+    reformatted = SCHEMA.replace(", ", ",\n    ")
+    cache.store("user", SCHEMA, 7)
+
+    assert cache.lookup("user", reformatted) == 7
+
+
+def test_verification_cache_misses_when_only_the_doc_or_default_changed(
+    tmp_path: Path,
+):
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+    with_doc = SCHEMA.replace('"type": "string"', '"type": "string", "doc": "x"')
+    with_default = SCHEMA.replace('"type": "string"', '"type": "string", "default": ""')
+    cache.store("user", SCHEMA, 7)
+
+    assert cache.lookup("user", with_doc) is None
+    assert cache.lookup("user", with_default) is None
+
+
+def test_verification_cache_persists_entries_per_registry(tmp_path: Path):
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+    cache.store("user", SCHEMA, 7)
+    cache.save()
+
+    assert (
+        VerificationCache(tmp_path / "cache.json", "http://sr").lookup("user", SCHEMA)
+        == 7
+    )
+    assert (
+        VerificationCache(tmp_path / "cache.json", "http://other-sr").lookup(
+            "user", SCHEMA
+        )
+        is None
+    )
+
+
+def test_verification_cache_entries_expire_after_ttl(tmp_path: Path):
+    clock = FakeClock()
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr", ttl=60, clock=clock)
+    cache.store("user", SCHEMA, 7)
+
+    clock.now += 60
+    assert cache.lookup("user", SCHEMA) == 7
+    clock.now += 1
+    assert cache.lookup("user", SCHEMA) is None
+
+
+def test_verification_cache_invalidate_removes_entries(tmp_path: Path):
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+    cache.store("user", SCHEMA, 7)
+    cache.store("blog_post", SCHEMA, 8)
+
+    cache.invalidate("user")
+    assert cache.lookup("user", SCHEMA) is None
+    assert cache.lookup("blog_post", SCHEMA) == 8
+
+    cache.invalidate()
+    assert cache.lookup("blog_post", SCHEMA) is None
+
+
+def test_verification_cache_ignores_unreadable_cache_file(tmp_path: Path):
+    (tmp_path / "cache.json").write_text("not json")
+
+    cache = VerificationCache(tmp_path / "cache.json", "http://sr")
+
+    assert cache.lookup("user", SCHEMA) is None
+
+
+def test_verifier_skips_registry_for_cached_schemas(
+    tmp_path: Path,
+    fake_registry: FakeSchemaRegistry,
+    generated_modules_dict: dict[str, Type[AvroRecord]],
+):
+    def verifier(refresh: bool = False) -> SchemaVerifier:
+        return SchemaVerifier(
+            schema_registry_url="http://localhost:8082",
+            client=fake_registry.client,
+            cache=VerificationCache(tmp_path / "cache.json", "http://localhost:8082"),
+            refresh=refresh,
+        )
+
+    first = verifier().verify(generated_modules_dict)
+    second = verifier().verify(generated_modules_dict)
+    assert len(fake_registry.requests) == 2
+    assert second == first
+
+    verifier(refresh=True).verify(generated_modules_dict)
+    assert len(fake_registry.requests) == 4
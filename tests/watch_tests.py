@@ -0,0 +1,152 @@
+import json
+import shutil
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from faust_avro_model_codegen import watch
+from faust_avro_model_codegen.parallel import render_package_files, render_schema_files
+from faust_avro_model_codegen.schema_dir_parser import AvroSchemaDirectoryParser
+from faust_avro_model_codegen.template_renderer import TemplateRenderer
+from faust_avro_model_codegen.template_writer import TemplateWriter
+from faust_avro_model_codegen.watch import IncrementalBuild, poll_changes
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+
+@pytest.fixture
+def watched_dir(tmp_path: Path) -> Path:
+    return Path(shutil.copytree(SCHEMA_DIR, tmp_path / "schemas"))
+
+
+def add_field(schema_file: Path, name: str) -> None:
+    schema = json.loads(schema_file.read_text())
+    schema["fields"].append({"name": name, "type": "string"})
+    schema_file.write_text(json.dumps(schema))
+
+
+def test_incremental_build_renders_only_changed_schemas_into_the_module(
+    watched_dir: Path, tmp_path: Path
+):
+    renderer = TemplateRenderer.from_current_directory()
+    outfile = tmp_path / "models.py"
+    build = IncrementalBuild(renderer, TemplateWriter(format_output=False), outfile)
+    build.update(AvroSchemaDirectoryParser.schema_files(watched_dir))
+    user = watched_dir / "user.avsc"
+    add_field(user, "nickname")
+
+    with patch.object(watch, "render_chunk", wraps=watch.render_chunk) as rendered:
+        build.update([user])
+
+    assert [call.args[1] for call in rendered.call_args_list] == [[user]]
+    assert outfile.read_text() == render_schema_files(
+        renderer, AvroSchemaDirectoryParser.schema_files(watched_dir)
+    )
+
+
+def test_incremental_build_rewrites_only_changed_package_modules(
+    watched_dir: Path, tmp_path: Path
+):
+    renderer = TemplateRenderer.from_current_directory()
+    package_dir = tmp_path / "models"
+    build = IncrementalBuild(
+        renderer, TemplateWriter(format_output=False), package_dir, layout="schema"
+    )
+    build.update(AvroSchemaDirectoryParser.schema_files(watched_dir))
+    untouched = (package_dir / "blog_post.py").stat().st_mtime_ns
+
+    (watched_dir / "page_view.avsc").unlink()
+    build.update([], removed=[watched_dir / "page_view.avsc"])
+
+    expected = render_package_files(
+        renderer, AvroSchemaDirectoryParser.schema_files(watched_dir), "schema"
+    )
+    assert {f.name: f.read_text() for f in package_dir.iterdir()} == expected
+    assert (package_dir / "blog_post.py").stat().st_mtime_ns == untouched
+
+
+def test_incremental_build_keeps_output_and_retries_changes_after_a_failure(
+    watched_dir: Path, tmp_path: Path
+):
+    renderer = TemplateRenderer.from_current_directory()
+    outfile = tmp_path / "models.py"
+    build = IncrementalBuild(renderer, TemplateWriter(format_output=False), outfile)
+    build.update(AvroSchemaDirectoryParser.schema_files(watched_dir))
+    before = outfile.read_text()
+    user, blog_post = watched_dir / "user.avsc", watched_dir / "blog_post.avsc"
+    add_field(user, "nickname")
+    blog_post.write_text("{")
+
+    with pytest.raises(ValueError):
+        build.update([user, blog_post])
+    assert outfile.read_text() == before
+
+    shutil.copy(SCHEMA_DIR / "blog_post.avsc", blog_post)
+    build.update([blog_post])
+
+    assert outfile.read_text() == render_schema_files(
+        renderer, AvroSchemaDirectoryParser.schema_files(watched_dir)
+    )
+
+
+def test_poll_changes_reports_a_burst_of_edits_once(watched_dir: Path):
+    user, comment = watched_dir / "user.avsc", watched_dir / "comment.avsc"
+    changes = poll_changes(
+        lambda: AvroSchemaDirectoryParser.schema_files(watched_dir),
+        interval=0.01,
+        debounce=0.1,
+    )
+
+    def edit() -> None:
+        add_field(user, "nickname")
+        comment.write_text("{}")
+        (watched_dir / "page_view.avsc").unlink()
+
+    threading.Timer(0.05, edit).start()
+    actual = next(changes)
+
+    assert sorted(actual.changed) == [comment, user]
+    assert actual.removed == [watched_dir / "page_view.avsc"]
+
+
+def test_incremental_build_renders_schemas_that_reference_a_changed_one(
+    referencing_schema_dir: Path, tmp_path: Path
+):
+    renderer = TemplateRenderer.from_current_directory()
+    outfile = tmp_path / "models.py"
+    build = IncrementalBuild(renderer, TemplateWriter(format_output=False), outfile)
+    build.update(AvroSchemaDirectoryParser.schema_files(referencing_schema_dir))
+    region = referencing_schema_dir / "region.avsc"
+    add_field(region, "code")
+
+    with patch.object(watch, "render_chunk", wraps=watch.render_chunk) as rendered:
+        build.update([region])
+
+    assert [call.args[1] for call in rendered.call_args_list] == [
+        [region],
+        [referencing_schema_dir / "zip_address.avsc"],
+        [referencing_schema_dir / "account.avsc"],
+    ]
+    assert outfile.read_text() == render_schema_files(
+        renderer, AvroSchemaDirectoryParser.schema_files(referencing_schema_dir)
+    )
+
+
+def test_incremental_build_keeps_a_record_inlined_by_several_schemas_once(
+    inline_address_schema_dir: Path, tmp_path: Path
+):
+    renderer = TemplateRenderer.from_current_directory()
+    outfile = tmp_path / "models.py"
+    build = IncrementalBuild(renderer, TemplateWriter(format_output=False), outfile)
+    build.update(AvroSchemaDirectoryParser.schema_files(inline_address_schema_dir))
+    (inline_address_schema_dir / "a.avsc").unlink()
+
+    build.update([], [inline_address_schema_dir / "a.avsc"])
+
+    actual = outfile.read_text()
+    assert actual.count("class Address(AvroRecord):") == 1
+    assert actual == render_schema_files(
+        renderer, AvroSchemaDirectoryParser.schema_files(inline_address_schema_dir)
+    )